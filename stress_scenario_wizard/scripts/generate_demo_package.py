@@ -11,12 +11,13 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from stress_wizard.app_state import AppState
+from stress_wizard.data.demo_data import generate_demo_bundle
 from stress_wizard.exporter.persistence import create_scenario_structure, write_driver_shocks, write_narrative, write_scenario_config
 from stress_wizard.exporter.reporting import build_narrative_document
 
 
 def main() -> int:
-    state = AppState()
+    state = AppState(data_bundle=generate_demo_bundle())
     scenario = state.ensure_scenario()
     outputs = state.run_calculation()
 
@@ -37,10 +37,11 @@ def main() -> int:
         from datetime import datetime, timedelta
 
         from stress_wizard.app_state import AppState
+        from stress_wizard.data.demo_data import generate_demo_bundle
         from stress_wizard.governance.models import ApprovalRequest, ApprovalRule, ReviewerAssignment, ReviewerRole
         from stress_wizard.governance.workflow import GovernanceWorkflow
 
-        state = AppState()
+        state = AppState(data_bundle=generate_demo_bundle())
         scenario = state.ensure_scenario()
         outputs = state.run_calculation()
 
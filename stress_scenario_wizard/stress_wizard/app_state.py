@@ -1,24 +1,31 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack
+import copy
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
 import getpass
+import logging
+from pathlib import Path
 import uuid
 
 import pandas as pd
+import pyarrow as pa
 
-from stress_wizard.calc.attribution import (
-    by_asset_class,
-    by_book,
-    by_desk,
-    by_geography,
-    by_position,
-    by_risk_factor,
-    by_tenor_bucket,
-)
+from stress_wizard.calc.attribution import AttributionCube, build_attribution_cube
+from stress_wizard.calc.book import PricedBook, build_priced_book
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix, build_driver_sensitivity_matrix
 from stress_wizard.calc.engine import CalculationConfig, compute_pnl, portfolio_summary
-from stress_wizard.calc.shift_analysis import marginal_contribution, sensitivity_table, tornado_data
+from stress_wizard.calc.incremental import DriverPositionIndex, build_driver_position_index, reprice_changed_drivers
+from stress_wizard.calc.monte_carlo import MonteCarloConfig, MonteCarloResult, simulate_loss_distribution
+from stress_wizard.calc.result_cache import CachedResult, ResultCache
+from stress_wizard.calc.revaluation import BookGrid, RevaluationGrid, load_grid
+from stress_wizard.calc.shift_analysis import marginal_contribution, patch_sensitivity_table, sensitivity_table, tornado_data
+from stress_wizard.data.columnar_store import list_stored_bundles, open_bundle, save_bundle, table_path
 from stress_wizard.data.demo_data import generate_demo_bundle, generate_sample_driver_shocks
+from stress_wizard.ingestion.validator import BundleValidator, ValidationScorecard, validate_bundle
+from stress_wizard.instrumentation import capture_profile, span
 from stress_wizard.models import (
     CalibrationMethod,
     DataBundle,
@@ -29,9 +36,27 @@ from stress_wizard.models import (
     SeverityTier,
     ShockConfig,
 )
+from stress_wizard.scenario.driver_search import (
+    DriverSearchIndex,
+    build_driver_search_index,
+    load_driver_search_index,
+    save_driver_search_index,
+)
 from stress_wizard.scenario.top_down import TopDownConfig, coherence_checks, generate_asset_class_shocks
 
 
+logger = logging.getLogger(__name__)
+
+CALCULATION_STAGES = ("summary", "attribution", "shift")
+# Stored bundle the generated demo data is kept under, so later starts map it instead of regenerating.
+DEMO_BUNDLE_NAME = "demo"
+ATTRIBUTION_PREFIX = "attribution."
+# Tables a cached entry needs to stand in for a full run; batch runs only store "results".
+OUTPUT_TABLES = ("results", "sensitivity", "tornado", "marginal", f"{ATTRIBUTION_PREFIX}position")
+# Failures of the result cache (unhashable/unstorable frames, disk errors); the run continues uncached.
+CACHE_ERRORS = (pa.ArrowException, TypeError, ValueError, OSError)
+
+
 @dataclass(slots=True)
 class AnalysisOutputs:
     results: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
@@ -40,13 +65,329 @@ class AnalysisOutputs:
     sensitivity: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
     tornado: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
     marginal: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
+    profile_path: Path | None = None  # profiler output of the run, written once it finishes
+    cache_key: str | None = None  # result cache entry the outputs were loaded from or stored to
+    cached: bool = False
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        """The output frames by name, as stored in the result cache."""
+        tables = {name: getattr(self, name) for name in OUTPUT_TABLES if not name.startswith(ATTRIBUTION_PREFIX)}
+        tables.update({f"{ATTRIBUTION_PREFIX}{view}": frame for view, frame in self.attribution.items()})
+        return tables
+
+    @classmethod
+    def from_cache(cls, entry: CachedResult) -> AnalysisOutputs:
+        tables = entry.tables
+        return cls(
+            results=tables["results"],
+            summary=entry.summary,
+            attribution={name[len(ATTRIBUTION_PREFIX) :]: frame for name, frame in tables.items() if name.startswith(ATTRIBUTION_PREFIX)},
+            sensitivity=tables["sensitivity"],
+            tornado=tables["tornado"],
+            marginal=tables["marginal"],
+            cache_key=entry.key,
+            cached=True,
+        )
+
+
+@dataclass(slots=True)
+class CalculationSnapshot:
+    """Inputs and intermediate state of the last run, kept so driver-only edits can be patched."""
+
+    book: PricedBook
+    asset_class_shocks: dict[str, dict[str, float]]
+    driver_shocks: pd.DataFrame
+    config: CalculationConfig
+    results: pd.DataFrame
+    cube: AttributionCube
+    sensitivity: pd.DataFrame
+    driver_index: DriverPositionIndex | None
+    driver_matrix: DriverSensitivityMatrix | None = None
+    revaluation: BookGrid | None = None
+
+    def can_patch(
+        self,
+        book: PricedBook,
+        asset_class_shocks: dict[str, dict[str, float]],
+        driver_shocks: pd.DataFrame,
+        config: CalculationConfig,
+        driver_matrix: DriverSensitivityMatrix | None = None,
+        revaluation: BookGrid | None = None,
+    ) -> bool:
+        return (
+            self.driver_index is not None
+            and self.book is book
+            and self.driver_matrix is driver_matrix
+            and self.revaluation is revaluation
+            and self.config == config
+            and self.asset_class_shocks == asset_class_shocks
+            and not self.driver_shocks.empty
+            and not driver_shocks.empty
+            and {"driver_id", "shock"}.issubset(driver_shocks.columns)
+        )
+
+
+def current_priced_book(bundle: DataBundle, cached: PricedBook | None) -> PricedBook:
+    """`cached` if it is still the join of the bundle's positions and sensitivities, else a fresh join."""
+    if cached is None or not cached.is_built_from(bundle.positions, bundle.sensitivities):
+        return build_priced_book(bundle.positions, bundle.sensitivities)
+    return cached
+
+
+def current_driver_matrix(bundle: DataBundle, book: PricedBook, cached: DriverSensitivityMatrix | None) -> DriverSensitivityMatrix | None:
+    """Driver sensitivity matrix of the bundle's long-format file over `book`, reusing `cached` when it still fits."""
+    long = bundle.driver_sensitivities
+    if long.empty:
+        return None
+    if cached is None or not cached.is_built_for(long, book):
+        return build_driver_sensitivity_matrix(long, book)
+    return cached
+
+
+def current_book_grid(grid: RevaluationGrid | None, book: PricedBook, cached: BookGrid | None) -> BookGrid | None:
+    """`grid` mapped onto `book`, reusing `cached` when it is still aligned."""
+    if grid is None:
+        return None
+    if cached is None or not cached.is_aligned_to(grid, book):
+        return grid.align(book)
+    return cached
+
+
+@dataclass(slots=True)
+class CalculationInputs:
+    """Everything a calculation reads, captured from AppState on the GUI thread.
+
+    A background run only touches this object: it fills in the cached book, driver matrix, grid
+    and snapshot it (re)built, and `AppState.apply_calculation` hands them back on the GUI thread.
+    """
+
+    bundle: DataBundle
+    asset_class_shocks: dict[str, dict[str, float]]
+    driver_shocks: pd.DataFrame
+    config: CalculationConfig
+    incremental: bool = True
+    revaluation: str = "taylor"
+    revaluation_grid: RevaluationGrid | None = None
+    result_cache: ResultCache | None = None
+    profile_dir: Path = field(default_factory=lambda: Path("logs") / "profiles")
+    priced_book: PricedBook | None = None
+    driver_matrix: DriverSensitivityMatrix | None = None
+    book_grid: BookGrid | None = None
+    last_run: CalculationSnapshot | None = None
+
+
+def calculation_stages(
+    inputs: CalculationInputs,
+    cancelled: Callable[[], bool] | None = None,
+    profile: str | None = None,
+) -> Iterator[tuple[str, AnalysisOutputs]]:
+    """Run the calculation in CALCULATION_STAGES order, yielding partially filled outputs.
+
+    Reads and writes only `inputs`, so it can run off the GUI thread; see `AppState.iter_calculation`.
+    The final stage is handed out only after the "calculation.run" span is recorded and the profile
+    file written, so a consumer reacting to it sees this run's timing.
+    Raises ValueError when the bundle has no positions (e.g. a state that has not loaded data yet).
+    """
+    if inputs.bundle.positions.empty:
+        raise ValueError("no portfolio data loaded")
+    final: tuple[str, AnalysisOutputs] | None = None
+    with ExitStack() as stack:
+        capture = stack.enter_context(capture_profile(profile, inputs.profile_dir, "calculation")) if profile else None
+        with span("calculation.run", revaluation=inputs.revaluation, incremental=inputs.incremental) as attrs:
+            for stage, outputs in _priced_stages(inputs, cancelled or (lambda: False)):
+                attrs["stage"] = stage
+                outputs.profile_path = capture.path if capture else None
+                if stage == CALCULATION_STAGES[-1]:
+                    final = stage, outputs
+                else:
+                    yield stage, outputs
+    if final is not None:
+        yield final
+
+
+def _priced_stages(inputs: CalculationInputs, is_cancelled: Callable[[], bool]) -> Iterator[tuple[str, AnalysisOutputs]]:
+    cfg = inputs.config
+    bundle = inputs.bundle
+    with span("calculation.price", patched=False, cached=False) as price:
+        book = inputs.priced_book = current_priced_book(bundle, inputs.priced_book)
+        driver_matrix = inputs.driver_matrix = current_driver_matrix(bundle, book, inputs.driver_matrix)
+        grid = None
+        if inputs.revaluation != "taylor":
+            grid = inputs.book_grid = current_book_grid(inputs.revaluation_grid, book, inputs.book_grid)
+        asset_shocks = inputs.asset_class_shocks
+        driver_shocks = inputs.driver_shocks
+        last = inputs.last_run
+
+        key = entry = None
+        if inputs.result_cache is not None:
+            try:
+                key = inputs.result_cache.key_for(book, asset_shocks, driver_shocks, cfg, driver_matrix, grid)
+                entry = inputs.result_cache.get(key, require=OUTPUT_TABLES)
+            except CACHE_ERRORS:
+                logger.warning("Result cache lookup failed; pricing without the cache", exc_info=True)
+                key = entry = None
+        if entry is not None:
+            price["cached"] = True
+            outputs = AnalysisOutputs.from_cache(entry)
+        else:
+            cube: AttributionCube | None = None
+            patched_rows = None
+            if inputs.incremental and last is not None and last.can_patch(book, asset_shocks, driver_shocks, cfg, driver_matrix, grid):
+                results, cube, patched_rows = reprice_changed_drivers(
+                    book,
+                    last.results,
+                    last.cube,
+                    last.driver_index,
+                    asset_shocks,
+                    last.driver_shocks,
+                    driver_shocks,
+                    cfg,
+                    driver_matrix,
+                    grid,
+                )
+                price["patched"] = True
+                driver_index = last.driver_index
+            else:
+                results = compute_pnl(
+                    positions=bundle.positions,
+                    sensitivities=bundle.sensitivities,
+                    asset_class_shocks=asset_shocks,
+                    driver_shocks=driver_shocks,
+                    config=cfg,
+                    book=book,
+                    driver_matrix=driver_matrix,
+                    revaluation=grid,
+                )
+                if last is not None and last.book is book and last.driver_matrix is driver_matrix:
+                    driver_index = last.driver_index
+                else:
+                    driver_index = build_driver_position_index(book, driver_matrix)
+
+            outputs = AnalysisOutputs(results=results, summary=portfolio_summary(results))
+    if entry is not None:
+        # A cache hit leaves the incremental snapshot alone: it still describes the last priced run.
+        for stage in CALCULATION_STAGES:
+            if is_cancelled():
+                return
+            yield stage, outputs
+        return
+    if is_cancelled():
+        return
+    yield "summary", outputs
+
+    with span("calculation.attribution"):
+        if cube is None:
+            cube = build_attribution_cube(results, book)
+        outputs.attribution = cube.views()
+    if is_cancelled():
+        return
+    yield "attribution", outputs
+
+    with span("calculation.shift"):
+        if patched_rows is not None:
+            # Only the repriced rows can move the shift table; the other positions price as before.
+            sens = patch_sensitivity_table(
+                last.sensitivity,
+                book,
+                patched_rows,
+                asset_shocks,
+                last.driver_shocks,
+                driver_shocks,
+                config=cfg,
+                driver_matrix=driver_matrix,
+                revaluation=grid,
+                cancelled=is_cancelled,
+            )
+        else:
+            sens = sensitivity_table(
+                bundle.positions,
+                bundle.sensitivities,
+                asset_shocks,
+                book=book,
+                config=cfg,
+                cancelled=is_cancelled,
+                driver_shocks=driver_shocks,
+                driver_matrix=driver_matrix,
+                revaluation=grid,
+            )
+        if is_cancelled():
+            return
+        outputs.sensitivity = sens
+        outputs.tornado = tornado_data(sens)
+        outputs.marginal = marginal_contribution(results)
+    if is_cancelled():
+        return
+
+    inputs.last_run = CalculationSnapshot(
+        book=book,
+        asset_class_shocks=asset_shocks,
+        driver_shocks=driver_shocks[["driver_id", "shock"]].copy() if {"driver_id", "shock"}.issubset(driver_shocks.columns) else pd.DataFrame(),
+        config=cfg,
+        results=results,
+        cube=cube,
+        sensitivity=sens,
+        driver_index=driver_index,
+        driver_matrix=driver_matrix,
+        revaluation=grid,
+    )
+    if key is not None:
+        try:
+            inputs.result_cache.put(key, outputs.tables(), outputs.summary)
+            outputs.cache_key = key
+        except CACHE_ERRORS:
+            logger.warning("Could not store run %s in the result cache", key[:12], exc_info=True)
+    yield "shift", outputs
+
+
+def empty_bundle() -> DataBundle:
+    """Placeholder bundle for a window that is still loading its data."""
+    return DataBundle(positions=pd.DataFrame(), sensitivities=pd.DataFrame(), market_data=pd.DataFrame(), risk_drivers=pd.DataFrame())
+
+
+def open_stored_bundle(root: Path | str, name: str) -> tuple[DataBundle, DriverSearchIndex | None]:
+    """Memory-map a stored bundle and its saved driver search index (None if there is none)."""
+    bundle = open_bundle(root, name)
+    return bundle, load_driver_search_index(table_path(Path(root), name, "risk_drivers").parent, bundle.risk_drivers)
+
+
+def load_startup_bundle(root: Path | str, name: str | None = None) -> tuple[str, DataBundle, DriverSearchIndex | None]:
+    """The bundle to start with: stored bundle `name`, else the stored demo bundle.
+
+    Stored bundles are memory-mapped, so this costs milliseconds. When neither exists the demo
+    bundle is generated and stored under DEMO_BUNDLE_NAME (best effort) for the next start.
+    Returns the bundle's name, the bundle and its driver search index.
+    """
+    stored = list_stored_bundles(root)
+    for candidate in dict.fromkeys(n for n in (name, DEMO_BUNDLE_NAME) if n):
+        if candidate in stored:
+            try:
+                return candidate, *open_stored_bundle(root, candidate)
+            except (OSError, ValueError, pa.ArrowInvalid):
+                continue  # damaged files: fall through to the next candidate
+    bundle = generate_demo_bundle()
+    index = build_driver_search_index(bundle.risk_drivers)
+    try:
+        paths = save_bundle(bundle, root, DEMO_BUNDLE_NAME)
+        save_driver_search_index(index, paths["risk_drivers"].parent)
+    except OSError:
+        pass  # read-only root: regenerate next time
+    return DEMO_BUNDLE_NAME, bundle, index
 
 
 @dataclass(slots=True)
 class AppState:
-    data_bundle: DataBundle = field(default_factory=lambda: generate_demo_bundle())
+    data_bundle: DataBundle = field(default_factory=empty_bundle)  # pass generate_demo_bundle() for demo data
     scenario: Scenario | None = None
     outputs: AnalysisOutputs = field(default_factory=AnalysisOutputs)
+    revaluation_grid: RevaluationGrid | None = None
+    profile_dir: Path = field(default_factory=lambda: Path("logs") / "profiles")
+    result_cache: ResultCache | None = None
+    _priced_book: PricedBook | None = field(default=None, init=False, repr=False)
+    _last_run: CalculationSnapshot | None = field(default=None, init=False, repr=False)
+    _driver_index: DriverSearchIndex | None = field(default=None, init=False, repr=False)
+    _driver_matrix: DriverSensitivityMatrix | None = field(default=None, init=False, repr=False)
+    _book_grid: BookGrid | None = field(default=None, init=False, repr=False)
+    _validator: BundleValidator = field(default_factory=BundleValidator, init=False, repr=False)
 
     def ensure_scenario(self) -> Scenario:
         if self.scenario is None:
@@ -121,7 +462,89 @@ class AppState:
         if self.scenario is not None:
             self.scenario.shocks.risk_driver_shocks = generate_sample_driver_shocks(self.data_bundle.risk_drivers, n=min(5000, count // 20))
 
-    def run_calculation(self, correlation_regime: float = 0.35, liquidity_bps: float = 12.0, funding_spread_bps: float = 25.0) -> AnalysisOutputs:
+    def save_data_bundle(self, root: Path | str, name: str) -> None:
+        paths = save_bundle(self.data_bundle, root, name)
+        save_driver_search_index(self.driver_search_index(), paths["risk_drivers"].parent)
+
+    def load_stored_bundle(self, root: Path | str, name: str) -> None:
+        """Swap in a memory-mapped bundle written by `save_data_bundle`, with its search index."""
+        self.use_bundle(*open_stored_bundle(root, name))
+
+    def use_bundle(self, bundle: DataBundle, driver_index: DriverSearchIndex | None = None) -> None:
+        """Replace the data bundle, e.g. with one loaded off the GUI thread by `load_startup_bundle`."""
+        self.data_bundle = bundle
+        self._driver_index = driver_index
+        # Keep shocks the user already has; only a scenario without any gets the sample set.
+        if self.scenario is not None and self.scenario.shocks.risk_driver_shocks.empty:
+            self.scenario.shocks.risk_driver_shocks = generate_sample_driver_shocks(self.data_bundle.risk_drivers, n=1200)
+
+    def driver_search_index(self) -> DriverSearchIndex:
+        """Return the search index for the current taxonomy, building it once per risk_drivers frame."""
+        drivers = self.data_bundle.risk_drivers
+        if self._driver_index is None or not self._driver_index.matches(drivers):
+            self._driver_index = build_driver_search_index(drivers)
+        return self._driver_index
+
+    def validate_data_bundle(self) -> ValidationScorecard:
+        """Score the current bundle; partitions unchanged since the last validation reuse their results."""
+        bundle = self.data_bundle
+        return validate_bundle(bundle.positions, bundle.sensitivities, bundle.market_data, bundle.risk_drivers, validator=self._validator)
+
+    def priced_book(self) -> PricedBook:
+        """Return the cached positions/sensitivities join, rebuilding it only when either frame is replaced."""
+        self._priced_book = current_priced_book(self.data_bundle, self._priced_book)
+        return self._priced_book
+
+    def driver_matrix(self) -> DriverSensitivityMatrix | None:
+        """Position x driver sensitivities from the bundle's long-format file, cached per book."""
+        if self.data_bundle.driver_sensitivities.empty:
+            return None
+        self._driver_matrix = current_driver_matrix(self.data_bundle, self.priced_book(), self._driver_matrix)
+        return self._driver_matrix
+
+    def book_grid(self) -> BookGrid | None:
+        """The revaluation grid mapped onto the current book, cached until either changes."""
+        if self.revaluation_grid is None:
+            return None
+        self._book_grid = current_book_grid(self.revaluation_grid, self.priced_book(), self._book_grid)
+        return self._book_grid
+
+    def load_revaluation_grid(self, root: Path | str, as_of: date) -> bool:
+        """Use the grid cached on disk for `as_of`; returns False (and keeps the current grid) if there is none."""
+        grid = load_grid(root, as_of)
+        if grid is not None:
+            self.revaluation_grid = grid
+        return grid is not None
+
+    def run_calculation(
+        self,
+        correlation_regime: float = 0.35,
+        liquidity_bps: float = 12.0,
+        funding_spread_bps: float = 25.0,
+        incremental: bool = True,
+        revaluation: str = "taylor",
+        profile: str | None = None,
+    ) -> AnalysisOutputs:
+        """Price the scenario and rebuild all outputs.
+
+        With `incremental`, a run that differs from the previous one only in driver shocks reprices
+        just the positions mapped to the changed drivers and patches the attribution cube.
+        """
+        outputs = self.outputs
+        for _stage, outputs in self.iter_calculation(
+            correlation_regime, liquidity_bps, funding_spread_bps, incremental, revaluation=revaluation, profile=profile
+        ):
+            pass
+        return outputs
+
+    def simulate_loss_distribution(
+        self,
+        mc: MonteCarloConfig | None = None,
+        correlation_regime: float = 0.35,
+        liquidity_bps: float = 12.0,
+        funding_spread_bps: float = 25.0,
+    ) -> MonteCarloResult:
+        """Monte Carlo P&L distribution around the current scenario's shocks."""
         scenario = self.ensure_scenario()
         cfg = CalculationConfig(
             horizon_days=scenario.metadata.horizon_days,
@@ -129,38 +552,88 @@ class AppState:
             liquidity_bps=liquidity_bps,
             funding_spread_bps=funding_spread_bps,
         )
+        return simulate_loss_distribution(self.priced_book(), scenario.shocks.asset_class_shocks, scenario.shocks.risk_driver_shocks, cfg, mc)
 
-        results = compute_pnl(
-            positions=self.data_bundle.positions,
-            sensitivities=self.data_bundle.sensitivities,
-            asset_class_shocks=scenario.shocks.asset_class_shocks,
-            driver_shocks=scenario.shocks.risk_driver_shocks,
+    def calculation_inputs(
+        self,
+        correlation_regime: float = 0.35,
+        liquidity_bps: float = 12.0,
+        funding_spread_bps: float = 25.0,
+        incremental: bool = True,
+        revaluation: str = "taylor",
+    ) -> CalculationInputs:
+        """Snapshot the scenario, bundle and caches a run needs; call on the thread that owns the state.
+
+        Shocks are copied, so edits made while a background run is in flight never reach it.
+        """
+        scenario = self.ensure_scenario()
+        cfg = CalculationConfig(
+            horizon_days=scenario.metadata.horizon_days,
+            correlation_regime=correlation_regime,
+            liquidity_bps=liquidity_bps,
+            funding_spread_bps=funding_spread_bps,
+        )
+        if revaluation != "taylor":
+            cfg.revaluation_method = revaluation
+        return CalculationInputs(
+            bundle=self.data_bundle,
+            asset_class_shocks=copy.deepcopy(scenario.shocks.asset_class_shocks),
+            driver_shocks=scenario.shocks.risk_driver_shocks.copy(),
             config=cfg,
+            incremental=incremental,
+            revaluation=revaluation,
+            revaluation_grid=self.revaluation_grid,
+            result_cache=self.result_cache,
+            profile_dir=self.profile_dir,
+            priced_book=self._priced_book,
+            driver_matrix=self._driver_matrix,
+            book_grid=self._book_grid,
+            last_run=self._last_run,
         )
 
-        attrib = {
-            "asset_class": by_asset_class(results),
-            "risk_factor": by_risk_factor(results),
-            "desk": by_desk(results),
-            "book": by_book(results),
-            "position": by_position(results),
-            "geography": by_geography(results),
-            "tenor": by_tenor_bucket(results),
-        }
-
-        sens = sensitivity_table(
-            self.data_bundle.positions,
-            self.data_bundle.sensitivities,
-            scenario.shocks.asset_class_shocks,
-        )
+    def apply_calculation(self, inputs: CalculationInputs, outputs: AnalysisOutputs | None = None) -> None:
+        """Adopt the caches a run built and, for a finished run, its outputs and incremental snapshot.
 
-        outputs = AnalysisOutputs(
-            results=results,
-            summary=portfolio_summary(results),
-            attribution=attrib,
-            sensitivity=sens,
-            tornado=tornado_data(sens),
-            marginal=marginal_contribution(results),
-        )
-        self.outputs = outputs
-        return outputs
+        Caches are re-validated on use, so adopting them from a superseded run is harmless.
+        """
+        self._priced_book = inputs.priced_book or self._priced_book
+        self._driver_matrix = inputs.driver_matrix or self._driver_matrix
+        self._book_grid = inputs.book_grid or self._book_grid
+        if outputs is not None:
+            self._last_run = inputs.last_run
+            self.outputs = outputs
+
+    def iter_calculation(
+        self,
+        correlation_regime: float = 0.35,
+        liquidity_bps: float = 12.0,
+        funding_spread_bps: float = 25.0,
+        incremental: bool = True,
+        cancelled: Callable[[], bool] | None = None,
+        revaluation: str = "taylor",
+        profile: str | None = None,
+    ) -> Iterator[tuple[str, AnalysisOutputs]]:
+        """Run the calculation in CALCULATION_STAGES order, yielding partially filled outputs.
+
+        `revaluation` is "taylor", or an interpolation method ("bilinear"/"cubic") to price positions
+        covered by `revaluation_grid` from their full-revaluation ladders.
+
+        `cancelled` is polled between stages and inside the shift table; once it returns True the
+        run stops without touching `self.outputs` or the incremental snapshot.
+
+        With a `result_cache`, a run whose inputs match a stored entry loads its outputs instead of
+        pricing, and every fully priced run is stored.
+
+        The run is timed as a "calculation.run" span (see `instrumentation.TRACER`). With `profile`
+        ("cprofile" or "pyinstrument") it is also profiled into `profile_dir`. Background runs use
+        `calculation_inputs`, `calculation_stages` and `apply_calculation` directly.
+        """
+        inputs = self.calculation_inputs(correlation_regime, liquidity_bps, funding_spread_bps, incremental, revaluation)
+        finished = False
+        for stage, outputs in calculation_stages(inputs, cancelled, profile):
+            if stage == CALCULATION_STAGES[-1]:
+                self.apply_calculation(inputs, outputs)
+                finished = True
+            yield stage, outputs
+        if not finished:
+            self.apply_calculation(inputs)
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import gc
+import importlib.util
+import json
+import logging
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.calc import attribution
+from stress_wizard.calc.book import PricedBook, build_priced_book
+from stress_wizard.calc.engine import CalculationConfig, compute_pnl
+from stress_wizard.calc.shift_analysis import marginal_contribution, sensitivity_table
+from stress_wizard.data.demo_data import generate_demo_bundle, generate_sample_driver_shocks
+from stress_wizard.exporter.persistence import write_driver_shocks, write_results_workbook
+from stress_wizard.exporter.reporting import export_pdf_summary, export_pptx_summary
+from stress_wizard.ingestion.validator import BundleValidator, validate_bundle
+from stress_wizard.instrumentation import peak_rss_mb
+from stress_wizard.models import DataBundle
+from stress_wizard.scenario.bottom_up import search_risk_drivers
+from stress_wizard.scenario.driver_search import build_driver_search_index
+from stress_wizard.scenario.top_down import TopDownConfig, generate_asset_class_shocks
+
+
+logger = logging.getLogger(__name__)
+
+HISTORY_NAME = "history.jsonl"
+BASELINE_NAME = "baseline.json"
+DEFAULT_OUTPUT_DIR = Path("benchmarks")
+# A case regresses when it is slower (or larger) than the baseline by this share AND by the floor,
+# so sub-millisecond jitter on small cases is not reported.
+DEFAULT_TOLERANCE = 0.25
+TIME_FLOOR_SECONDS = 0.005
+RSS_FLOOR_MB = 16.0
+BENCHMARK_TOP_DOWN = TopDownConfig(narrative="Benchmark", theme_weights={"Recession": 0.5, "Stagflation": 0.3, "Geopolitical": 0.2}, severity_scale=1.5)
+SEARCH_QUERIES = ("EMEA", "10Y", "credit")
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkScale:
+    name: str
+    positions: int
+    drivers: int
+
+
+SCALES = {
+    scale.name: scale
+    for scale in (
+        BenchmarkScale("3.5k", 3_500, 60_000),
+        BenchmarkScale("100k", 100_000, 300_000),
+        BenchmarkScale("1m", 1_000_000, 300_000),
+    )
+}
+
+
+@dataclass(slots=True)
+class Fixture:
+    """Inputs shared by every case of one scale; built once, outside the timed region."""
+
+    bundle: DataBundle
+    driver_shocks: pd.DataFrame
+    workdir: Path
+    shocks: dict[str, dict[str, float]] = field(default_factory=dict)
+    config: CalculationConfig = field(default_factory=CalculationConfig)
+    book: PricedBook | None = None
+    results: pd.DataFrame | None = None
+    validator: BundleValidator | None = None  # already run once over the bundle, for the rerun case
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkCase:
+    name: str
+    run: Callable[[Fixture], Any]
+    requires: tuple[str, ...] = ()  # optional modules; the case is skipped when one is missing
+
+
+@dataclass(slots=True)
+class CaseResult:
+    status: str = "ok"  # ok | skipped | failed
+    seconds: float | None = None  # median of the repeats
+    min_seconds: float | None = None
+    repeats: int = 0
+    peak_rss_mb: float | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class Regression:
+    scale: str
+    case: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def describe(self) -> str:
+        return f"{self.scale}/{self.case} {self.metric}: {self.baseline:.4g} -> {self.current:.4g} ({self.ratio:.2f}x)"
+
+
+def _compute_pnl(fx: Fixture) -> pd.DataFrame:
+    return compute_pnl(None, None, fx.shocks, driver_shocks=fx.driver_shocks, config=fx.config, book=fx.book)
+
+
+def _search_scan(fx: Fixture) -> None:
+    for query in SEARCH_QUERIES:
+        search_risk_drivers(fx.bundle.risk_drivers, query)
+
+
+def _search_indexed(fx: Fixture) -> None:
+    index = build_driver_search_index(fx.bundle.risk_drivers)
+    for query in SEARCH_QUERIES:
+        search_risk_drivers(fx.bundle.risk_drivers, query, index=index)
+
+
+def _validate(fx: Fixture, validator: BundleValidator | None = None) -> None:
+    b = fx.bundle
+    validate_bundle(b.positions, b.sensitivities, b.market_data, b.risk_drivers, validator=validator)
+
+
+def _workbook(fx: Fixture) -> None:
+    # Same sheets (and the same 50k position cap) as the Save action.
+    views = attribution.attribution_views(fx.results, fx.book)
+    sheets = {
+        "by_asset_class": views.get("asset_class", pd.DataFrame()),
+        "by_desk": views.get("desk", pd.DataFrame()),
+        "by_position": views.get("position", pd.DataFrame()).head(50_000),
+    }
+    write_results_workbook(fx.workdir, sheets)
+
+
+def _summary_lines(fx: Fixture) -> list[str]:
+    return [f"Positions: {len(fx.results):,}", f"Total P&L: {float(fx.results['pnl_total'].sum()):,.2f}"]
+
+
+CASES: list[BenchmarkCase] = [
+    BenchmarkCase("build_priced_book", lambda fx: build_priced_book(fx.bundle.positions, fx.bundle.sensitivities)),
+    BenchmarkCase("compute_pnl", _compute_pnl),
+    BenchmarkCase("attribution_views", lambda fx: attribution.attribution_views(fx.results, fx.book)),
+    *[
+        BenchmarkCase(f"attribution.{view}", lambda fx, view=view: getattr(attribution, view)(fx.results))
+        for view in ("by_asset_class", "by_risk_factor", "by_desk", "by_book", "by_position", "by_geography", "by_tenor_bucket")
+    ],
+    BenchmarkCase("sensitivity_table", lambda fx: sensitivity_table(None, None, fx.shocks, book=fx.book, config=fx.config)),
+    BenchmarkCase("marginal_contribution", lambda fx: marginal_contribution(fx.results)),
+    BenchmarkCase("search_risk_drivers.scan", _search_scan),
+    BenchmarkCase("search_risk_drivers.indexed", _search_indexed),
+    BenchmarkCase("validate_bundle", _validate),
+    BenchmarkCase("validate_bundle.rerun", lambda fx: _validate(fx, fx.validator)),
+    BenchmarkCase("export.results_csv", lambda fx: fx.results.to_csv(fx.workdir / "results_raw.csv", index=False)),
+    BenchmarkCase("export.results_parquet", lambda fx: fx.results.to_parquet(fx.workdir / "results_raw.parquet", index=False), ("pyarrow",)),
+    BenchmarkCase("export.driver_shocks", lambda fx: write_driver_shocks(fx.workdir, fx.driver_shocks)),
+    BenchmarkCase("export.results_workbook", _workbook, ("openpyxl",)),
+    BenchmarkCase("export.pdf_summary", lambda fx: export_pdf_summary(fx.workdir / "report.pdf", "Benchmark", _summary_lines(fx)), ("reportlab",)),
+    BenchmarkCase("export.pptx_summary", lambda fx: export_pptx_summary(fx.workdir / "summary.pptx", "Benchmark", _summary_lines(fx)), ("pptx",)),
+]
+
+
+def _missing_module(names: tuple[str, ...]) -> str | None:
+    return next((name for name in names if importlib.util.find_spec(name) is None), None)
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark so the next reading covers one case (Linux only)."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def time_case(case: BenchmarkCase, fixture: Fixture, repeat: int = 3) -> CaseResult:
+    missing = _missing_module(case.requires)
+    if missing:
+        return CaseResult(status="skipped", error=f"{missing} is not installed")
+    timings: list[float] = []
+    gc.collect()
+    _reset_peak_rss()
+    try:
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            case.run(fixture)
+            timings.append(time.perf_counter() - started)
+    except Exception as exc:  # one broken case should not abort the run
+        return CaseResult(status="failed", repeats=len(timings), error=f"{type(exc).__name__}: {exc}")
+    return CaseResult(
+        seconds=statistics.median(timings),
+        min_seconds=min(timings),
+        repeats=len(timings),
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def build_fixture(scale: BenchmarkScale, workdir: Path) -> Fixture:
+    bundle = generate_demo_bundle(risk_driver_count=scale.drivers, position_count=scale.positions)
+    fixture = Fixture(
+        bundle=bundle,
+        driver_shocks=generate_sample_driver_shocks(bundle.risk_drivers),
+        workdir=workdir,
+        shocks=generate_asset_class_shocks(BENCHMARK_TOP_DOWN),
+    )
+    fixture.book = build_priced_book(bundle.positions, bundle.sensitivities)
+    fixture.results = _compute_pnl(fixture)
+    fixture.validator = BundleValidator()
+    _validate(fixture, fixture.validator)
+    return fixture
+
+
+def run_scale(scale: BenchmarkScale, cases: list[BenchmarkCase] | None = None, repeat: int = 3) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="stress_wizard_bench_") as tmp:
+        _reset_peak_rss()
+        started = time.perf_counter()
+        fixture = build_fixture(scale, Path(tmp))
+        setup = CaseResult(seconds=time.perf_counter() - started, repeats=1, peak_rss_mb=peak_rss_mb())
+        out = {"generate_demo_bundle": setup}
+        for case in cases or CASES:
+            out[case.name] = time_case(case, fixture, repeat)
+            logger.info("%s/%s: %s", scale.name, case.name, out[case.name])
+    return {"positions": scale.positions, "drivers": scale.drivers, "cases": {name: asdict(result) for name, result in out.items()}}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10, cwd=Path(__file__).parent)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmarks(
+    scales: list[BenchmarkScale] | None = None,
+    case_names: list[str] | None = None,
+    repeat: int = 3,
+    progress: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """Time every case at every scale and return one run record (see `append_history`)."""
+    scales = scales or [SCALES["3.5k"]]
+    cases = CASES if not case_names else [c for c in CASES if any(c.name == n or c.name.startswith(f"{n}.") for n in case_names)]
+    record: dict[str, Any] = {
+        "run_id": uuid.uuid4().hex[:8],
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "repeat": repeat,
+        "scales": {},
+    }
+    for scale in scales:
+        if progress is not None:
+            progress(f"{scale.name}: {scale.positions:,} positions, {scale.drivers:,} drivers")
+        record["scales"][scale.name] = run_scale(scale, cases, repeat)
+    record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return record
+
+
+def append_history(record: dict[str, Any], output_dir: Path | str = DEFAULT_OUTPUT_DIR) -> Path:
+    """Append a run record as one JSON line to `<output_dir>/history.jsonl`."""
+    path = Path(output_dir) / HISTORY_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+    return path
+
+
+def load_history(output_dir: Path | str = DEFAULT_OUTPUT_DIR) -> list[dict[str, Any]]:
+    path = Path(output_dir) / HISTORY_NAME
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def save_baseline(record: dict[str, Any], output_dir: Path | str = DEFAULT_OUTPUT_DIR) -> Path:
+    """Store a run as the baseline; scales already in the baseline but not in this run are kept."""
+    path = Path(output_dir) / BASELINE_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = load_baseline(output_dir) or {"scales": {}}
+    baseline.update({k: v for k, v in record.items() if k != "scales"})
+    baseline["scales"].update(record["scales"])
+    path.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+    return path
+
+
+def load_baseline(output_dir: Path | str = DEFAULT_OUTPUT_DIR) -> dict[str, Any] | None:
+    path = Path(output_dir) / BASELINE_NAME
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def find_regressions(record: dict[str, Any], baseline: dict[str, Any] | None, tolerance: float = DEFAULT_TOLERANCE) -> list[Regression]:
+    """Cases whose median time or peak RSS exceeds the baseline by `tolerance` and the floors."""
+    if not baseline:
+        return []
+    found: list[Regression] = []
+    floors = {"seconds": TIME_FLOOR_SECONDS, "peak_rss_mb": RSS_FLOOR_MB}
+    for scale, data in record["scales"].items():
+        base_cases = baseline.get("scales", {}).get(scale, {}).get("cases", {})
+        for case, result in data["cases"].items():
+            base = base_cases.get(case)
+            if base is None or result["status"] != "ok" or base["status"] != "ok":
+                continue
+            for metric, floor in floors.items():
+                old, new = base.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                if new > old * (1.0 + tolerance) and new - old > floor:
+                    found.append(Regression(scale=scale, case=case, metric=metric, baseline=old, current=new))
+    return found
+
+
+def format_record(record: dict[str, Any]) -> str:
+    lines = []
+    for scale, data in record["scales"].items():
+        lines.append(f"[{scale}] {data['positions']:,} positions, {data['drivers']:,} drivers")
+        for case, result in data["cases"].items():
+            if result["status"] != "ok":
+                lines.append(f"  {case:<32} {result['status']}: {result['error']}")
+                continue
+            rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:,.0f} MiB"
+            lines.append(f"  {case:<32} {result['seconds'] * 1000:>10.1f} ms  peak {rss}")
+    return "\n".join(lines)
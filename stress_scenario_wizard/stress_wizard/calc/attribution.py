@@ -1,26 +1,56 @@
 from __future__ import annotations
 
-import pandas as pd
+from dataclasses import dataclass, field
 
+import numpy as np
+import pandas as pd
 
-def _aggregate(results: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
-    grouped = (
-        results.groupby(group_cols, dropna=False, as_index=False)
-        .agg(
-            pnl=("pnl_total", "sum"),
-            pnl_delta=("pnl_delta", "sum"),
-            pnl_gamma=("pnl_gamma", "sum"),
-            pnl_vega=("pnl_vega", "sum"),
-            pnl_rho=("pnl_rho", "sum"),
-            pnl_cs01=("pnl_cs01", "sum"),
-            pnl_theta=("pnl_theta", "sum"),
-            pnl_convexity=("pnl_convexity", "sum"),
-            pnl_cross_gamma=("pnl_cross_gamma", "sum"),
-            pnl_funding=("pnl_funding", "sum"),
-            pnl_liquidity=("pnl_liquidity", "sum"),
-            position_count=("instrument_id", "count"),
-        )
-    )
+from stress_wizard.calc.book import PricedBook
+from stress_wizard.instrumentation import span, traced
+
+
+AGGREGATE_COLUMNS = {
+    "pnl": "pnl_total",
+    "pnl_delta": "pnl_delta",
+    "pnl_gamma": "pnl_gamma",
+    "pnl_vega": "pnl_vega",
+    "pnl_rho": "pnl_rho",
+    "pnl_cs01": "pnl_cs01",
+    "pnl_theta": "pnl_theta",
+    "pnl_convexity": "pnl_convexity",
+    "pnl_cross_gamma": "pnl_cross_gamma",
+    "pnl_funding": "pnl_funding",
+    "pnl_liquidity": "pnl_liquidity",
+}
+
+RISK_FACTOR_COLUMNS = {
+    "Delta": "pnl_delta",
+    "Gamma": "pnl_gamma",
+    "Vega": "pnl_vega",
+    "Rho": "pnl_rho",
+    "CS01": "pnl_cs01",
+    "Theta": "pnl_theta",
+    "Convexity": "pnl_convexity",
+    "CrossGamma": "pnl_cross_gamma",
+    "Funding": "pnl_funding",
+    "Liquidity": "pnl_liquidity",
+}
+
+# Rollup levels held in the cube; geography/tenor are extra axes alongside the desk hierarchy.
+CUBE_DIMENSIONS = ("asset_class", "desk", "book", "geography", "tenor")
+MISSING_LABELS = {"geography": "Unknown", "tenor": "N/A"}
+
+VIEWS = {
+    "asset_class": ["asset_class"],
+    "desk": ["desk"],
+    "book": ["desk", "book"],
+    "position": ["instrument_id", "desk", "book", "asset_class"],
+    "geography": ["geography"],
+    "tenor": ["tenor"],
+}
+
+
+def _finalize(grouped: pd.DataFrame) -> pd.DataFrame:
     total = grouped["pnl"].sum()
     grouped["pct_total"] = 0.0 if abs(total) < 1e-9 else grouped["pnl"] / total * 100.0
     grouped["rank"] = grouped["pnl"].rank(method="dense", ascending=True).astype(int)
@@ -28,55 +58,166 @@ def _aggregate(results: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
     return grouped
 
 
+def _sorted_codes(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    # Sorted factorization keeps group order identical to groupby(sort=True); NaN keys go last.
+    codes, uniques = pd.factorize(values, sort=True)
+    uniques = pd.Index(uniques)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques = uniques.append(pd.Index([np.nan]))
+    return codes.astype(np.int64), uniques
+
+
+def _book_codes(book: PricedBook, col: str) -> tuple[np.ndarray, pd.Index]:
+    labels = np.asarray(book.labels[col], dtype=object)
+    order = np.argsort(labels, kind="stable")
+    remap = np.empty(len(order), dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return remap[book.codes[col]], pd.Index(labels[order])
+
+
+def _rollup(codes: list[np.ndarray], labels: list[pd.Index], values: np.ndarray) -> tuple[list[np.ndarray], np.ndarray, np.ndarray]:
+    """Sum `values` rows by the combination of `codes`.
+
+    Returns per-group codes and sums in key order, plus each input row's group index.
+    """
+    key = np.zeros(len(values), dtype=np.int64)
+    for c, lab in zip(codes, labels):
+        key = key * len(lab) + c
+    uniq, inverse = np.unique(key, return_inverse=True)
+    sums = np.column_stack([np.bincount(inverse, weights=values[:, j], minlength=len(uniq)) for j in range(values.shape[1])])
+
+    group_codes = []
+    rest = uniq
+    for lab in reversed(labels):
+        group_codes.append(rest % len(lab))
+        rest = rest // len(lab)
+    return list(reversed(group_codes)), sums, inverse
+
+
+@dataclass(slots=True)
+class AttributionCube:
+    """Stress P&L summed once into (asset_class, desk, book, geography, tenor) cells.
+
+    Views other than `position` roll up from the cells, which are far fewer than positions.
+    `row_cell` maps each results row to its cell so contributions can be patched in place.
+    """
+
+    cell_codes: dict[str, np.ndarray]
+    labels: dict[str, pd.Index]
+    cell_values: np.ndarray
+    row_cell: np.ndarray = field(repr=False)
+    results: pd.DataFrame = field(repr=False)
+    book: PricedBook | None = field(default=None, repr=False)
+
+    def _frame(self, cols: list[str], group_codes: list[np.ndarray], labels: list[pd.Index], sums: np.ndarray) -> pd.DataFrame:
+        data = {col: lab.take(codes) for col, codes, lab in zip(cols, group_codes, labels)}
+        for j, name in enumerate(AGGREGATE_COLUMNS):
+            data[name] = sums[:, j]
+        data["position_count"] = sums[:, -1].astype(np.int64)
+        return _finalize(pd.DataFrame(data))
+
+    def view(self, name: str) -> pd.DataFrame:
+        if name == "risk_factor":
+            with span("attribution.risk_factor"):
+                return self.risk_factors()
+        if name not in VIEWS:
+            raise KeyError(f"Unknown attribution view: {name}")
+        cols = VIEWS[name]
+        with span(f"attribution.{name}"):
+            if name == "position":
+                return self._position_view()
+            labels = [self.labels[c] for c in cols]
+            group_codes, sums, _ = _rollup([self.cell_codes[c] for c in cols], labels, self.cell_values)
+            return self._frame(cols, group_codes, labels, sums)
+
+    def views(self) -> dict[str, pd.DataFrame]:
+        return {name: self.view(name) for name in ["asset_class", "risk_factor", "desk", "book", "position", "geography", "tenor"]}
+
+    def risk_factors(self) -> pd.DataFrame:
+        totals = self.cell_values.sum(axis=0)
+        index = {name: j for j, name in enumerate(AGGREGATE_COLUMNS)}
+        out = pd.DataFrame([{"risk_factor": factor, "pnl": float(totals[index[col]])} for factor, col in RISK_FACTOR_COLUMNS.items()]).sort_values("pnl")
+        total = out["pnl"].sum()
+        out["pct_total"] = 0.0 if abs(total) < 1e-9 else out["pnl"] / total * 100.0
+        out["rank"] = out["pnl"].rank(method="dense", ascending=True).astype(int)
+        return out
+
+    def _position_view(self) -> pd.DataFrame:
+        cols = VIEWS["position"]
+        codes, labels = zip(*(_dimension_codes(self.results, c, self.book) for c in cols))
+        group_codes, sums, _ = _rollup(list(codes), list(labels), value_matrix(self.results))
+        return self._frame(cols, group_codes, list(labels), sums)
+
+
+def _dimension_codes(results: pd.DataFrame, col: str, book: PricedBook | None) -> tuple[np.ndarray, pd.Index]:
+    if book is not None and col in book.codes and col in results.columns:
+        return _book_codes(book, col)
+    if col not in results.columns:
+        return np.zeros(len(results), dtype=np.int64), pd.Index([MISSING_LABELS.get(col, "")])
+    return _sorted_codes(results[col])
+
+
+def value_matrix(results: pd.DataFrame) -> np.ndarray:
+    """(rows, AGGREGATE_COLUMNS + position count) matrix the cube sums over."""
+    cols = [results[src].to_numpy(dtype=np.float64) for src in AGGREGATE_COLUMNS.values()]
+    cols.append(results["instrument_id"].notna().to_numpy(dtype=np.float64))
+    return np.column_stack(cols)
+
+
+@traced("attribution.cube")
+def build_attribution_cube(results: pd.DataFrame, book: PricedBook | None = None) -> AttributionCube:
+    """Aggregate results into the rollup cube in a single pass over positions.
+
+    Pass the `book` the results were priced from to reuse its integer codes instead of re-factorizing.
+    """
+    if book is not None and len(book) != len(results):
+        book = None
+
+    codes: dict[str, np.ndarray] = {}
+    labels: dict[str, pd.Index] = {}
+    for col in CUBE_DIMENSIONS:
+        codes[col], labels[col] = _dimension_codes(results, col, book)
+
+    ordered = [labels[c] for c in CUBE_DIMENSIONS]
+    cell_codes, cell_values, row_cell = _rollup([codes[c] for c in CUBE_DIMENSIONS], ordered, value_matrix(results))
+    return AttributionCube(
+        cell_codes=dict(zip(CUBE_DIMENSIONS, cell_codes)),
+        labels=labels,
+        cell_values=cell_values,
+        row_cell=row_cell,
+        results=results,
+        book=book,
+    )
+
+
+def attribution_views(results: pd.DataFrame, book: PricedBook | None = None) -> dict[str, pd.DataFrame]:
+    return build_attribution_cube(results, book).views()
+
+
 def by_asset_class(results: pd.DataFrame) -> pd.DataFrame:
-    return _aggregate(results, ["asset_class"])
+    return build_attribution_cube(results).view("asset_class")
 
 
 def by_risk_factor(results: pd.DataFrame) -> pd.DataFrame:
-    rows = []
-    for factor, col in {
-        "Delta": "pnl_delta",
-        "Gamma": "pnl_gamma",
-        "Vega": "pnl_vega",
-        "Rho": "pnl_rho",
-        "CS01": "pnl_cs01",
-        "Theta": "pnl_theta",
-        "Convexity": "pnl_convexity",
-        "CrossGamma": "pnl_cross_gamma",
-        "Funding": "pnl_funding",
-        "Liquidity": "pnl_liquidity",
-    }.items():
-        rows.append({"risk_factor": factor, "pnl": float(results[col].sum())})
-    out = pd.DataFrame(rows).sort_values("pnl")
-    total = out["pnl"].sum()
-    out["pct_total"] = 0.0 if abs(total) < 1e-9 else out["pnl"] / total * 100.0
-    out["rank"] = out["pnl"].rank(method="dense", ascending=True).astype(int)
-    return out
+    return build_attribution_cube(results).risk_factors()
 
 
 def by_desk(results: pd.DataFrame) -> pd.DataFrame:
-    return _aggregate(results, ["desk"])
+    return build_attribution_cube(results).view("desk")
 
 
 def by_book(results: pd.DataFrame) -> pd.DataFrame:
-    return _aggregate(results, ["desk", "book"])
+    return build_attribution_cube(results).view("book")
 
 
 def by_position(results: pd.DataFrame) -> pd.DataFrame:
-    return _aggregate(results, ["instrument_id", "desk", "book", "asset_class"]) 
+    return build_attribution_cube(results).view("position")
 
 
 def by_geography(results: pd.DataFrame) -> pd.DataFrame:
-    if "geography" not in results.columns:
-        tmp = results.copy()
-        tmp["geography"] = "Unknown"
-        return _aggregate(tmp, ["geography"])
-    return _aggregate(results, ["geography"])
+    return build_attribution_cube(results).view("geography")
 
 
 def by_tenor_bucket(results: pd.DataFrame) -> pd.DataFrame:
-    if "tenor" not in results.columns:
-        tmp = results.copy()
-        tmp["tenor"] = "N/A"
-        return _aggregate(tmp, ["tenor"])
-    return _aggregate(results, ["tenor"])
+    return build_attribution_cube(results).view("tenor")
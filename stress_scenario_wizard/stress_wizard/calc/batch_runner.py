@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import json
+import logging
+import math
+import multiprocessing
+import os
+from pathlib import Path
+import time
+from typing import Any, Callable
+import uuid
+
+import pandas as pd
+
+from stress_wizard.calc.book import PricedBook, build_priced_book
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix, build_driver_sensitivity_matrix
+from stress_wizard.calc.engine import MOVE_COLUMNS, PNL_COLUMNS, CalculationConfig, compute_pnl, portfolio_summary
+from stress_wizard.calc.result_cache import ResultCache
+from stress_wizard.calc.shared_book import AttachedBlock, SharedBlockHandle, attach_book, publish_book
+from stress_wizard.data.columnar_store import open_bundle, write_table_batches
+from stress_wizard.exporter.persistence import list_scenario_dirs, read_driver_shocks, read_scenario_config
+
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ("instrument_id", "asset_class", "desk", "book", *MOVE_COLUMNS, *PNL_COLUMNS, "pnl_total")
+RUNS_DIR_NAME = "batch_runs"
+RUN_MANIFEST_NAME = "run_manifest.json"
+# Tasks per worker, so a slow scenario does not leave the other cores idle at the end of the run.
+TASKS_PER_WORKER = 4
+
+
+@dataclass(slots=True)
+class BatchSettings:
+    correlation_regime: float = 0.35
+    liquidity_bps: float = 12.0
+    funding_spread_bps: float = 25.0
+
+
+@dataclass(slots=True)
+class ScenarioRun:
+    folder: str
+    scenario_id: str | None = None
+    name: str | None = None
+    status: str = "pending"
+    pnl_total: float | None = None
+    rows: int = 0
+    seconds: float = 0.0
+    results_path: str | None = None
+    error: str | None = None
+    cached: bool = False
+    summary: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _WorkerBook:
+    book: PricedBook
+    driver_matrix: DriverSensitivityMatrix | None
+    block: AttachedBlock
+    cache: ResultCache | None = None
+    book_fingerprint: str | None = None  # computed by the parent, which still has the source frames
+
+
+# Per-process state set by `_init_worker`: views over the book the parent published.
+_WORKER: _WorkerBook | None = None
+
+
+def _init_worker(handle: SharedBlockHandle, cache_root: str | None = None, book_fingerprint: str | None = None) -> None:
+    global _WORKER
+    book, matrix, block = attach_book(handle)
+    cache = ResultCache(cache_root) if cache_root is not None else None
+    _WORKER = _WorkerBook(book=book, driver_matrix=matrix, block=block, cache=cache, book_fingerprint=book_fingerprint)
+
+
+def _run_scenario(scenario_dir: Path, results_dir: Path, settings: BatchSettings) -> ScenarioRun:
+    run = ScenarioRun(folder=scenario_dir.name)
+    started = time.perf_counter()
+    try:
+        payload = read_scenario_config(scenario_dir)
+        meta = payload.get("metadata", {})
+        run.scenario_id, run.name = meta.get("scenario_id"), meta.get("name")
+        config = CalculationConfig(horizon_days=int(meta.get("horizon_days", 10)), **asdict(settings))
+        asset_class_shocks = payload.get("shocks", {}).get("asset_class_shocks", {})
+        driver_shocks = read_driver_shocks(scenario_dir)
+        cache, key, entry = _WORKER.cache, None, None
+        if cache is not None:
+            key = cache.key_for(_WORKER.book, asset_class_shocks, driver_shocks, config, _WORKER.driver_matrix, book_fingerprint=_WORKER.book_fingerprint)
+            entry = cache.get(key, ["results"])
+        if entry is not None:
+            results, run.summary, run.cached = entry.tables["results"], entry.summary, True
+        else:
+            results = compute_pnl(
+                None,
+                None,
+                asset_class_shocks,
+                driver_shocks=driver_shocks,
+                config=config,
+                book=_WORKER.book,
+                driver_matrix=_WORKER.driver_matrix,
+            )
+            run.summary = portfolio_summary(results)
+            if cache is not None:
+                cache.put(key, {"results": results}, run.summary)
+        path = results_dir / f"{scenario_dir.name}.arrow"
+        run.rows = write_table_batches([results[[c for c in RESULT_COLUMNS if c in results.columns]]], path)
+        run.pnl_total = run.summary["pnl_total"]
+        run.results_path = path.name
+        run.status = "ok"
+    except Exception as exc:  # a bad scenario is reported in the manifest, not fatal to the run
+        run.status = "failed"
+        run.error = f"{type(exc).__name__}: {exc}"
+    run.seconds = time.perf_counter() - started
+    return run
+
+
+def _run_shard(scenario_dirs: list[Path], results_dir: Path, settings: BatchSettings) -> list[ScenarioRun]:
+    return [_run_scenario(path, results_dir, settings) for path in scenario_dirs]
+
+
+def shard(items: list[Any], shards: int) -> list[list[Any]]:
+    size = max(1, math.ceil(len(items) / max(1, shards)))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def run_batch(
+    root: Path | str,
+    bundle_name: str,
+    scenario_dirs: list[Path] | None = None,
+    output_dir: Path | str | None = None,
+    workers: int | None = None,
+    settings: BatchSettings | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    use_cache: bool = True,
+) -> dict[str, Any]:
+    """Price saved scenarios against a stored bundle on a process pool.
+
+    The bundle written by `columnar_store.save_bundle` is priced into a book once and published
+    to shared memory; workers attach to it without copying and scenarios are sharded across them.
+    Per-scenario results are Arrow IPC files next to a `run_manifest.json` and a `summary.arrow`
+    of scenario totals. Returns the manifest.
+
+    With `use_cache`, scenarios whose inputs are unchanged since an earlier batch or UI run are
+    read from the root's `ResultCache` instead of being priced, and new results are stored there.
+    """
+    root = Path(root)
+    settings = settings or BatchSettings()
+    scenario_dirs = list_scenario_dirs(root) if scenario_dirs is None else scenario_dirs
+    workers = max(1, min(workers or os.cpu_count() or 1, len(scenario_dirs) or 1))
+    run_id = uuid.uuid4().hex[:8]
+    started_at = datetime.now()
+    out = Path(output_dir) if output_dir else root / RUNS_DIR_NAME / f"{started_at:%Y-%m-%d_%H%M%S}_{run_id}"
+    results_dir = out / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    runs: list[ScenarioRun] = []
+    if scenario_dirs:
+        # Spawned workers start clean (no inherited Qt or thread state) on every platform.
+        context = multiprocessing.get_context("spawn")
+        bundle = open_bundle(root, bundle_name)
+        book = build_priced_book(bundle.positions, bundle.sensitivities)
+        matrix = None if bundle.driver_sensitivities.empty else build_driver_sensitivity_matrix(bundle.driver_sensitivities, book)
+        cache_args = (str(root), ResultCache(root).book_fingerprint(book)) if use_cache else (None, None)
+        with publish_book(book, matrix) as shared, ProcessPoolExecutor(
+            workers, mp_context=context, initializer=_init_worker, initargs=(shared.handle, *cache_args)
+        ) as pool:
+            futures = [pool.submit(_run_shard, part, results_dir, settings) for part in shard(scenario_dirs, workers * TASKS_PER_WORKER)]
+            for future in as_completed(futures):
+                runs.extend(future.result())
+                if progress is not None:
+                    progress(len(runs), len(scenario_dirs))
+
+    order = {path.name: i for i, path in enumerate(scenario_dirs)}
+    runs.sort(key=lambda r: order[r.folder])
+    ok = [r for r in runs if r.status == "ok"]
+    if ok:
+        summary = pd.DataFrame([{"folder": r.folder, "scenario_id": r.scenario_id, "name": r.name, **r.summary} for r in ok])
+        write_table_batches([summary], out / "summary.arrow")
+
+    manifest = {
+        "run_id": run_id,
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now().isoformat(),
+        "root": str(root),
+        "bundle": bundle_name,
+        "workers": workers,
+        "settings": asdict(settings),
+        "scenario_count": len(runs),
+        "succeeded": len(ok),
+        "failed": len(runs) - len(ok),
+        "cached": sum(r.cached for r in ok),
+        "scenarios": [{k: v for k, v in asdict(r).items() if k != "summary"} for r in runs],
+    }
+    (out / RUN_MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    logger.info("Batch run %s: %s/%s scenarios priced on %s workers", run_id, len(ok), len(runs), workers)
+    manifest["output_dir"] = str(out)
+    return manifest
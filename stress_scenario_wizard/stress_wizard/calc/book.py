@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.instrumentation import span, traced
+
+
+GREEK_COLUMNS = (
+    "delta",
+    "gamma",
+    "vega",
+    "rho",
+    "cs01",
+    "theta",
+    "convexity",
+    "cross_gamma",
+)
+
+CODED_COLUMNS = ("asset_class", "desk", "book", "geography")
+
+
+@dataclass(slots=True)
+class PricedBook:
+    """Positions joined with sensitivities once, laid out as NumPy arrays.
+
+    `greeks` is (len(GREEK_COLUMNS), positions) so each greek row is contiguous.
+    `codes[col]` holds int32 codes into `labels[col]` for each of CODED_COLUMNS.
+    """
+
+    frame: pd.DataFrame
+    direction: np.ndarray
+    notional: np.ndarray
+    greeks: np.ndarray
+    codes: dict[str, np.ndarray] = field(default_factory=dict)
+    labels: dict[str, list[str]] = field(default_factory=dict)
+    positions: pd.DataFrame | None = field(default=None, repr=False)
+    sensitivities: pd.DataFrame | None = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return int(self.greeks.shape[1])
+
+    @property
+    def asset_classes(self) -> list[str]:
+        return self.labels["asset_class"]
+
+    @property
+    def asset_class_code(self) -> np.ndarray:
+        return self.codes["asset_class"]
+
+    def greek(self, name: str) -> np.ndarray:
+        return self.greeks[GREEK_COLUMNS.index(name)]
+
+    def take(self, rows: np.ndarray) -> PricedBook:
+        """Sub-book for the given row positions (used to reprice a handful of positions)."""
+        return PricedBook(
+            frame=self.frame.iloc[rows].reset_index(drop=True),
+            direction=self.direction[rows],
+            notional=self.notional[rows],
+            greeks=np.ascontiguousarray(self.greeks[:, rows]),
+            codes={col: codes[rows] for col, codes in self.codes.items()},
+            labels=self.labels,
+        )
+
+    def is_built_from(self, positions: pd.DataFrame, sensitivities: pd.DataFrame) -> bool:
+        return self.positions is positions and self.sensitivities is sensitivities
+
+
+def _numeric(frame: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    if col not in frame.columns:
+        return np.full(len(frame), default, dtype=np.float64)
+    return pd.to_numeric(frame[col], errors="coerce").fillna(default).to_numpy(dtype=np.float64)
+
+
+def _factorize(frame: pd.DataFrame, col: str) -> tuple[np.ndarray, list[str]]:
+    if col not in frame.columns:
+        return np.zeros(len(frame), dtype=np.int32), ["Unknown"]
+    column = frame[col]
+    if column.hasnans:
+        column = column.astype(object).fillna("Unknown")
+    codes, uniques = pd.factorize(column.astype(str))
+    return codes.astype(np.int32), [str(x) for x in uniques]
+
+
+@traced("calc.build_priced_book")
+def build_priced_book(positions: pd.DataFrame, sensitivities: pd.DataFrame) -> PricedBook:
+    with span("calc.merge", rows=len(positions)):
+        merged = positions.merge(sensitivities, on="instrument_id", how="left", suffixes=("", "_sens"))
+        # Only numeric columns are zero-filled; text nulls stay null (Arrow string columns reject 0.0).
+        numeric = merged.select_dtypes("number").columns
+        merged[numeric] = merged[numeric].fillna(0.0)
+
+    direction = _numeric(merged, "direction", 1.0)
+    # Not in place: the array may be a read-only view of a memory-mapped column.
+    direction = np.where(direction == 0, 1.0, direction)
+
+    codes: dict[str, np.ndarray] = {}
+    labels: dict[str, list[str]] = {}
+    for col in CODED_COLUMNS:
+        codes[col], labels[col] = _factorize(merged, col)
+
+    return PricedBook(
+        frame=merged,
+        direction=direction,
+        notional=_numeric(merged, "notional"),
+        greeks=np.ascontiguousarray(np.vstack([_numeric(merged, col) for col in GREEK_COLUMNS])),
+        codes=codes,
+        labels=labels,
+        positions=positions,
+        sensitivities=sensitivities,
+    )
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+MOVE_FACTORS = ("dS", "dVol", "dR", "dSpread")
+DEFAULT_ASSET_CLASSES = ("Rates", "FX", "Equities", "Credit", "Commodities", "Volatility")
+
+# Within one asset class: spot/vol co-movement goes from 0.15 to full under stress, matching
+# the engine's historical cross-gamma scaling (and driver loading) of 0.15 + 0.85 * regime.
+NORMAL_MOVE_CORRELATION = np.array(
+    [
+        [1.00, 0.15, 0.10, 0.10],
+        [0.15, 1.00, 0.10, 0.10],
+        [0.10, 0.10, 1.00, 0.30],
+        [0.10, 0.10, 0.30, 1.00],
+    ]
+)
+STRESSED_MOVE_CORRELATION = np.array(
+    [
+        [1.00, 1.00, 0.40, 0.40],
+        [1.00, 1.00, 0.40, 0.40],
+        [0.40, 0.40, 1.00, 0.60],
+        [0.40, 0.40, 0.60, 1.00],
+    ]
+)
+NORMAL_CROSS_ASSET = 0.20
+STRESSED_CROSS_ASSET = 0.70
+# Cached blends per model; a slider sweep revisits the same handful of regimes.
+CACHE_SIZE = 64
+MIN_EIGENVALUE = 1e-10
+# Drivers always keep some idiosyncratic variance.
+MAX_SYSTEMATIC_SHARE = 0.999
+
+
+def is_positive_definite(matrix: np.ndarray) -> bool:
+    try:
+        np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        return False
+    return True
+
+
+def nearest_correlation(matrix: np.ndarray, max_iter: int = 100, tol: float = 1e-10, min_eigenvalue: float = MIN_EIGENVALUE) -> np.ndarray:
+    """Nearest positive-definite correlation matrix (Higham 2002 alternating projections).
+
+    Alternates between the PSD cone (with Dykstra's correction) and unit-diagonal matrices, then
+    floors the eigenvalues at `min_eigenvalue` so the result always has a Cholesky factor.
+    """
+    y = (matrix + matrix.T) / 2.0
+    correction = np.zeros_like(y)
+    for _ in range(max_iter):
+        r = y - correction
+        values, vectors = np.linalg.eigh(r)
+        x = (vectors * np.maximum(values, 0.0)) @ vectors.T
+        correction = x - r
+        previous, y = y, x.copy()
+        np.fill_diagonal(y, 1.0)
+        if np.linalg.norm(y - previous, "fro") <= tol * max(np.linalg.norm(y, "fro"), 1.0):
+            break
+
+    values, vectors = np.linalg.eigh((y + y.T) / 2.0)
+    y = (vectors * np.maximum(values, min_eigenvalue)) @ vectors.T
+    scale = 1.0 / np.sqrt(np.diag(y))
+    y = y * scale[:, None] * scale[None, :]
+    np.fill_diagonal(y, 1.0)
+    return y
+
+
+@dataclass(slots=True)
+class RegimeMatrix:
+    matrix: np.ndarray
+    cholesky: np.ndarray
+    repaired: bool
+
+
+@dataclass(eq=False, slots=True)
+class CorrelationModel:
+    """Normal and stressed correlation matrices between asset-class move factors.
+
+    Factors are `f"{asset_class}.{move}"` for each asset class and MOVE_FACTORS, asset-class
+    major. `at(regime)` blends the two linearly, repairs the blend to the nearest positive-
+    definite correlation matrix if needed, and caches it with its Cholesky factor.
+    """
+
+    asset_classes: list[str]
+    normal: np.ndarray
+    stressed: np.ndarray
+    _cache: OrderedDict[float, RegimeMatrix] = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        n = len(self.asset_classes) * len(MOVE_FACTORS)
+        for name in ("normal", "stressed"):
+            value = np.asarray(getattr(self, name), dtype=np.float64)
+            if value.shape != (n, n):
+                raise ValueError(f"{name} correlation must be {n}x{n} for {len(self.asset_classes)} asset classes, got {value.shape}")
+            if not np.allclose(value, value.T) or not np.allclose(np.diag(value), 1.0):
+                raise ValueError(f"{name} correlation must be symmetric with a unit diagonal")
+            setattr(self, name, value)
+
+    @property
+    def factors(self) -> list[str]:
+        return [f"{ac}.{move}" for ac in self.asset_classes for move in MOVE_FACTORS]
+
+    def at(self, regime: float) -> RegimeMatrix:
+        key = round(float(np.clip(regime, 0.0, 1.0)), 6)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        blended = (1.0 - key) * self.normal + key * self.stressed
+        repaired = not is_positive_definite(blended)
+        if repaired:
+            blended = nearest_correlation(blended)
+        entry = RegimeMatrix(matrix=blended, cholesky=np.linalg.cholesky(blended), repaired=repaired)
+        self._cache[key] = entry
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return entry
+
+    def _factor_index(self, asset_classes: list[str]) -> np.ndarray:
+        """Model factor index for each (asset class, move) in `asset_classes` order; -1 if unknown."""
+        known = {ac: i for i, ac in enumerate(self.asset_classes)}
+        width = len(MOVE_FACTORS)
+        return np.array([known[ac] * width + m if ac in known else -1 for ac in asset_classes for m in range(width)], dtype=np.intp)
+
+    def factor_cholesky(self, asset_classes: list[str], regime: float) -> np.ndarray:
+        """Cholesky factor over `asset_classes` x MOVE_FACTORS; unknown classes are independent."""
+        entry = self.at(regime)
+        index = self._factor_index(asset_classes)
+        known = index >= 0
+        if known.all() and len(index) == len(entry.matrix) and (index == np.arange(len(index))).all():
+            return entry.cholesky
+        sub = np.eye(len(index))
+        sub[np.ix_(known, known)] = entry.matrix[np.ix_(index[known], index[known])]
+        # A principal submatrix of a PD matrix is PD, so this never needs another repair.
+        return np.linalg.cholesky(sub)
+
+    def spot_vol_correlation(self, asset_classes: list[str], regime: float) -> np.ndarray:
+        """Per asset class correlation of its dS and dVol factors (drives cross-gamma P&L).
+
+        Asset classes the model does not know fall back to the normal/stressed defaults.
+        """
+        matrix = self.at(regime).matrix
+        fallback = (1.0 - regime) * NORMAL_MOVE_CORRELATION[0, 1] + regime * STRESSED_MOVE_CORRELATION[0, 1]
+        known = {ac: i for i, ac in enumerate(self.asset_classes)}
+        width = len(MOVE_FACTORS)
+        return np.array(
+            [matrix[known[ac] * width, known[ac] * width + 1] if ac in known else fallback for ac in asset_classes],
+            dtype=np.float64,
+        )
+
+    def driver_systematic_share(self, asset_classes: list[str], regime: float) -> np.ndarray:
+        """Per asset class share of a driver shock's variance explained by the class's spot factor.
+
+        Read off the model's spot/vol co-movement at the regime, clipped to [0, MAX_SYSTEMATIC_SHARE].
+        """
+        return np.clip(self.spot_vol_correlation(asset_classes, regime), 0.0, MAX_SYSTEMATIC_SHARE)
+
+
+def kronecker_correlation(cross_asset: float, asset_classes: int, moves: np.ndarray) -> np.ndarray:
+    """Equicorrelated asset classes (x) a move-factor block; PSD whenever both parts are."""
+    classes = (1.0 - cross_asset) * np.eye(asset_classes) + cross_asset * np.ones((asset_classes, asset_classes))
+    return np.kron(classes, moves)
+
+
+def default_correlation_model(asset_classes: list[str] | tuple[str, ...] = DEFAULT_ASSET_CLASSES) -> CorrelationModel:
+    n = len(asset_classes)
+    return CorrelationModel(
+        asset_classes=list(asset_classes),
+        normal=kronecker_correlation(NORMAL_CROSS_ASSET, n, NORMAL_MOVE_CORRELATION),
+        stressed=kronecker_correlation(STRESSED_CROSS_ASSET, n, STRESSED_MOVE_CORRELATION),
+    )
+
+
+_DEFAULT_MODEL: CorrelationModel | None = None
+
+
+def shared_default_model() -> CorrelationModel:
+    """Process-wide default model, so its Cholesky cache is reused across calculations."""
+    global _DEFAULT_MODEL
+    if _DEFAULT_MODEL is None:
+        _DEFAULT_MODEL = default_correlation_model()
+    return _DEFAULT_MODEL
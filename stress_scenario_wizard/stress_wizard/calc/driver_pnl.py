@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from stress_wizard.calc.book import PricedBook
+
+
+LONG_SENSITIVITY_COLUMNS = ("instrument_id", "driver_id", "delta")
+
+
+@dataclass(slots=True)
+class DriverSensitivityMatrix:
+    """Position x driver sensitivities in CSR form, with rows aligned to a PricedBook.
+
+    `delta[p, d]` is the delta of position p to driver d; `gamma[p, d]`, when the long file has a
+    gamma column, is the matching own-gamma. Positions without any row are left to the asset-class
+    engine.
+    """
+
+    driver_ids: pd.Index
+    delta: sparse.csr_matrix
+    gamma: sparse.csr_matrix | None = None
+    abs_delta: sparse.csr_matrix = field(init=False, repr=False)
+    source: pd.DataFrame | None = field(default=None, repr=False)
+    book: PricedBook | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self.abs_delta = abs(self.delta)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.delta.shape
+
+    def is_built_for(self, long_sensitivities: pd.DataFrame, book: PricedBook) -> bool:
+        return self.source is long_sensitivities and self.book is book
+
+    def loaded_rows(self) -> np.ndarray:
+        return np.diff(self.delta.indptr) > 0
+
+    def take(self, rows: np.ndarray) -> DriverSensitivityMatrix:
+        return DriverSensitivityMatrix(
+            driver_ids=self.driver_ids,
+            delta=self.delta[rows],
+            gamma=None if self.gamma is None else self.gamma[rows],
+        )
+
+    def shock_vector(self, driver_shocks: pd.DataFrame | None) -> tuple[np.ndarray, np.ndarray]:
+        """Shock per matrix column and a mask of the drivers actually shocked (last row wins)."""
+        if driver_shocks is None or driver_shocks.empty or not {"driver_id", "shock"}.issubset(driver_shocks.columns):
+            return np.zeros(len(self.driver_ids)), np.zeros(len(self.driver_ids), dtype=bool)
+        deduped = driver_shocks.drop_duplicates("driver_id", keep="last")
+        lookup = pd.Series(pd.to_numeric(deduped["shock"], errors="coerce").to_numpy(dtype=np.float64), index=deduped["driver_id"].to_numpy())
+        values = lookup.reindex(self.driver_ids).to_numpy(dtype=np.float64)
+        shocked = ~np.isnan(values)
+        return np.where(shocked, values, 0.0), shocked
+
+    def driver_rows(self) -> tuple[pd.Index, np.ndarray, np.ndarray]:
+        """CSC view as (driver_ids, offsets, rows): rows[offsets[j]:offsets[j + 1]] load on driver j."""
+        csc = self.delta.tocsc()
+        return self.driver_ids, csc.indptr.astype(np.intp), csc.indices.astype(np.intp)
+
+
+@dataclass(slots=True)
+class DriverTerms:
+    """Driver-level P&L pieces for the loaded rows of a book; arrays broadcast like the asset-class dS."""
+
+    loaded: np.ndarray
+    delta_pnl: np.ndarray
+    effective_move: np.ndarray
+    gamma_pnl: np.ndarray | None = None
+
+
+def driver_terms(matrix: DriverSensitivityMatrix, ds: np.ndarray, driver_shocks: pd.DataFrame | None) -> DriverTerms:
+    """Sparse P&L kernel: Delta @ s for shocked drivers, with unshocked drivers moving by the position's dS.
+
+    `ds` is the asset-class spot move, (positions,) or (scenarios, positions).
+    """
+    shock, shocked = matrix.shock_vector(driver_shocks)
+    unshocked = (~shocked).astype(np.float64)
+
+    delta_pnl = matrix.delta @ shock + ds * (matrix.delta @ unshocked)
+
+    # |delta|-weighted average move, fed to the position-level second-order greeks.
+    weight = np.asarray(matrix.abs_delta.sum(axis=1)).ravel()
+    moved = matrix.abs_delta @ shock + ds * (matrix.abs_delta @ unshocked)
+    effective = np.divide(moved, weight, out=np.broadcast_to(ds, moved.shape).astype(np.float64), where=weight > 0)
+
+    gamma_pnl = None
+    if matrix.gamma is not None:
+        gamma_pnl = 0.5 * (matrix.gamma @ np.square(shock) + np.square(ds) * (matrix.gamma @ unshocked))
+    return DriverTerms(loaded=matrix.loaded_rows(), delta_pnl=delta_pnl, effective_move=effective, gamma_pnl=gamma_pnl)
+
+
+def build_driver_sensitivity_matrix(long_sensitivities: pd.DataFrame, book: PricedBook) -> DriverSensitivityMatrix:
+    """Build the CSR matrix from long-format rows (instrument_id, driver_id, delta[, gamma]).
+
+    Every book position of an instrument gets that instrument's row; repeated (instrument, driver)
+    pairs are summed.
+    """
+    missing = [c for c in LONG_SENSITIVITY_COLUMNS if c not in long_sensitivities.columns]
+    if missing:
+        raise ValueError(f"Driver sensitivities missing columns: {', '.join(missing)}")
+
+    inst_codes, instruments = pd.factorize(long_sensitivities["instrument_id"])
+    driver_codes, driver_ids = pd.factorize(long_sensitivities["driver_id"])
+    keep = (inst_codes >= 0) & (driver_codes >= 0)
+    shape = (len(instruments) + 1, len(driver_ids))  # trailing empty row for unmatched positions
+
+    # Map each book position to its instrument row, or the empty row.
+    position_rows = pd.Index(instruments).get_indexer(book.frame["instrument_id"])
+    position_rows = np.where(position_rows < 0, len(instruments), position_rows)
+
+    def matrix(col: str) -> sparse.csr_matrix:
+        values = pd.to_numeric(long_sensitivities[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+        by_instrument = sparse.csr_matrix((values[keep], (inst_codes[keep], driver_codes[keep])), shape=shape)
+        by_instrument.sum_duplicates()
+        return by_instrument[position_rows]
+
+    return DriverSensitivityMatrix(
+        driver_ids=pd.Index(driver_ids),
+        delta=matrix("delta"),
+        gamma=matrix("gamma") if "gamma" in long_sensitivities.columns else None,
+        source=long_sensitivities,
+        book=book,
+    )
@@ -1,11 +1,33 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 import numpy as np
 import pandas as pd
 
+from stress_wizard.calc.book import PricedBook, build_priced_book
+from stress_wizard.calc.correlation import CorrelationModel, shared_default_model
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix, DriverTerms, driver_terms
+from stress_wizard.calc.revaluation import BookGrid
+from stress_wizard.instrumentation import span, traced
+
+
+MOVE_COLUMNS = ("dS", "dVol", "dR", "dSpread")
+
+PNL_COLUMNS = [
+    "pnl_delta",
+    "pnl_gamma",
+    "pnl_vega",
+    "pnl_rho",
+    "pnl_cs01",
+    "pnl_theta",
+    "pnl_convexity",
+    "pnl_cross_gamma",
+    "pnl_funding",
+    "pnl_liquidity",
+]
+
 
 @dataclass(slots=True)
 class CalculationConfig:
@@ -13,91 +35,368 @@ class CalculationConfig:
     correlation_regime: float = 0.35  # 0=normal, 1=crisis
     liquidity_bps: float = 12.0
     funding_spread_bps: float = 25.0
+    revaluation_method: str = "bilinear"  # interpolation for full-revaluation grids
+    correlation: CorrelationModel | None = None  # None uses the shared default regime model
 
+    @property
+    def correlation_model(self) -> CorrelationModel:
+        return self.correlation or shared_default_model()
+
+
+def _asset_class_moves(values: dict[str, float]) -> tuple[float, float, float, float]:
+    ds = float(
+        values.get("index_pct")
+        or values.get("spot_pct")
+        or values.get("parallel_shift_bp", 0.0) / 10000.0
+        or values.get("energy_pct", 0.0)
+    )
+    dvol = float(values.get("vol_pct") or values.get("vol_atm_pct") or values.get("vix_pts", 0.0) / 100.0)
+    dr = float(values.get("parallel_shift_bp", 0.0) / 10000.0)
+    dspread = float(values.get("ig_bp", 0.0) / 10000.0)
+    return ds, dvol, dr, dspread
+
+
+def shock_matrix(scenarios: list[dict[str, dict[str, float]]], asset_classes: list[str]) -> np.ndarray:
+    """Stack scenarios into a (scenarios, asset classes, 4) array of dS/dVol/dR/dSpread moves."""
+    out = np.zeros((len(scenarios), len(asset_classes), len(MOVE_COLUMNS)), dtype=np.float64)
+    index = {ac: i for i, ac in enumerate(asset_classes)}
+    for s, shocks in enumerate(scenarios):
+        for asset_class, values in shocks.items():
+            if asset_class in index:
+                out[s, index[asset_class]] = _asset_class_moves(values)
+    return out
+
+
+def _driver_ds_override(frame: pd.DataFrame, driver_shocks: pd.DataFrame | None) -> np.ndarray | None:
+    if driver_shocks is None or driver_shocks.empty or "driver_id" not in driver_shocks.columns or "driver_id" not in frame.columns:
+        return None
+    lookup = driver_shocks.drop_duplicates("driver_id", keep="last").set_index("driver_id")["shock"]
+    return frame["driver_id"].map(lookup).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _driver_spot_moves(
+    frame: pd.DataFrame,
+    ds: np.ndarray,
+    driver_shocks: pd.DataFrame | None,
+    driver_matrix: DriverSensitivityMatrix | None,
+) -> tuple[np.ndarray, np.ndarray | None, DriverTerms | None]:
+    """Spot move after driver shocks, the applied driver shock (NaN where none) and the matrix terms.
+
+    Positions loading on the matrix move by its effective move; the rest keep the driver_id override.
+    """
+    override = _driver_ds_override(frame, driver_shocks)
+    terms = None if driver_matrix is None else driver_terms(driver_matrix, ds, driver_shocks)
+    shock = override
+    if terms is not None:
+        shock = np.where(terms.loaded, terms.effective_move, np.nan if override is None else override)
+    if shock is not None:
+        ds = np.where(np.isnan(shock), ds, shock)
+    return ds, shock, terms
+
+
+def _position_moves(book: PricedBook, moves: np.ndarray) -> np.ndarray:
+    if moves.ndim != 3 or moves.shape[1:] != (len(book.asset_classes), len(MOVE_COLUMNS)):
+        raise ValueError(f"Shock matrix must be (scenarios, {len(book.asset_classes)}, {len(MOVE_COLUMNS)}), got {moves.shape}")
+    # Pad with a zero row so positions whose asset class is not shocked map to no move.
+    padded = np.concatenate([moves, np.zeros((moves.shape[0], 1, len(MOVE_COLUMNS)))], axis=1)
+    codes = np.where(book.asset_class_code < 0, len(book.asset_classes), book.asset_class_code)
+    return padded[:, codes, :]
+
+
+def _position_spot_vol_correlation(book: PricedBook, config: CalculationConfig) -> np.ndarray:
+    # Regime-blended dS/dVol correlation of each position's asset class; the padded last entry
+    # covers positions with no asset class.
+    model = config.correlation_model
+    per_class = model.spot_vol_correlation(list(book.asset_classes) + [""], config.correlation_regime)
+    return per_class[np.where(book.asset_class_code < 0, len(book.asset_classes), book.asset_class_code)]
 
-def _asset_class_move_map(asset_class_shocks: dict[str, dict[str, float]]) -> pd.DataFrame:
-    rows = []
-    for asset_class, values in asset_class_shocks.items():
-        ds = float(
-            values.get("index_pct")
-            or values.get("spot_pct")
-            or values.get("parallel_shift_bp", 0.0) / 10000.0
-            or values.get("energy_pct", 0.0)
-        )
-        dvol = float(values.get("vol_pct") or values.get("vol_atm_pct") or values.get("vix_pts", 0.0) / 100.0)
-        dr = float(values.get("parallel_shift_bp", 0.0) / 10000.0)
-        dspread = float(values.get("ig_bp", 0.0) / 10000.0)
-        rows.append(
-            {
-                "asset_class": asset_class,
-                "dS": ds,
-                "dVol": dvol,
-                "dR": dr,
-                "dSpread": dspread,
-            }
-        )
-    return pd.DataFrame(rows)
+
+def _greek_pnl(
+    book: PricedBook,
+    ds: np.ndarray,
+    dvol: np.ndarray,
+    dr: np.ndarray,
+    dspread: np.ndarray,
+    config: CalculationConfig,
+) -> dict[str, np.ndarray]:
+    shape = np.broadcast_shapes(ds.shape, dvol.shape, dr.shape, dspread.shape)
+    dt = config.horizon_days / 365.0
+    corr = _position_spot_vol_correlation(book, config)
+    return {
+        "pnl_delta": book.greek("delta") * ds * book.direction,
+        "pnl_gamma": 0.5 * book.greek("gamma") * np.square(ds),
+        "pnl_vega": book.greek("vega") * dvol,
+        "pnl_rho": book.greek("rho") * dr,
+        "pnl_cs01": book.greek("cs01") * dspread,
+        "pnl_theta": np.broadcast_to(book.greek("theta") * dt, shape),
+        "pnl_convexity": 0.5 * book.greek("convexity") * np.square(dr),
+        "pnl_cross_gamma": book.greek("cross_gamma") * ds * dvol * corr,
+        "pnl_funding": np.broadcast_to(-abs(config.funding_spread_bps / 10000.0) * book.notional * 0.01, shape),
+        "pnl_liquidity": np.broadcast_to(-abs(config.liquidity_bps / 10000.0) * book.notional * 0.015, shape),
+    }
+
+
+def _apply_driver_terms(book: PricedBook, components: dict[str, np.ndarray], terms: DriverTerms) -> None:
+    # Positions with driver-level sensitivities take their delta (and gamma, if given) from the matrix.
+    components["pnl_delta"] = np.where(terms.loaded, terms.delta_pnl * book.direction, components["pnl_delta"])
+    if terms.gamma_pnl is not None:
+        components["pnl_gamma"] = np.where(terms.loaded, terms.gamma_pnl, components["pnl_gamma"])
+
+
+def _apply_revaluation(book: PricedBook, components: dict[str, np.ndarray], grid: BookGrid, ds: np.ndarray, dvol: np.ndarray, method: str) -> None:
+    # Positions with a ladder take spot/vol P&L from the grid. The split keeps attribution readable:
+    # Gamma is the nonlinear spot residual over the (linear) delta term, CrossGamma the joint term.
+    covered = grid.covered
+    spot, vol, full = (move * book.direction for move in grid.pnl_moves(ds, dvol, method))
+    components["pnl_gamma"] = np.where(covered, spot - components["pnl_delta"], components["pnl_gamma"])
+    components["pnl_vega"] = np.where(covered, vol, components["pnl_vega"])
+    components["pnl_cross_gamma"] = np.where(covered, full - spot - vol, components["pnl_cross_gamma"])
 
 
+def _sum_components(components: dict[str, np.ndarray]) -> np.ndarray:
+    total = np.zeros(np.broadcast_shapes(*(arr.shape for arr in components.values())), dtype=np.float64)
+    for col in PNL_COLUMNS:
+        total += components[col]
+    return total
+
+
+@traced("calc.compute_pnl")
 def compute_pnl(
     positions: pd.DataFrame,
     sensitivities: pd.DataFrame,
     asset_class_shocks: dict[str, dict[str, float]],
     driver_shocks: pd.DataFrame | None = None,
     config: CalculationConfig | None = None,
+    book: PricedBook | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
 ) -> pd.DataFrame:
     """Compute stress P&L with first and second order terms.
 
     Required columns:
     - positions: instrument_id, asset_class, notional, direction, desk, book
     - sensitivities: instrument_id, delta, gamma, vega, rho, cs01, theta, convexity, cross_gamma
+
+    Pass a cached `book` (see `calc.book.build_priced_book`) to skip the join. With a
+    `driver_matrix` (see `calc.driver_pnl`), positions loading on drivers are priced from
+    their driver-level sensitivities instead of the single driver_id dS override (which still
+    applies to positions with no rows in the matrix). With a
+    `revaluation` grid (see `calc.revaluation`), covered positions take spot/vol P&L from their
+    interpolated ladders instead of the Taylor expansion.
     """
     if config is None:
         config = CalculationConfig()
+    if book is None:
+        book = build_priced_book(positions, sensitivities)
 
-    merged = positions.merge(sensitivities, on="instrument_id", how="left", suffixes=("", "_sens"))
-    merged = merged.fillna(0.0)
+    with span("calc.shock_moves", rows=len(book)):
+        moves = _position_moves(book, shock_matrix([asset_class_shocks], book.asset_classes))[0]
+        merged = book.frame.copy(deep=False)
+        for i, col in enumerate(MOVE_COLUMNS):
+            merged[col] = moves[:, i]
 
-    move_map = _asset_class_move_map(asset_class_shocks)
-    merged = merged.merge(move_map, on="asset_class", how="left")
-    merged[["dS", "dVol", "dR", "dSpread"]] = merged[["dS", "dVol", "dR", "dSpread"]].fillna(0.0)
+        ds, shock, terms = _driver_spot_moves(merged, merged["dS"].to_numpy(), driver_shocks, driver_matrix)
+        if shock is not None:
+            merged["shock"] = shock
+            merged["dS"] = ds
 
-    if driver_shocks is not None and not driver_shocks.empty and "driver_id" in driver_shocks.columns and "driver_id" in merged.columns:
-        merged = merged.merge(driver_shocks[["driver_id", "shock"]], on="driver_id", how="left")
-        merged["dS"] = np.where(merged["shock"].notna(), merged["shock"], merged["dS"])
+    with span("calc.greek_pnl", rows=len(book)):
+        components = _greek_pnl(
+            book,
+            merged["dS"].to_numpy(),
+            merged["dVol"].to_numpy(),
+            merged["dR"].to_numpy(),
+            merged["dSpread"].to_numpy(),
+            config,
+        )
+        if terms is not None:
+            _apply_driver_terms(book, components, terms)
+    if revaluation is not None:
+        with span("calc.revaluation", method=config.revaluation_method):
+            _apply_revaluation(book, components, revaluation, merged["dS"].to_numpy(), merged["dVol"].to_numpy(), config.revaluation_method)
+    for col in PNL_COLUMNS:
+        merged[col] = components[col]
+    merged["pnl_total"] = _sum_components(components)
+    return merged
 
-    direction = merged.get("direction", pd.Series(1.0, index=merged.index)).replace({0: 1.0})
-    dt = config.horizon_days / 365.0
 
-    merged["pnl_delta"] = merged["delta"] * merged["dS"] * direction
-    merged["pnl_gamma"] = 0.5 * merged["gamma"] * np.square(merged["dS"])
-    merged["pnl_vega"] = merged["vega"] * merged["dVol"]
-    merged["pnl_rho"] = merged["rho"] * merged["dR"]
-    merged["pnl_cs01"] = merged["cs01"] * merged["dSpread"]
-    merged["pnl_theta"] = merged["theta"] * dt
-    merged["pnl_convexity"] = 0.5 * merged["convexity"] * np.square(merged["dR"])
-
-    corr = 0.15 + 0.85 * config.correlation_regime
-    merged["pnl_cross_gamma"] = merged.get("cross_gamma", 0.0) * merged["dS"] * merged["dVol"] * corr
-
-    merged["pnl_funding"] = -abs(config.funding_spread_bps / 10000.0) * merged["notional"] * 0.01
-    merged["pnl_liquidity"] = -abs(config.liquidity_bps / 10000.0) * merged["notional"] * 0.015
-
-    pnl_cols = [
-        "pnl_delta",
-        "pnl_gamma",
-        "pnl_vega",
-        "pnl_rho",
-        "pnl_cs01",
-        "pnl_theta",
-        "pnl_convexity",
-        "pnl_cross_gamma",
-        "pnl_funding",
-        "pnl_liquidity",
-    ]
-
-    merged["pnl_total"] = merged[pnl_cols].sum(axis=1)
-    return merged
+@dataclass(slots=True)
+class BatchPnL:
+    """P&L for many scenarios over one book; arrays are (scenarios, positions)."""
+
+    instrument_ids: np.ndarray
+    pnl_total: np.ndarray
+    components: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def scenario_totals(self) -> np.ndarray:
+        return self.pnl_total.sum(axis=1)
+
+    def component_totals(self) -> pd.DataFrame:
+        out = pd.DataFrame({col: arr.sum(axis=1) for col, arr in self.components.items()})
+        out["pnl_total"] = self.scenario_totals()
+        return out
+
+
+def compute_pnl_batch(
+    book: PricedBook,
+    scenarios: np.ndarray | list[dict[str, dict[str, float]]],
+    driver_shocks: pd.DataFrame | None = None,
+    config: CalculationConfig | None = None,
+    include_components: bool = True,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+) -> BatchPnL:
+    """Price N scenarios over a pre-joined book in one vectorized pass.
+
+    `scenarios` is either a list of `asset_class_shocks` dicts or a stacked
+    (scenarios, len(book.asset_classes), 4) move array from `shock_matrix`.
+    """
+    if config is None:
+        config = CalculationConfig()
+
+    moves = shock_matrix(scenarios, book.asset_classes) if not isinstance(scenarios, np.ndarray) else np.asarray(scenarios, dtype=np.float64)
+    per_position = _position_moves(book, moves)
+    ds, dvol, dr, dspread = (per_position[..., i] for i in range(len(MOVE_COLUMNS)))
+
+    ds, _, terms = _driver_spot_moves(book.frame, ds, driver_shocks, driver_matrix)
+
+    components = _greek_pnl(book, ds, dvol, dr, dspread, config)
+    if terms is not None:
+        _apply_driver_terms(book, components, terms)
+    if revaluation is not None:
+        _apply_revaluation(book, components, revaluation, ds, dvol, config.revaluation_method)
+    return BatchPnL(
+        instrument_ids=book.frame["instrument_id"].to_numpy(),
+        pnl_total=_sum_components(components),
+        components=components if include_components else {},
+    )
+
+
+def taylor_pnl_paths(book: PricedBook, moves: np.ndarray, ds: np.ndarray | None = None, config: CalculationConfig | None = None) -> np.ndarray:
+    """Total Taylor P&L, (paths, positions), for a stacked (paths, asset classes, 4) move array.
+
+    `ds`, when given, is a (paths, positions) spot move used instead of the asset-class dS
+    wherever it is not NaN (per-path driver shocks).
+    """
+    if config is None:
+        config = CalculationConfig()
+    per_position = _position_moves(book, moves)
+    spot, dvol, dr, dspread = (per_position[..., i] for i in range(len(MOVE_COLUMNS)))
+    if ds is not None:
+        spot = np.where(np.isnan(ds), spot, ds)
+    return _sum_components(_greek_pnl(book, spot, dvol, dr, dspread, config))
+
+
+POLYNOMIAL_TERMS = ("dS", "dS^2", "dVol", "dR", "dSpread", "dR^2", "dS*dVol")
+
+
+def polynomial_terms(moves: np.ndarray) -> np.ndarray:
+    """(..., asset classes, len(POLYNOMIAL_TERMS)) monomials of a (..., asset classes, 4) move array."""
+    ds, dvol, dr, dspread = (moves[..., i] for i in range(len(MOVE_COLUMNS)))
+    return np.stack([ds, ds * ds, dvol, dr, dspread, dr * dr, ds * dvol], axis=-1)
+
+
+@dataclass(slots=True)
+class PnLPolynomial:
+    """Portfolio P&L as a quadratic in each asset class's dS/dVol/dR/dSpread moves.
+
+    `coefficients` is (asset classes, len(POLYNOMIAL_TERMS)); `constant` holds the
+    shock-independent theta, funding and liquidity terms.
+    """
+
+    asset_classes: list[str]
+    coefficients: np.ndarray
+    constant: float
+
+    def evaluate(self, moves: np.ndarray) -> np.ndarray:
+        """Total P&L for a (..., asset classes, 4) move array."""
+        return (polynomial_terms(moves) * self.coefficients).sum(axis=(-2, -1)) + self.constant
+
+    def gradient(self, moves: np.ndarray) -> np.ndarray:
+        """d(P&L)/d(move) with the same shape as `moves`."""
+        c = self.coefficients
+        ds, dvol, dr = moves[..., 0], moves[..., 1], moves[..., 2]
+        return np.stack(
+            [
+                c[:, 0] + 2.0 * c[:, 1] * ds + c[:, 6] * dvol,
+                c[:, 2] + c[:, 6] * ds,
+                c[:, 3] + 2.0 * c[:, 5] * dr,
+                np.broadcast_to(c[:, 4], ds.shape),
+            ],
+            axis=-1,
+        )
+
+
+def _polynomial_coefficients(
+    book: PricedBook,
+    config: CalculationConfig,
+    group_codes: np.ndarray,
+    n_groups: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    k = len(book.asset_classes)
+    valid = book.asset_class_code >= 0
+    cell = group_codes[valid].astype(np.int64) * k + book.asset_class_code[valid]
+    corr = config.correlation_model.spot_vol_correlation(list(book.asset_classes), config.correlation_regime)
+
+    def total(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(cell, weights=weights[valid], minlength=n_groups * k).reshape(n_groups, k)
+
+    coefficients = np.stack(
+        [
+            total(book.greek("delta") * book.direction),
+            0.5 * total(book.greek("gamma")),
+            total(book.greek("vega")),
+            total(book.greek("rho")),
+            total(book.greek("cs01")),
+            0.5 * total(book.greek("convexity")),
+            corr * total(book.greek("cross_gamma")),
+        ],
+        axis=-1,
+    )
+
+    zero = np.zeros(len(book))
+    fixed = _greek_pnl(book, zero, zero, zero, zero, config)
+    per_position = fixed["pnl_theta"] + fixed["pnl_funding"] + fixed["pnl_liquidity"]
+    constants = np.bincount(group_codes, weights=per_position, minlength=n_groups)
+    return coefficients, constants
+
+
+def nonpolynomial_rows(
+    book: PricedBook,
+    driver_shocks: pd.DataFrame | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+) -> np.ndarray:
+    """Rows a `PnLPolynomial` cannot price: driver-shocked, loaded on the driver matrix or covered by a grid."""
+    mask = np.zeros(len(book), dtype=bool)
+    override = _driver_ds_override(book.frame, driver_shocks)
+    if override is not None:
+        mask |= ~np.isnan(override)
+    if driver_matrix is not None:
+        mask |= driver_matrix.loaded_rows()
+    if revaluation is not None:
+        mask |= revaluation.covered
+    return np.flatnonzero(mask)
+
+
+def pnl_polynomial(book: PricedBook, config: CalculationConfig | None = None) -> PnLPolynomial:
+    """Collapse the book's greeks into per-asset-class polynomial coefficients in one pass."""
+    if config is None:
+        config = CalculationConfig()
+    coefficients, constants = _polynomial_coefficients(book, config, np.zeros(len(book), dtype=np.int32), 1)
+    return PnLPolynomial(asset_classes=list(book.asset_classes), coefficients=coefficients[0], constant=float(constants[0]))
+
+
+def grouped_pnl_polynomials(book: PricedBook, column: str, config: CalculationConfig | None = None) -> dict[str, PnLPolynomial]:
+    """One polynomial per label of a coded column (e.g. desk), built in a single bincount pass."""
+    if config is None:
+        config = CalculationConfig()
+    labels = book.labels[column]
+    coefficients, constants = _polynomial_coefficients(book, config, book.codes[column], len(labels))
+    return {
+        label: PnLPolynomial(asset_classes=list(book.asset_classes), coefficients=coefficients[g], constant=float(constants[g]))
+        for g, label in enumerate(labels)
+    }
 
 
 def portfolio_summary(results: pd.DataFrame) -> dict[str, Any]:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.calc.attribution import AttributionCube, value_matrix
+from stress_wizard.calc.book import PricedBook
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix
+from stress_wizard.calc.revaluation import BookGrid
+from stress_wizard.calc.engine import MOVE_COLUMNS, PNL_COLUMNS, CalculationConfig, compute_pnl
+from stress_wizard.instrumentation import traced
+
+
+PATCHED_COLUMNS = [*MOVE_COLUMNS, "shock", *PNL_COLUMNS, "pnl_total"]
+
+
+@dataclass(slots=True)
+class DriverPositionIndex:
+    """CSR-style driver_id -> results row lookup: rows[offsets[i]:offsets[i + 1]] belong to driver_ids[i]."""
+
+    driver_ids: np.ndarray
+    offsets: np.ndarray
+    rows: np.ndarray
+
+    def positions_for(self, driver_ids: np.ndarray) -> np.ndarray:
+        wanted = np.asarray(driver_ids, dtype=object)
+        ix = np.searchsorted(self.driver_ids, wanted)
+        found = ix < len(self.driver_ids)
+        found[found] = self.driver_ids[ix[found]] == wanted[found]
+        ix = ix[found]
+
+        starts = self.offsets[ix]
+        lengths = self.offsets[ix + 1] - starts
+        # Expand each [start, start + length) run without a Python loop.
+        run_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.rows[run_offsets + np.arange(int(lengths.sum()))]
+
+
+def build_driver_position_index(book: PricedBook, driver_matrix: DriverSensitivityMatrix | None = None) -> DriverPositionIndex | None:
+    """Index positions by driver: matrix rows by the drivers they load on, other rows by their driver_id column."""
+    has_column = "driver_id" in book.frame.columns
+    if driver_matrix is None and not has_column:
+        return None
+    labels = np.empty(0, dtype=object)
+    rows = np.empty(0, dtype=np.intp)
+    unindexed = np.arange(len(book), dtype=np.intp)
+    if driver_matrix is not None:
+        ids, offsets, rows = driver_matrix.driver_rows()
+        labels = np.repeat(ids.astype(str).to_numpy(dtype=object), np.diff(offsets))
+        # Rows with no matrix entries still take the driver_id override in the engine.
+        unindexed = np.flatnonzero(~driver_matrix.loaded_rows()).astype(np.intp)
+    if has_column:
+        labels = np.concatenate([labels, book.frame["driver_id"].astype(str).to_numpy(dtype=object)[unindexed]])
+        rows = np.concatenate([rows, unindexed])
+    order = np.argsort(labels, kind="stable")
+    sorted_ids = labels[order]
+    uniq, starts = np.unique(sorted_ids, return_index=True)
+    return DriverPositionIndex(
+        driver_ids=uniq,
+        offsets=np.append(starts, len(sorted_ids)).astype(np.intp),
+        rows=rows[order].astype(np.intp),
+    )
+
+
+def _shock_series(driver_shocks: pd.DataFrame) -> pd.Series:
+    # Same precedence as the engine: the last row for a driver_id wins.
+    deduped = driver_shocks.drop_duplicates("driver_id", keep="last")
+    return pd.Series(deduped["shock"].to_numpy(dtype=np.float64), index=deduped["driver_id"].astype(str).to_numpy())
+
+
+def changed_driver_ids(previous: pd.DataFrame, current: pd.DataFrame) -> np.ndarray:
+    """Driver ids whose effective shock differs, including drivers added to or removed from the table."""
+    old = _shock_series(previous)
+    new = _shock_series(current)
+    union = old.index.union(new.index)
+    a = old.reindex(union).to_numpy()
+    b = new.reindex(union).to_numpy()
+    same = (a == b) | (np.isnan(a) & np.isnan(b))
+    return union[~same].to_numpy(dtype=object)
+
+
+@traced("calc.incremental_patch")
+def reprice_changed_drivers(
+    book: PricedBook,
+    results: pd.DataFrame,
+    cube: AttributionCube,
+    index: DriverPositionIndex,
+    asset_class_shocks: dict[str, dict[str, float]],
+    previous_driver_shocks: pd.DataFrame,
+    driver_shocks: pd.DataFrame,
+    config: CalculationConfig,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+) -> tuple[pd.DataFrame, AttributionCube, np.ndarray]:
+    """Reprice only the positions whose driver shock changed and patch results and cube.
+
+    Returns new results and cube objects (the inputs are left untouched) plus the repriced row positions.
+    """
+    rows = np.unique(index.positions_for(changed_driver_ids(previous_driver_shocks, driver_shocks)))
+    if rows.size == 0:
+        return results, cube, rows
+
+    repriced = compute_pnl(
+        None,
+        None,
+        asset_class_shocks,
+        driver_shocks=driver_shocks,
+        config=config,
+        book=book.take(rows),
+        driver_matrix=None if driver_matrix is None else driver_matrix.take(rows),
+        revaluation=None if revaluation is None else revaluation.take(rows),
+    )
+
+    old_values = value_matrix(results.iloc[rows])
+    patched = results.copy(deep=False)
+    for col in PATCHED_COLUMNS:
+        if col not in patched.columns:
+            continue
+        column = patched[col].to_numpy(dtype=np.float64, copy=True)
+        column[rows] = repriced[col].to_numpy(dtype=np.float64)
+        patched[col] = column
+
+    delta = value_matrix(patched.iloc[rows]) - old_values
+    cells = cube.row_cell[rows]
+    adjustment = np.column_stack([np.bincount(cells, weights=delta[:, j], minlength=len(cube.cell_values)) for j in range(delta.shape[1])])
+    return patched, replace(cube, cell_values=cube.cell_values + adjustment, results=patched), rows
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.calc.book import PricedBook
+from stress_wizard.calc.engine import (
+    MOVE_COLUMNS,
+    CalculationConfig,
+    grouped_pnl_polynomials,
+    polynomial_terms,
+    shock_matrix,
+    taylor_pnl_paths,
+)
+
+
+QUANTILE_LEVELS = (0.95, 0.99, 0.999)
+# Rough count of (paths, positions) float64 temporaries alive while repricing overridden positions.
+_TEMPORARIES_PER_CELL = 16
+
+
+@dataclass(slots=True)
+class MonteCarloConfig:
+    paths: int = 20_000
+    dispersion: float = 0.25  # relative standard deviation of each shock around its scenario value
+    block_paths: int = 4_096
+    max_block_bytes: int = 64 * 2**20
+    tail_level: float = 0.99
+    seed: int = 7
+
+
+@dataclass(slots=True)
+class MonteCarloResult:
+    """Simulated portfolio and per-desk P&L; losses are negative P&L, reported as positive numbers."""
+
+    base_pnl: float
+    path_pnl: np.ndarray
+    desk_pnl: np.ndarray = field(repr=False)
+    desks: list[str]
+    config: MonteCarloConfig
+
+    def _tail(self, level: float) -> np.ndarray:
+        return self.path_pnl <= np.quantile(self.path_pnl, 1.0 - level)
+
+    def var(self, level: float) -> float:
+        return float(-np.quantile(self.path_pnl, 1.0 - level))
+
+    def expected_shortfall(self, level: float) -> float:
+        return float(-self.path_pnl[self._tail(level)].mean())
+
+    def quantile_table(self, levels: tuple[float, ...] = QUANTILE_LEVELS) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "level": list(levels),
+                "var": [self.var(q) for q in levels],
+                "expected_shortfall": [self.expected_shortfall(q) for q in levels],
+            }
+        )
+
+    def tail_contributions(self, level: float | None = None) -> pd.DataFrame:
+        """Each desk's mean P&L over the tail paths; the contributions add up to -ES."""
+        tail = self._tail(level or self.config.tail_level)
+        contribution = self.desk_pnl[tail].mean(axis=0)
+        total = contribution.sum()
+        out = pd.DataFrame({"desk": self.desks, "tail_pnl": contribution})
+        out["pct_tail"] = 0.0 if abs(total) < 1e-9 else out["tail_pnl"] / total * 100.0
+        return out.sort_values("tail_pnl").reset_index(drop=True)
+
+    def summary(self) -> dict[str, float]:
+        out = {
+            "paths": float(len(self.path_pnl)),
+            "base_pnl": self.base_pnl,
+            "mean_pnl": float(self.path_pnl.mean()),
+            "std_pnl": float(self.path_pnl.std()),
+        }
+        for q in QUANTILE_LEVELS:
+            out[f"var_{q:g}"] = self.var(q)
+            out[f"es_{q:g}"] = self.expected_shortfall(q)
+        return out
+
+
+def _overridden_rows(book: PricedBook, driver_shocks: pd.DataFrame | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Rows whose dS a driver shock replaces, their base shock, and a code per distinct driver."""
+    if driver_shocks is None or driver_shocks.empty or "driver_id" not in driver_shocks.columns or "driver_id" not in book.frame.columns:
+        return np.empty(0, dtype=np.intp), np.empty(0), np.empty(0, dtype=np.intp)
+    lookup = driver_shocks.drop_duplicates("driver_id", keep="last").set_index("driver_id")["shock"]
+    shock = book.frame["driver_id"].map(lookup).to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = np.flatnonzero(~np.isnan(shock))
+    codes, _ = pd.factorize(book.frame["driver_id"].to_numpy()[rows])
+    return rows, shock[rows], codes.astype(np.intp)
+
+
+def simulate_loss_distribution(
+    book: PricedBook,
+    asset_class_shocks: dict[str, dict[str, float]],
+    driver_shocks: pd.DataFrame | None = None,
+    config: CalculationConfig | None = None,
+    mc: MonteCarloConfig | None = None,
+) -> MonteCarloResult:
+    """Perturb a scenario's shocks with correlated noise and collect the stressed P&L distribution.
+
+    Every asset-class move is scaled by (1 + dispersion * z), with z drawn from the config's
+    correlation model at its regime (cached Cholesky factor). Driver shocks load on their asset
+    class's spot factor, with the variance share the model gives that class at the regime
+    (`CorrelationModel.driver_systematic_share`), plus idiosyncratic noise. Positions without a
+    driver shock are priced through per-desk P&L polynomials; the rest are repriced per path.
+    Paths are generated in blocks so memory stays bounded by the block size, not the path count.
+    Driver-sensitivity matrices and revaluation grids are not applied here (Taylor P&L only).
+    """
+    config = config or CalculationConfig()
+    mc = mc or MonteCarloConfig()
+    desks = book.labels["desk"]
+    n_desks = len(desks)
+
+    base_moves = shock_matrix([asset_class_shocks], book.asset_classes)[0]
+    n_ac = len(book.asset_classes)
+    n_factors = n_ac * len(MOVE_COLUMNS)
+    model = config.correlation_model
+    chol = model.factor_cholesky(list(book.asset_classes), config.correlation_regime)
+    share = model.driver_systematic_share(list(book.asset_classes), config.correlation_regime)
+
+    rows, driver_base, driver_codes = _overridden_rows(book, driver_shocks)
+    keep = np.ones(len(book), dtype=bool)
+    keep[rows] = False
+    linear_book = book if keep.all() else book.take(np.flatnonzero(keep))
+    polys = grouped_pnl_polynomials(linear_book, "desk", config)
+    coefficients = np.stack([polys[d].coefficients for d in desks])
+    constants = np.array([polys[d].constant for d in desks])
+
+    shocked_book = book.take(rows) if rows.size else None
+    if shocked_book is not None:
+        desk_onehot = np.zeros((rows.size, n_desks))
+        desk_onehot[np.arange(rows.size), shocked_book.codes["desk"]] = 1.0
+        # Spot factor of each overridden position's asset class; unknown classes get no systematic move.
+        ac = shocked_book.asset_class_code
+        spot_factor = np.where(ac >= 0, ac * len(MOVE_COLUMNS), -1)
+        rho = np.where(ac >= 0, share[ac], 0.0)
+        n_drivers = int(driver_codes.max()) + 1
+
+    def price(moves: np.ndarray, z: np.ndarray, idio: np.ndarray | None) -> np.ndarray:
+        desk = np.einsum("bat,dat->bd", polynomial_terms(moves), coefficients) + constants
+        if shocked_book is not None:
+            systematic = np.where(spot_factor >= 0, z[:, spot_factor], 0.0)
+            noise = np.sqrt(rho) * systematic + (0.0 if idio is None else np.sqrt(1.0 - rho) * idio[:, driver_codes])
+            ds = driver_base * (1.0 + mc.dispersion * noise)
+            desk += taylor_pnl_paths(shocked_book, moves, ds, config) @ desk_onehot
+        return desk
+
+    base_desk = price(base_moves[None], np.zeros((1, n_factors)), None)[0]
+
+    per_path_bytes = max(rows.size, 1) * 8 * _TEMPORARIES_PER_CELL
+    block = max(1, min(mc.block_paths, mc.max_block_bytes // per_path_bytes))
+    rng = np.random.default_rng(mc.seed)
+    desk_pnl = np.empty((mc.paths, n_desks))
+    for start in range(0, mc.paths, block):
+        size = min(block, mc.paths - start)
+        z = rng.standard_normal((size, n_factors)) @ chol.T
+        moves = base_moves * (1.0 + mc.dispersion * z.reshape(size, n_ac, len(MOVE_COLUMNS)))
+        idio = rng.standard_normal((size, n_drivers)) if shocked_book is not None else None
+        desk_pnl[start : start + size] = price(moves, z, idio)
+
+    return MonteCarloResult(
+        base_pnl=float(base_desk.sum()),
+        path_pnl=desk_pnl.sum(axis=1),
+        desk_pnl=desk_pnl,
+        desks=list(desks),
+        config=mc,
+    )
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Callable
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from stress_wizard.calc.book import PricedBook
+from stress_wizard.calc.correlation import CorrelationModel
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix
+from stress_wizard.calc.engine import CalculationConfig
+from stress_wizard.calc.revaluation import BookGrid
+from stress_wizard.data.columnar_store import ARROW_BACKED_STRINGS, table_frame, write_table_batches
+from stress_wizard.ingestion.validator import column_partition_digests
+from stress_wizard.instrumentation import span
+
+
+CACHE_DIR_NAME = "result_cache"
+META_NAME = "meta.json"
+# Bump when pricing or output layout changes so entries written by older code stop matching.
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 2**30
+DEFAULT_MAX_ENTRIES = 256
+# Fingerprints remembered per source object (weakly), so an unchanged book is hashed once per session.
+FINGERPRINT_MEMO_SIZE = 16
+# Driver shock columns the engine reads; edits to other columns (justification, source) do not invalidate.
+DRIVER_SHOCK_COLUMNS = ["driver_id", "shock"]
+
+
+def _update_arrow(digest: Any, data: pa.Table) -> None:
+    digest.update(str(data.schema).encode())
+    for column in data.columns:
+        for chunk in column.chunks:
+            digest.update(f"{chunk.offset}:{len(chunk)}".encode())
+            for buf in chunk.buffers():
+                if buf is not None:
+                    digest.update(buf)
+
+
+def frame_fingerprint(*frames: pd.DataFrame | None) -> str:
+    """Content hash of data frames (column names, dtypes and values; the index is ignored).
+
+    Hashes the Arrow buffers directly, so strings are not converted to Python objects. Equal
+    content laid out differently (e.g. a sliced frame) may hash differently, which only costs a miss.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for frame in frames:
+        if frame is None:
+            digest.update(b"none")
+            continue
+        _update_arrow(digest, pa.Table.from_pandas(frame, preserve_index=False))
+    return digest.hexdigest()
+
+
+def array_fingerprint(*arrays: np.ndarray | pd.Index | None) -> str:
+    """Content hash of numeric arrays; an Index (e.g. string ids) is hashed through Arrow."""
+    digest = hashlib.blake2b(digest_size=20)
+    for array in arrays:
+        if array is None:
+            digest.update(b"none")
+        elif isinstance(array, pd.Index):
+            _update_arrow(digest, pa.table({"id": pa.array(array.to_numpy(), from_pandas=True)}))
+        else:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.view(np.uint8).ravel())
+    return digest.hexdigest()
+
+
+def _matrix_fingerprint(matrix: DriverSensitivityMatrix) -> str:
+    gamma = matrix.gamma
+    return array_fingerprint(
+        matrix.driver_ids,
+        matrix.delta.indptr,
+        matrix.delta.indices,
+        matrix.delta.data,
+        *((gamma.indptr, gamma.indices, gamma.data) if gamma is not None else (None,)),
+    )
+
+
+def _grid_fingerprint(grid: BookGrid) -> str:
+    source = grid.grid
+    return array_fingerprint(source.instrument_ids, source.ds_axis, source.dvol_axis, source.values)
+
+
+def _frames_digest(*frames: pd.DataFrame | None) -> bytes:
+    """Content check for memoized frame fingerprints: per-column digests, without building Arrow tables."""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        if frame is None:
+            digest.update(b"none")
+            continue
+        bounds = [(0, len(frame))]
+        for name in frame.columns:
+            digest.update(f"{name}:{frame[name].dtype}".encode())
+            digest.update(column_partition_digests(frame[name], bounds)[0])
+    return digest.digest()
+
+
+@dataclass(slots=True)
+class _MemoEntry:
+    refs: tuple[weakref.ref[Any] | None, ...]
+    check: bytes | None
+    value: str
+
+    def is_for(self, sources: tuple[Any, ...]) -> bool:
+        return all((ref is None and s is None) or (ref is not None and ref() is s) for ref, s in zip(self.refs, sources))
+
+    @property
+    def alive(self) -> bool:
+        return all(ref is None or ref() is not None for ref in self.refs)
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    data = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    frame = table_frame(data)
+    if not ARROW_BACKED_STRINGS:
+        # pandas 2.x maps every Arrow string to one dtype; columns that were put as objects go back as objects.
+        columns = (data.schema.pandas_metadata or {}).get("columns", [])
+        objects = [c["name"] for c in columns if c.get("numpy_type") == "object" and c["name"] in frame.columns]
+        if objects:
+            frame[objects] = frame[objects].astype(object)
+    return frame
+
+
+def _json_scalar(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else float(value)
+
+
+def _config_token(config: CalculationConfig) -> dict[str, Any]:
+    token: dict[str, Any] = {}
+    for f in fields(config):
+        value = getattr(config, f.name)
+        if isinstance(value, CorrelationModel):
+            value = [list(value.asset_classes), array_fingerprint(value.normal, value.stressed)]
+        token[f.name] = value
+    return token
+
+
+@dataclass(slots=True)
+class CachedResult:
+    key: str
+    tables: dict[str, pd.DataFrame]
+    summary: dict[str, Any]
+    created_at: str
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    key: str
+    path: Path
+    bytes: int
+    last_used: float
+
+
+class ResultCache:
+    """Content-addressed store of calculation outputs under `<root>/result_cache/<key>/`.
+
+    The key hashes everything the P&L depends on: the positions/sensitivities content, the
+    driver-sensitivity file and revaluation grid in use, asset-class shocks, the engine-relevant
+    driver shock columns and every CalculationConfig field. Any change gives a new key, so entries
+    are never invalidated in place; they age out by least-recent use once the cache exceeds
+    `max_bytes` or `max_entries`. Tables are uncompressed Arrow IPC files read back memory-mapped.
+    """
+
+    def __init__(self, root: Path | str, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.folder = Path(root) / CACHE_DIR_NAME
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._memo: OrderedDict[tuple[int, ...], _MemoEntry] = OrderedDict()
+
+    def _memoized(self, sources: tuple[Any, ...], compute: Callable[[], str], check: Callable[[], bytes] | None = None) -> str:
+        # Sources are held weakly, so the memo never pins a superseded bundle; `check` is a cheap
+        # content digest that catches in-place edits identity alone would miss.
+        ids = tuple(id(s) for s in sources)
+        digest = check() if check is not None else None
+        hit = self._memo.get(ids)
+        if hit is not None and hit.is_for(sources) and hit.check == digest:
+            self._memo.move_to_end(ids)
+            return hit.value
+        value = compute()
+        for key in [key for key, entry in self._memo.items() if not entry.alive]:
+            del self._memo[key]
+        self._memo[ids] = _MemoEntry(tuple(None if s is None else weakref.ref(s) for s in sources), digest, value)
+        if len(self._memo) > FINGERPRINT_MEMO_SIZE:
+            self._memo.popitem(last=False)
+        return value
+
+    def book_fingerprint(self, book: PricedBook) -> str:
+        positions = book.positions if book.positions is not None else book.frame
+        sources = (positions, book.sensitivities)
+        return self._memoized(sources, lambda: frame_fingerprint(*sources), lambda: _frames_digest(*sources))
+
+    def key_for(
+        self,
+        book: PricedBook,
+        asset_class_shocks: dict[str, dict[str, float]],
+        driver_shocks: pd.DataFrame | None,
+        config: CalculationConfig,
+        driver_matrix: DriverSensitivityMatrix | None = None,
+        revaluation: BookGrid | None = None,
+        book_fingerprint: str | None = None,
+    ) -> str:
+        """Cache key for one calculation; pass `book_fingerprint` when the book's source frames are not at hand."""
+        with span("cache.key"):
+            shocks = None
+            if driver_shocks is not None and not driver_shocks.empty and "driver_id" in driver_shocks.columns:
+                shocks = driver_shocks[[c for c in DRIVER_SHOCK_COLUMNS if c in driver_shocks.columns]]
+            token = {
+                "version": CACHE_VERSION,
+                "book": book_fingerprint or self.book_fingerprint(book),
+                # Matrices and grids are built once and never edited in place; their value arrays stand in for them.
+                "driver_matrix": None if driver_matrix is None else self._memoized((driver_matrix.delta.data,), lambda: _matrix_fingerprint(driver_matrix)),
+                "revaluation": None if revaluation is None else self._memoized((revaluation.grid.values,), lambda: _grid_fingerprint(revaluation)),
+                "asset_class_shocks": asset_class_shocks,
+                "driver_shocks": None if shocks is None else frame_fingerprint(shocks),
+                "config": _config_token(config),
+            }
+            payload = json.dumps(token, sort_keys=True, default=float).encode()
+            return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.folder / key
+
+    @staticmethod
+    def _read_meta(folder: Path) -> dict[str, Any] | None:
+        try:
+            meta = json.loads((folder / META_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == CACHE_VERSION else None
+
+    def get(self, key: str, tables: Sequence[str] | None = None, require: Sequence[str] = ()) -> CachedResult | None:
+        """Load `tables` (default: all) of an entry; None on a miss or if any of `tables` or `require` is absent."""
+        folder = self._entry_dir(key)
+        meta = self._read_meta(folder)
+        if meta is None:
+            return None
+        wanted = list(meta["tables"]) if tables is None else list(tables)
+        if not set(wanted).union(require).issubset(meta["tables"]):
+            return None
+        with span("cache.load", key=key[:12]):
+            try:
+                frames = {name: _read_frame(folder / f"{name}.arrow") for name in wanted}
+            except (OSError, pa.ArrowInvalid):
+                return None
+        try:
+            os.utime(folder / META_NAME)  # marks the entry as recently used
+        except OSError:
+            pass
+        return CachedResult(key=key, tables=frames, summary=meta.get("summary", {}), created_at=meta.get("created_at", ""))
+
+    def put(self, key: str, tables: dict[str, pd.DataFrame], summary: dict[str, Any] | None = None) -> Path:
+        """Store `tables` under `key`.
+
+        An existing entry that already holds every table is only touched; one holding fewer (e.g.
+        a batch run's results-only entry) is replaced. Concurrent writers of the same key are harmless.
+        """
+        folder = self._entry_dir(key)
+        existing = self._read_meta(folder)
+        if existing is not None and set(tables).issubset(existing["tables"]):
+            os.utime(folder / META_NAME)
+            return folder
+        with span("cache.store", key=key[:12]):
+            staging = self.folder / f".{key}.{uuid.uuid4().hex[:8]}.tmp"
+            staging.mkdir(parents=True)
+            try:
+                rows = {name: write_table_batches([frame], staging / f"{name}.arrow") for name, frame in tables.items()}
+                size = sum(p.stat().st_size for p in staging.iterdir())
+                meta = {
+                    "key": key,
+                    "version": CACHE_VERSION,
+                    "created_at": datetime.now().isoformat(),
+                    "tables": rows,
+                    "bytes": size,
+                    "summary": summary or {},
+                }
+                (staging / META_NAME).write_text(json.dumps(meta, indent=2, default=_json_scalar), encoding="utf-8")
+                if existing is not None:
+                    retired = self.folder / f".{key}.{uuid.uuid4().hex[:8]}.old"
+                    folder.rename(retired)
+                    shutil.rmtree(retired, ignore_errors=True)
+                staging.rename(folder)
+            except OSError:
+                # Another process stored the same key first; its entry is identical.
+                shutil.rmtree(staging, ignore_errors=True)
+                if not (folder / META_NAME).exists():
+                    raise
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        self.evict()
+        return folder
+
+    def entries(self) -> list[CacheEntry]:
+        """Stored entries, least recently used first."""
+        out = []
+        if not self.folder.exists():
+            return out
+        for meta_path in self.folder.glob(f"*/{META_NAME}"):
+            try:
+                size = int(json.loads(meta_path.read_text(encoding="utf-8")).get("bytes", 0))
+                out.append(CacheEntry(key=meta_path.parent.name, path=meta_path.parent, bytes=size, last_used=meta_path.stat().st_mtime))
+            except (OSError, ValueError):
+                continue
+        return sorted(out, key=lambda e: e.last_used)
+
+    def evict(self) -> list[str]:
+        """Drop least-recently-used entries until the cache is within both limits."""
+        entries = self.entries()
+        total = sum(e.bytes for e in entries)
+        removed = []
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            entry = entries.pop(0)
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= entry.bytes
+            removed.append(entry.key)
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.calc.book import PricedBook
+
+
+LADDER_COLUMNS = ("instrument_id", "dS", "dVol", "pnl")
+INTERPOLATION_METHODS = ("bilinear", "cubic")
+GRID_DIR_NAME = "revaluation_grids"
+
+# (instruments, dS, dVol) -> P&L on the mesh; inputs broadcast against each other.
+GridPricer = Callable[[pd.DataFrame, np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass(slots=True)
+class RevaluationGrid:
+    """Full-revaluation P&L ladders: `values[i, a, b]` is instrument i's P&L at (ds_axis[a], dvol_axis[b]).
+
+    All instruments share the axes so interpolation is a gather plus a few multiply-adds per
+    position. Values are per instrument, long; the engine applies position direction.
+    """
+
+    instrument_ids: pd.Index
+    ds_axis: np.ndarray
+    dvol_axis: np.ndarray
+    values: np.ndarray
+    as_of: date | None = None
+
+    def __post_init__(self) -> None:
+        self.ds_axis = np.asarray(self.ds_axis, dtype=np.float64)
+        self.dvol_axis = np.asarray(self.dvol_axis, dtype=np.float64)
+        self.values = np.asarray(self.values, dtype=np.float64)
+        expected = (len(self.instrument_ids), len(self.ds_axis), len(self.dvol_axis))
+        if self.values.shape != expected:
+            raise ValueError(f"Grid values must be {expected}, got {self.values.shape}")
+        for name, axis in (("dS", self.ds_axis), ("dVol", self.dvol_axis)):
+            if len(axis) < 2 or (np.diff(axis) <= 0).any():
+                raise ValueError(f"Grid {name} axis must have at least two increasing points")
+
+    def align(self, book: PricedBook) -> BookGrid:
+        rows = self.instrument_ids.get_indexer(book.frame["instrument_id"])
+        return BookGrid(grid=self, rows=rows.astype(np.intp), book=book)
+
+
+@dataclass(slots=True)
+class BookGrid:
+    """A RevaluationGrid mapped onto book positions; `rows` is -1 for positions without a ladder."""
+
+    grid: RevaluationGrid
+    rows: np.ndarray
+    book: PricedBook | None = field(default=None, repr=False)
+
+    def is_aligned_to(self, grid: RevaluationGrid, book: PricedBook) -> bool:
+        return self.grid is grid and self.book is book
+
+    @property
+    def covered(self) -> np.ndarray:
+        return self.rows >= 0
+
+    def take(self, rows: np.ndarray) -> BookGrid:
+        return BookGrid(grid=self.grid, rows=self.rows[rows])
+
+    def pnl(self, ds: np.ndarray, dvol: np.ndarray, method: str = "bilinear") -> np.ndarray:
+        """Interpolated P&L per position; moves are (positions,) or (scenarios, positions)."""
+        return interpolate_grid(self.grid, np.where(self.covered, self.rows, 0), ds, dvol, method)
+
+    def pnl_moves(self, ds: np.ndarray, dvol: np.ndarray, method: str = "bilinear") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Grid P&L changes from the unshocked point for (dS, 0), (0, dVol) and (dS, dVol).
+
+        Each axis is located once and shared by the three evaluations; positions without a ladder
+        get zeros.
+        """
+        shape = np.broadcast_shapes(np.shape(ds), np.shape(dvol), self.rows.shape)
+        covered = self.covered
+        partial = not covered.all()
+        rows, ds, dvol = self.rows, np.broadcast_to(ds, shape), np.broadcast_to(dvol, shape)
+        if partial:
+            rows, ds, dvol = rows[covered], ds[..., covered], dvol[..., covered]
+
+        grid = self.grid
+        base = rows * (len(grid.ds_axis) * len(grid.dvol_axis))
+        s_move, s_zero = _axis_weights(grid.ds_axis, ds, method), _axis_weights(grid.ds_axis, np.zeros(1), method)
+        v_move, v_zero = _axis_weights(grid.dvol_axis, dvol, method), _axis_weights(grid.dvol_axis, np.zeros(1), method)
+        flat = grid.values.reshape(-1)
+        n_v = len(grid.dvol_axis)
+        origin = _evaluate(flat, base, n_v, s_zero, v_zero)
+        moves = tuple(_evaluate(flat, base, n_v, s, v) - origin for s, v in ((s_move, v_zero), (s_zero, v_move), (s_move, v_move)))
+        if not partial:
+            return moves
+        out = []
+        for move in moves:
+            full = np.zeros(shape, dtype=np.float64)
+            full[..., covered] = move
+            out.append(full)
+        return tuple(out)
+
+
+def _cell(axis: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Moves outside the grid are clamped to its edge.
+    x = np.clip(x, axis[0], axis[-1])
+    i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+    return i, (x - axis[i]) / (axis[i + 1] - axis[i])
+
+
+def _cubic_weights(axis: np.ndarray, i: np.ndarray, t: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Cubic Hermite weights for nodes i-1, i, i+1, i+2. Node tangents are the three-point derivative
+    # for the actual (possibly uneven) spacing, so quadratics are reproduced and evenly spaced axes
+    # give Catmull-Rom. A ghost node one interval beyond each edge stands in for the missing neighbour.
+    ext = np.concatenate(([2 * axis[0] - axis[1]], axis, [2 * axis[-1] - axis[-2]]))
+    h_prev, h, h_next = ext[i + 1] - ext[i], ext[i + 2] - ext[i + 1], ext[i + 3] - ext[i + 2]
+    # h * tangent at i = p (f[i+1] - f[i]) + q (f[i] - f[i-1]); at i+1 = s (f[i+1] - f[i]) + r (f[i+2] - f[i+1]).
+    p = h_prev / (h_prev + h)
+    q = h * h / (h_prev * (h_prev + h))
+    r = h * h / (h_next * (h + h_next))
+    s = h_next / (h + h_next)
+    t2 = t * t
+    t3 = t2 * t
+    h00, h10, h01, h11 = 2 * t3 - 3 * t2 + 1, t3 - 2 * t2 + t, -2 * t3 + 3 * t2, t3 - t2
+    return (
+        -h10 * q,
+        h00 + h10 * (q - p) - h11 * s,
+        h01 + h10 * p + h11 * (s - r),
+        h11 * r,
+    )
+
+
+def _axis_weights(axis: np.ndarray, x: np.ndarray, method: str) -> list[tuple[np.ndarray, np.ndarray]]:
+    """(node index, weight) pairs along one axis; edge nodes are repeated for the cubic stencil."""
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method: {method}")
+    i, t = _cell(axis, x)
+    if method == "bilinear":
+        return [(i, 1 - t), (i + 1, t)]
+    return [(np.clip(i + a, 0, len(axis) - 1), w) for a, w in zip(range(-1, 3), _cubic_weights(axis, i, t))]
+
+
+def _evaluate(flat: np.ndarray, base: np.ndarray, n_v: int, s_weights: list, v_weights: list) -> np.ndarray:
+    out = None
+    for i, wi in s_weights:
+        offset = base + i * n_v
+        for j, wj in v_weights:
+            term = wi * wj * np.take(flat, offset + j)
+            out = term if out is None else out + term
+    return out
+
+
+def interpolate_grid(grid: RevaluationGrid, rows: np.ndarray, ds: np.ndarray, dvol: np.ndarray, method: str = "bilinear") -> np.ndarray:
+    """P&L of grid `rows` at (`ds`, `dvol`), vectorised over positions and scenarios.
+
+    `cubic` is a cubic Hermite spline over the 4x4 surrounding nodes (edge nodes repeated) with
+    tangents taken from the actual node spacing; it passes through the ladder points, is smooth
+    between them and reduces to Catmull-Rom on evenly spaced axes. Moves outside the axes are
+    clamped to the grid edge.
+    """
+    shape = np.broadcast_shapes(np.shape(rows), np.shape(ds), np.shape(dvol))
+    base = np.broadcast_to(rows, shape) * (len(grid.ds_axis) * len(grid.dvol_axis))
+    s_weights = _axis_weights(grid.ds_axis, np.broadcast_to(ds, shape), method)
+    v_weights = _axis_weights(grid.dvol_axis, np.broadcast_to(dvol, shape), method)
+    return _evaluate(grid.values.reshape(-1), base, len(grid.dvol_axis), s_weights, v_weights)
+
+
+def grid_from_ladders(ladders: pd.DataFrame, as_of: date | None = None) -> RevaluationGrid:
+    """Build a grid from long-format ladders (instrument_id, dS, dVol, pnl).
+
+    Every instrument must supply the full dS x dVol mesh; repeated points are averaged.
+    """
+    missing = [c for c in LADDER_COLUMNS if c not in ladders.columns]
+    if missing:
+        raise ValueError(f"Revaluation ladders missing columns: {', '.join(missing)}")
+    inst_codes, instruments = pd.factorize(ladders["instrument_id"])
+    ds_codes, ds_axis = pd.factorize(pd.to_numeric(ladders["dS"]), sort=True)
+    dvol_codes, dvol_axis = pd.factorize(pd.to_numeric(ladders["dVol"]), sort=True)
+    keep = (inst_codes >= 0) & (ds_codes >= 0) & (dvol_codes >= 0)
+    shape = (len(instruments), len(ds_axis), len(dvol_axis))
+
+    flat = np.ravel_multi_index((inst_codes[keep], ds_codes[keep], dvol_codes[keep]), shape)
+    pnl = pd.to_numeric(ladders["pnl"], errors="coerce").to_numpy(dtype=np.float64)[keep]
+    counts = np.bincount(flat, minlength=int(np.prod(shape)))
+    if (counts == 0).any():
+        raise ValueError("Revaluation ladders must cover every (dS, dVol) point for every instrument")
+    values = np.bincount(flat, weights=pnl, minlength=len(counts)) / counts
+    return RevaluationGrid(
+        instrument_ids=pd.Index(instruments),
+        ds_axis=np.asarray(ds_axis, dtype=np.float64),
+        dvol_axis=np.asarray(dvol_axis, dtype=np.float64),
+        values=values.reshape(shape),
+        as_of=as_of,
+    )
+
+
+def precompute_grid(
+    instruments: pd.DataFrame,
+    pricer: GridPricer,
+    ds_axis: np.ndarray,
+    dvol_axis: np.ndarray,
+    as_of: date | None = None,
+) -> RevaluationGrid:
+    """Evaluate `pricer` once over the whole (instrument, dS, dVol) mesh.
+
+    The pricer receives the instrument frame and dS/dVol arrays shaped (1, n_dS, 1) and
+    (1, 1, n_dVol), and returns P&L broadcastable to (instruments, n_dS, n_dVol).
+    """
+    ds_axis = np.asarray(ds_axis, dtype=np.float64)
+    dvol_axis = np.asarray(dvol_axis, dtype=np.float64)
+    shape = (len(instruments), len(ds_axis), len(dvol_axis))
+    values = np.broadcast_to(pricer(instruments, ds_axis[None, :, None], dvol_axis[None, None, :]), shape)
+    return RevaluationGrid(
+        instrument_ids=pd.Index(instruments["instrument_id"]),
+        ds_axis=ds_axis,
+        dvol_axis=dvol_axis,
+        values=np.array(values, dtype=np.float64),
+        as_of=as_of,
+    )
+
+
+def grid_path(root: Path | str, as_of: date) -> Path:
+    return Path(root) / "market_data_cache" / GRID_DIR_NAME / f"{as_of:%Y-%m-%d}.npz"
+
+
+def save_grid(grid: RevaluationGrid, root: Path | str, as_of: date | None = None) -> Path:
+    """Cache the grid for its as-of date (uncompressed, so loads are a straight read)."""
+    as_of = as_of or grid.as_of or datetime.now().date()
+    path = grid_path(root, as_of)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        instrument_ids=np.asarray(grid.instrument_ids, dtype=str),
+        ds_axis=grid.ds_axis,
+        dvol_axis=grid.dvol_axis,
+        values=grid.values,
+    )
+    tmp.replace(path)
+    return path
+
+
+def load_grid(root: Path | str, as_of: date) -> RevaluationGrid | None:
+    """The cached grid for `as_of`, or None when none was saved for that date."""
+    path = grid_path(root, as_of)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return RevaluationGrid(
+            instrument_ids=pd.Index(data["instrument_ids"].astype(object)),
+            ds_axis=data["ds_axis"],
+            dvol_axis=data["dvol_axis"],
+            values=data["values"],
+            as_of=as_of,
+        )
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from scipy import sparse
+
+from stress_wizard.calc.book import CODED_COLUMNS, PricedBook
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix
+from stress_wizard.data.columnar_store import table_frame
+
+
+ALIGNMENT = 64
+NAME_PREFIX = "stress_wizard_"
+# Frame columns a worker reads: ids for driver shocks and grids, and the labels results carry.
+FRAME_COLUMNS = ("instrument_id", "driver_id", *CODED_COLUMNS)
+
+
+@dataclass(frozen=True, slots=True)
+class ArraySpec:
+    offset: int
+    dtype: str
+    shape: tuple[int, ...]
+
+
+@dataclass(slots=True)
+class SharedBlockHandle:
+    """Picklable description of a shared block: pass it to workers instead of the data itself."""
+
+    name: str
+    size: int
+    arrays: dict[str, ArraySpec] = field(default_factory=dict)
+    tables: dict[str, tuple[int, int]] = field(default_factory=dict)  # name -> (offset, nbytes) of an Arrow IPC stream
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _ipc_bytes(table: pa.Table) -> pa.Buffer:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _release(shm: shared_memory.SharedMemory, unlink: bool) -> None:
+    shm.close()
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedBlock:
+    """Owner side: NumPy arrays and Arrow tables copied once into one shared-memory segment.
+
+    The segment is unlinked by `close()`, on leaving a `with` block, or when the object is
+    garbage collected, so a crashed run does not leak /dev/shm. Workers attach with
+    `AttachedBlock(handle)`; only the owning process (and its pool children) should attach, since
+    the segment disappears when the owner closes it.
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray], tables: dict[str, pa.Table] | None = None, meta: dict[str, Any] | None = None) -> None:
+        arrays = {key: np.ascontiguousarray(value) for key, value in arrays.items()}
+        payloads = {key: _ipc_bytes(table) for key, table in (tables or {}).items()}
+
+        offset = 0
+        specs: dict[str, ArraySpec] = {}
+        for key, value in arrays.items():
+            offset = _aligned(offset)
+            specs[key] = ArraySpec(offset=offset, dtype=value.dtype.str, shape=value.shape)
+            offset += value.nbytes
+        table_specs: dict[str, tuple[int, int]] = {}
+        for key, payload in payloads.items():
+            offset = _aligned(offset)
+            table_specs[key] = (offset, payload.size)
+            offset += payload.size
+
+        self._shm = shared_memory.SharedMemory(name=f"{NAME_PREFIX}{uuid.uuid4().hex[:16]}", create=True, size=max(offset, 1))
+        self._finalizer = weakref.finalize(self, _release, self._shm, True)
+        buf = self._shm.buf
+        for key, value in arrays.items():
+            spec = specs[key]
+            np.ndarray(value.shape, dtype=value.dtype, buffer=buf, offset=spec.offset)[...] = value
+        for key, payload in payloads.items():
+            start, size = table_specs[key]
+            np.ndarray((size,), dtype=np.uint8, buffer=buf, offset=start)[...] = np.frombuffer(payload, dtype=np.uint8)
+        self.handle = SharedBlockHandle(name=self._shm.name, size=self._shm.size, arrays=specs, tables=table_specs, meta=dict(meta or {}))
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __enter__(self) -> SharedBlock:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # Python 3.13+: attaching processes must not register the segment for cleanup.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Older versions register with the resource tracker shared with the owner (spawn/fork
+        # children reuse it), so the owner's unlink still clears the registration.
+        return shared_memory.SharedMemory(name=name)
+
+
+class AttachedBlock:
+    """Worker side: zero-copy, read-only views over a SharedBlock."""
+
+    def __init__(self, handle: SharedBlockHandle) -> None:
+        self.handle = handle
+        self._shm = _attach(handle.name)
+
+    def array(self, key: str) -> np.ndarray:
+        spec = self.handle.arrays[key]
+        view = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=self._shm.buf, offset=spec.offset)
+        view.flags.writeable = False
+        return view
+
+    def table(self, key: str) -> pa.Table:
+        start, size = self.handle.tables[key]
+        return pa.ipc.open_stream(pa.py_buffer(self._shm.buf[start : start + size])).read_all()
+
+    def close(self) -> None:
+        # Views handed out by array()/table() must be dropped first, or the mapping stays busy.
+        self._shm.close()
+
+
+def publish_book(
+    book: PricedBook,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    columns: Sequence[str] | None = FRAME_COLUMNS,
+) -> SharedBlock:
+    """Publish a priced book (and optionally its driver sensitivity matrix) for pool workers.
+
+    Only `columns` of the joined frame are shared (None shares all of them); the numeric
+    arrays pricing reads are always published.
+    """
+    frame = book.frame if columns is None else book.frame[[c for c in columns if c in book.frame.columns]]
+    arrays: dict[str, np.ndarray] = {
+        "direction": book.direction,
+        "notional": book.notional,
+        "greeks": book.greeks,
+        **{f"codes.{col}": codes for col, codes in book.codes.items()},
+    }
+    tables = {"frame": pa.Table.from_pandas(frame, preserve_index=False)}
+    meta: dict[str, Any] = {"labels": book.labels, "driver_matrix": driver_matrix is not None}
+    if driver_matrix is not None:
+        arrays.update(
+            {
+                "dm.indptr": driver_matrix.delta.indptr,
+                "dm.indices": driver_matrix.delta.indices,
+                "dm.delta": driver_matrix.delta.data,
+            }
+        )
+        if driver_matrix.gamma is not None:
+            arrays.update({"dm.gamma.indptr": driver_matrix.gamma.indptr, "dm.gamma.indices": driver_matrix.gamma.indices, "dm.gamma": driver_matrix.gamma.data})
+        tables["dm.driver_ids"] = pa.table({"driver_id": pa.array(driver_matrix.driver_ids.to_numpy(dtype=object))})
+        meta["dm.shape"] = driver_matrix.shape
+    return SharedBlock(arrays, tables, meta)
+
+
+def attach_book(handle: SharedBlockHandle) -> tuple[PricedBook, DriverSensitivityMatrix | None, AttachedBlock]:
+    """Rebuild the book from shared memory; numeric arrays and string columns are views, not copies.
+
+    Keep the returned AttachedBlock alive for as long as the book is used.
+    """
+    block = AttachedBlock(handle)
+    labels = handle.meta["labels"]
+    book = PricedBook(
+        frame=table_frame(block.table("frame")),
+        direction=block.array("direction"),
+        notional=block.array("notional"),
+        greeks=block.array("greeks"),
+        codes={col: block.array(f"codes.{col}") for col in labels},
+        labels=labels,
+    )
+    matrix = None
+    if handle.meta["driver_matrix"]:
+        shape = tuple(handle.meta["dm.shape"])
+        gamma = None
+        if "dm.gamma" in handle.arrays:
+            gamma = sparse.csr_matrix((block.array("dm.gamma"), block.array("dm.gamma.indices"), block.array("dm.gamma.indptr")), shape=shape, copy=False)
+        matrix = DriverSensitivityMatrix(
+            driver_ids=pd.Index(table_frame(block.table("dm.driver_ids"))["driver_id"]),
+            delta=sparse.csr_matrix((block.array("dm.delta"), block.array("dm.indices"), block.array("dm.indptr")), shape=shape, copy=False),
+            gamma=gamma,
+        )
+    return book, matrix, block
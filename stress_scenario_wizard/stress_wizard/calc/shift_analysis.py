@@ -1,11 +1,29 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
 
-from stress_wizard.calc.engine import CalculationConfig, compute_pnl
+from stress_wizard.calc.book import PricedBook, build_priced_book
+from stress_wizard.calc.driver_pnl import DriverSensitivityMatrix
+from stress_wizard.calc.engine import (
+    BatchPnL,
+    CalculationConfig,
+    PnLPolynomial,
+    compute_pnl_batch,
+    grouped_pnl_polynomials,
+    nonpolynomial_rows,
+    pnl_polynomial,
+    shock_matrix,
+)
+from stress_wizard.calc.revaluation import BookGrid
+from stress_wizard.instrumentation import traced
+
+
+DEFAULT_PERTURBATIONS = [-0.25, -0.1, -0.05, 0.01, 0.05, 0.1, 0.25]
+REPRICE_BLOCK_CELLS = 2_000_000  # scenarios x positions priced per full-repricing pass
 
 
 @dataclass(slots=True)
@@ -14,46 +32,293 @@ class TornadoItem:
     pnl_impact: float
 
 
+def _bumped_scenarios(
+    asset_class_shocks: dict[str, dict[str, float]],
+    perturbations: list[float],
+) -> tuple[list[tuple[str, float]], list[dict[str, dict[str, float]]]]:
+    labels = []
+    scenarios = []
+    for ac, params in asset_class_shocks.items():
+        for key, value in params.items():
+            for p in perturbations:
+                # Only the bumped asset class gets a fresh dict; the caller's shocks are never touched.
+                scenarios.append({**asset_class_shocks, ac: {**params, key: value * (1 + p)}})
+                labels.append((f"{ac}.{key}", p))
+    return labels, scenarios
+
+
+def _repriced_totals(
+    book: PricedBook,
+    scenarios: list[dict[str, dict[str, float]]],
+    config: CalculationConfig | None,
+    driver_shocks: pd.DataFrame | None,
+    driver_matrix: DriverSensitivityMatrix | None,
+    revaluation: BookGrid | None,
+    cancelled: Callable[[], bool] | None,
+) -> np.ndarray:
+    # Full repricing in blocks of scenarios small enough to bound the (scenarios, positions) arrays;
+    # NaN for the scenarios skipped after a cancel.
+    totals = np.full(len(scenarios), np.nan)
+    block = max(1, REPRICE_BLOCK_CELLS // max(len(book), 1))
+    for start in range(0, len(scenarios), block):
+        if cancelled is not None and cancelled():
+            break
+        batch = compute_pnl_batch(
+            book,
+            scenarios[start : start + block],
+            driver_shocks=driver_shocks,
+            config=config,
+            include_components=False,
+            driver_matrix=driver_matrix,
+            revaluation=revaluation,
+        )
+        totals[start : start + block] = batch.scenario_totals()
+    return totals
+
+
+def _sub_terms(
+    rows: np.ndarray,
+    driver_matrix: DriverSensitivityMatrix | None,
+    revaluation: BookGrid | None,
+) -> tuple[DriverSensitivityMatrix | None, BookGrid | None]:
+    return (None if driver_matrix is None else driver_matrix.take(rows), None if revaluation is None else revaluation.take(rows))
+
+
+@traced("shift.sensitivity_table")
 def sensitivity_table(
     positions: pd.DataFrame,
     sensitivities: pd.DataFrame,
     asset_class_shocks: dict[str, dict[str, float]],
     perturbations: list[float] | None = None,
+    book: PricedBook | None = None,
+    config: CalculationConfig | None = None,
+    method: str = "analytic",
+    cancelled: Callable[[], bool] | None = None,
+    driver_shocks: pd.DataFrame | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
 ) -> pd.DataFrame:
-    perturbations = perturbations or [-0.25, -0.1, -0.05, 0.01, 0.05, 0.1, 0.25]
+    """Bump every asset-class shock parameter by each perturbation and report the P&L change.
 
-    rows = []
-    base = compute_pnl(positions, sensitivities, asset_class_shocks)
-    base_pnl = float(base["pnl_total"].sum())
+    `method="analytic"` collapses the book into portfolio polynomial coefficients once and
+    evaluates every bump in closed form; rows the polynomial cannot price (driver shocks, driver
+    matrix, revaluation grid; see `nonpolynomial_rows`) are repriced in full per bump.
+    `method="full"` reprices the whole book per bump. `cancelled` is polled between repricings;
+    once it returns True the remaining bumps are left NaN.
+    """
+    perturbations = perturbations or DEFAULT_PERTURBATIONS
+    if book is None:
+        book = build_priced_book(positions, sensitivities)
 
-    for ac, params in asset_class_shocks.items():
-        for key in params:
-            for p in perturbations:
-                bumped = {k: v.copy() for k, v in asset_class_shocks.items()}
-                bumped[ac][key] = params[key] * (1 + p)
-                res = compute_pnl(positions, sensitivities, bumped)
-                pnl = float(res["pnl_total"].sum())
-                rows.append(
-                    {
-                        "parameter": f"{ac}.{key}",
-                        "perturbation": p,
-                        "pnl": pnl,
-                        "delta_vs_base": pnl - base_pnl,
-                    }
-                )
-
-    return pd.DataFrame(rows)
+    labels, scenarios = _bumped_scenarios(asset_class_shocks, perturbations)
+    scenarios = [asset_class_shocks, *scenarios]  # the base scenario first
+
+    if method == "analytic":
+        rows = nonpolynomial_rows(book, driver_shocks, driver_matrix, revaluation)
+        totals = np.zeros(len(scenarios))
+        if rows.size < len(book):
+            linear = book if rows.size == 0 else book.take(np.setdiff1d(np.arange(len(book)), rows))
+            poly = pnl_polynomial(linear, config)
+            totals += poly.evaluate(shock_matrix(scenarios, poly.asset_classes))
+        if rows.size:
+            totals += _repriced_totals(book.take(rows), scenarios, config, driver_shocks, *_sub_terms(rows, driver_matrix, revaluation), cancelled)
+    elif method == "full":
+        totals = _repriced_totals(book, scenarios, config, driver_shocks, driver_matrix, revaluation, cancelled)
+    else:
+        raise ValueError(f"Unknown sensitivity method: {method}")
+    base_pnl, pnls = float(totals[0]), totals[1:]
+
+    return pd.DataFrame(
+        {
+            "parameter": [label for label, _ in labels],
+            "perturbation": [p for _, p in labels],
+            "pnl": pnls.astype(float),
+            "delta_vs_base": pnls.astype(float) - base_pnl,
+        },
+        columns=["parameter", "perturbation", "pnl", "delta_vs_base"],
+    )
+
+
+def patch_sensitivity_table(
+    table: pd.DataFrame,
+    book: PricedBook,
+    rows: np.ndarray,
+    asset_class_shocks: dict[str, dict[str, float]],
+    previous_driver_shocks: pd.DataFrame,
+    driver_shocks: pd.DataFrame,
+    perturbations: list[float] | None = None,
+    config: CalculationConfig | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> pd.DataFrame:
+    """Update a `sensitivity_table` after a driver-shock edit that only moved `rows`.
+
+    Every other position prices the same under both shock sets, so the table moves by the change
+    in those rows' bumped P&L. `perturbations` must be the ones the table was built with.
+    """
+    if rows.size == 0:
+        return table
+    _, scenarios = _bumped_scenarios(asset_class_shocks, perturbations or DEFAULT_PERTURBATIONS)
+    scenarios = [asset_class_shocks, *scenarios]
+    sub_book, (sub_matrix, sub_grid) = book.take(rows), _sub_terms(rows, driver_matrix, revaluation)
+    after = _repriced_totals(sub_book, scenarios, config, driver_shocks, sub_matrix, sub_grid, cancelled)
+    before = _repriced_totals(sub_book, scenarios, config, previous_driver_shocks, sub_matrix, sub_grid, cancelled)
+    change = after - before
+    out = table.copy()
+    out["pnl"] = table["pnl"].to_numpy(dtype=np.float64) + change[1:]
+    out["delta_vs_base"] = table["delta_vs_base"].to_numpy(dtype=np.float64) + change[1:] - change[0]
+    return out
 
 
+@traced("shift.tornado")
 def tornado_data(sensitivity_df: pd.DataFrame) -> pd.DataFrame:
     grouped = (
-        sensitivity_df.groupby("parameter", as_index=False)
-        .agg(max_abs_impact=("delta_vs_base", lambda s: float(np.max(np.abs(s)))))
+        sensitivity_df.assign(abs_impact=sensitivity_df["delta_vs_base"].abs())
+        .groupby("parameter", as_index=False)
+        .agg(max_abs_impact=("abs_impact", "max"))
         .sort_values("max_abs_impact", ascending=False)
     )
     return grouped
 
 
+@dataclass(slots=True)
+class BreakEvenResult:
+    parameter: str
+    target_pnl: float
+    shift: float
+    pnl: float
+    residual: float
+    iterations: int
+    converged: bool
+    status: str
+    group: str = ""
+
+
+def _with_parameter(
+    asset_class_shocks: dict[str, dict[str, float]],
+    ac: str,
+    key: str,
+    values: np.ndarray,
+) -> list[dict[str, dict[str, float]]]:
+    params = asset_class_shocks[ac]
+    return [{**asset_class_shocks, ac: {**params, key: float(x)}} for x in values]
+
+
+@dataclass(slots=True)
+class _SplitPnL:
+    """Total P&L of a book (or group): polynomial rows in closed form, `repriced` rows in full.
+
+    `repriced` holds the rows `nonpolynomial_rows` flags, with their driver matrix and grid slices.
+    """
+
+    poly: PnLPolynomial
+    config: CalculationConfig | None = None
+    repriced: PricedBook | None = None
+    driver_shocks: pd.DataFrame | None = None
+    driver_matrix: DriverSensitivityMatrix | None = None
+    revaluation: BookGrid | None = None
+
+    def totals(self, scenarios: list[dict[str, dict[str, float]]]) -> np.ndarray:
+        totals = self.poly.evaluate(shock_matrix(scenarios, self.poly.asset_classes))
+        if self.repriced is not None:
+            totals = totals + _repriced_totals(self.repriced, scenarios, self.config, self.driver_shocks, self.driver_matrix, self.revaluation, None)
+        return totals
+
+    def slope(self, asset_class_shocks: dict[str, dict[str, float]], ac: str, key: str, x: float) -> float:
+        """d(P&L)/d(parameter) at `x`."""
+        # Chain rule: analytic d(P&L)/d(move) times the local slope of the parameter -> move mapping.
+        h = 1e-7 * max(1.0, abs(x))
+        moves = shock_matrix(_with_parameter(asset_class_shocks, ac, key, np.array([x, x + h])), self.poly.asset_classes)
+        slope = float((self.poly.gradient(moves[0]) * (moves[1] - moves[0]) / h).sum())
+        if self.repriced is not None:
+            # Repriced rows have no closed-form gradient; difference them over a wider step.
+            h = 1e-5 * max(1.0, abs(x))
+            scenarios = _with_parameter(asset_class_shocks, ac, key, np.array([x, x + h]))
+            totals = _repriced_totals(self.repriced, scenarios, self.config, self.driver_shocks, self.driver_matrix, self.revaluation, None)
+            slope += float((totals[1] - totals[0]) / h)
+        return slope
+
+
+def _split_pnls(
+    book: PricedBook,
+    group_by: str | None,
+    config: CalculationConfig | None,
+    driver_shocks: pd.DataFrame | None,
+    driver_matrix: DriverSensitivityMatrix | None,
+    revaluation: BookGrid | None,
+) -> dict[str, _SplitPnL]:
+    """One split P&L per group ("" for the whole book), divided like the analytic `sensitivity_table`."""
+    rows = nonpolynomial_rows(book, driver_shocks, driver_matrix, revaluation)
+    linear = book if rows.size == 0 else book.take(np.setdiff1d(np.arange(len(book)), rows))
+    polys = {"": pnl_polynomial(linear, config)} if group_by is None else grouped_pnl_polynomials(linear, group_by, config)
+    out: dict[str, _SplitPnL] = {}
+    for g, (group, poly) in enumerate(polys.items()):
+        group_rows = rows if group_by is None else rows[book.codes[group_by][rows] == g]
+        if group_rows.size == 0:
+            out[group] = _SplitPnL(poly, config)
+            continue
+        sub_matrix, sub_grid = _sub_terms(group_rows, driver_matrix, revaluation)
+        out[group] = _SplitPnL(poly, config, book.take(group_rows), driver_shocks, sub_matrix, sub_grid)
+    return out
+
+
+def _solve_break_even(
+    pnl: _SplitPnL,
+    asset_class_shocks: dict[str, dict[str, float]],
+    parameter: tuple[str, str],
+    target_pnl: float,
+    search_range: tuple[float, float],
+    tol: float,
+    max_iter: int,
+    bracket_points: int,
+) -> BreakEvenResult:
+    ac, key = parameter
+    label = f"{ac}.{key}"
+    if ac not in asset_class_shocks:
+        return BreakEvenResult(label, target_pnl, float("nan"), float("nan"), float("nan"), 0, False, "parameter_not_shocked")
+
+    def f(values: np.ndarray) -> np.ndarray:
+        return pnl.totals(_with_parameter(asset_class_shocks, ac, key, values)) - target_pnl
+
+    low, high = search_range
+    grid = np.linspace(low, high, bracket_points)
+    values = f(grid)
+
+    exact = np.flatnonzero(np.abs(values) <= tol)
+    if exact.size:
+        i = int(exact[np.argmin(np.abs(grid[exact]))])
+        return BreakEvenResult(label, target_pnl, float(grid[i]), float(values[i] + target_pnl), float(values[i]), 0, True, "converged")
+
+    crossings = np.flatnonzero(np.sign(values[:-1]) != np.sign(values[1:]))
+    if crossings.size == 0:
+        i = int(np.argmin(np.abs(values)))
+        return BreakEvenResult(label, target_pnl, float(grid[i]), float(values[i] + target_pnl), float(values[i]), 0, False, "no_root_in_range")
+
+    # Take the crossing closest to the current shock level, then safeguarded Newton inside the bracket.
+    current = float(asset_class_shocks[ac].get(key, 0.0))
+    i = int(crossings[np.argmin(np.abs(0.5 * (grid[crossings] + grid[crossings + 1]) - current))])
+    lo, hi, f_lo = float(grid[i]), float(grid[i + 1]), float(values[i])
+    x = 0.5 * (lo + hi)
+    fx = f_lo
+    for iteration in range(1, max_iter + 1):
+        fx = float(f(np.array([x]))[0])
+        if abs(fx) <= tol:
+            return BreakEvenResult(label, target_pnl, x, fx + target_pnl, fx, iteration, True, "converged")
+        if np.sign(fx) == np.sign(f_lo):
+            lo, f_lo = x, fx
+        else:
+            hi = x
+        if hi - lo <= 1e-14 * max(1.0, abs(x)):
+            # The bracket collapsed without the residual vanishing: a jump in the parameter mapping, not a root.
+            return BreakEvenResult(label, target_pnl, x, fx + target_pnl, fx, iteration, False, "discontinuity")
+        slope = pnl.slope(asset_class_shocks, ac, key, x)
+        step = x - fx / slope if slope != 0.0 else float("nan")
+        x = step if lo < step < hi else 0.5 * (lo + hi)
+
+    return BreakEvenResult(label, target_pnl, x, fx + target_pnl, fx, max_iter, False, "max_iterations")
+
+
 def break_even_shift(
     positions: pd.DataFrame,
     sensitivities: pd.DataFrame,
@@ -61,40 +326,191 @@ def break_even_shift(
     target_pnl: float = 0.0,
     parameter: tuple[str, str] = ("Equities", "index_pct"),
     search_range: tuple[float, float] = (-0.5, 0.5),
+    book: PricedBook | None = None,
+    config: CalculationConfig | None = None,
+    method: str = "solver",
+    driver_shocks: pd.DataFrame | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
 ) -> float:
+    """Level of one shock parameter at which portfolio P&L hits `target_pnl`.
+
+    `method="solver"` brackets the root and refines it with safeguarded Newton steps on the
+    closed-form P&L polynomial; `method="grid"` keeps the 300-point scan, which is also used
+    when the solver finds no root in range and whenever driver shocks, a driver matrix or a
+    revaluation grid move rows off the polynomial.
+    A parameter whose asset class is not in the scenario returns the low end of `search_range`.
+    """
+    if book is None:
+        book = build_priced_book(positions, sensitivities)
+    if config is None:
+        config = CalculationConfig()
+    if method not in ("solver", "grid"):
+        raise ValueError(f"Unknown break-even method: {method}")
+
     ac, key = parameter
     low, high = search_range
-    best = low
-    best_diff = float("inf")
+    if ac not in asset_class_shocks:
+        return float(low)
+    if method == "solver" and nonpolynomial_rows(book, driver_shocks, driver_matrix, revaluation).size == 0:
+        result = solve_break_even(positions, sensitivities, asset_class_shocks, target_pnl, parameter, search_range, book=book, config=config)
+        if result.converged:
+            return result.shift
 
-    for x in np.linspace(low, high, 300):
-        candidate = {k: v.copy() for k, v in asset_class_shocks.items()}
-        if ac not in candidate:
-            continue
-        candidate[ac][key] = x
-        pnl = float(compute_pnl(positions, sensitivities, candidate, config=CalculationConfig()).get("pnl_total", pd.Series(dtype=float)).sum())
-        diff = abs(pnl - target_pnl)
-        if diff < best_diff:
-            best = float(x)
-            best_diff = diff
-
-    return best
-
-
-def marginal_contribution(results: pd.DataFrame) -> pd.DataFrame:
-    total = float(results["pnl_total"].sum())
-    rows = []
-    for _, row in results.iterrows():
-        without = total - float(row["pnl_total"])
-        rows.append(
-            {
-                "instrument_id": row["instrument_id"],
-                "desk": row.get("desk", ""),
-                "book": row.get("book", ""),
-                "marginal_contribution": total - without,
-                "total_pnl": total,
-            }
-        )
-    out = pd.DataFrame(rows)
-    out = out.sort_values("marginal_contribution")
-    return out
+    grid = np.linspace(low, high, 300)
+    scenarios = _with_parameter(asset_class_shocks, ac, key, grid)
+    totals = _repriced_totals(book, scenarios, config, driver_shocks, driver_matrix, revaluation, None)
+    return float(grid[int(np.argmin(np.abs(totals - target_pnl)))])
+
+
+def solve_break_even(
+    positions: pd.DataFrame,
+    sensitivities: pd.DataFrame,
+    asset_class_shocks: dict[str, dict[str, float]],
+    target_pnl: float = 0.0,
+    parameter: tuple[str, str] = ("Equities", "index_pct"),
+    search_range: tuple[float, float] = (-0.5, 0.5),
+    book: PricedBook | None = None,
+    config: CalculationConfig | None = None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    bracket_points: int = 65,
+    driver_shocks: pd.DataFrame | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+) -> BreakEvenResult:
+    """Solve for a single break-even shift and return the convergence report.
+
+    Rows the polynomial cannot price (driver shocks, driver matrix, revaluation grid) are repriced
+    in full at every solver step.
+    """
+    if book is None:
+        book = build_priced_book(positions, sensitivities)
+    pnl = _split_pnls(book, None, config, driver_shocks, driver_matrix, revaluation)[""]
+    return _solve_break_even(pnl, asset_class_shocks, parameter, target_pnl, search_range, tol, max_iter, bracket_points)
+
+
+@traced("shift.break_even_table")
+def break_even_table(
+    positions: pd.DataFrame,
+    sensitivities: pd.DataFrame,
+    asset_class_shocks: dict[str, dict[str, float]],
+    parameters: list[tuple[str, str]],
+    targets: float | list[float] | dict[str, float] = 0.0,
+    group_by: str | None = None,
+    search_range: tuple[float, float] = (-0.5, 0.5),
+    book: PricedBook | None = None,
+    config: CalculationConfig | None = None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    driver_shocks: pd.DataFrame | None = None,
+    driver_matrix: DriverSensitivityMatrix | None = None,
+    revaluation: BookGrid | None = None,
+) -> pd.DataFrame:
+    """Solve many break-evens at once.
+
+    With `group_by` (asset_class/desk/book/geography) each group's P&L is solved on its own;
+    `targets` may then be a dict keyed by group label, e.g. the negated quarterly budget per desk.
+    Driver-shocked, driver-matrix and grid rows are repriced in full, as in `solve_break_even`.
+    """
+    if book is None:
+        book = build_priced_book(positions, sensitivities)
+
+    pnls = _split_pnls(book, group_by, config, driver_shocks, driver_matrix, revaluation)
+
+    results: list[BreakEvenResult] = []
+    for group, pnl in pnls.items():
+        if isinstance(targets, dict):
+            if group not in targets:
+                continue
+            group_targets = [float(targets[group])]
+        elif isinstance(targets, (int, float)):
+            group_targets = [float(targets)]
+        else:
+            group_targets = [float(t) for t in targets]
+
+        for parameter in parameters:
+            for target in group_targets:
+                result = _solve_break_even(pnl, asset_class_shocks, parameter, target, search_range, tol, max_iter, bracket_points=65)
+                result.group = group
+                results.append(result)
+
+    columns = ["group", "parameter", "target_pnl", "shift", "pnl", "residual", "iterations", "converged", "status"]
+    return pd.DataFrame([{c: getattr(r, c) for c in columns} for r in results], columns=columns)
+
+
+def _ascending_order(values: np.ndarray, top_k: int | None) -> np.ndarray:
+    if top_k is None or top_k >= len(values):
+        return np.argsort(values, kind="stable")
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    candidates = np.argpartition(values, top_k - 1)[:top_k]
+    return candidates[np.argsort(values[candidates], kind="stable")]
+
+
+def _column(results: pd.DataFrame, col: str, default: str = "") -> np.ndarray:
+    if col in results.columns:
+        return results[col].to_numpy()
+    return np.full(len(results), default, dtype=object)
+
+
+@traced("shift.marginal")
+def marginal_contribution(results: pd.DataFrame, top_k: int | None = None) -> pd.DataFrame:
+    """Per-position contribution to total stress P&L, largest losses first.
+
+    Taylor P&L is additive across positions, so removing a position moves the total by exactly
+    its own `pnl_total`. With `top_k` only the K largest losses are selected (argpartition) and sorted.
+    """
+    pnl = results["pnl_total"].to_numpy(dtype=np.float64)
+    total = float(pnl.sum())
+    order = _ascending_order(pnl, top_k)
+    return pd.DataFrame(
+        {
+            "instrument_id": results["instrument_id"].to_numpy()[order],
+            "desk": _column(results, "desk")[order],
+            "book": _column(results, "book")[order],
+            "marginal_contribution": pnl[order],
+            "total_pnl": np.full(len(order), total, dtype=np.float64),
+        },
+        index=results.index[order],
+    )
+
+
+@traced("shift.tail_contributions")
+def tail_contributions(batch: BatchPnL, book: PricedBook, by: str = "desk", alpha: float = 0.95) -> pd.DataFrame:
+    """Euler contributions of each `by` group to expected shortfall across a scenario set.
+
+    The tail is the worst (1 - alpha) share of scenarios by portfolio P&L. A group's contribution is
+    its mean P&L over those scenarios, so contributions add up to the portfolio ES. `standalone_es`
+    is the group's own ES, and the gap to `es_contribution` is the diversification it receives.
+    """
+    if batch.pnl_total.shape[1] != len(book):
+        raise ValueError("Batch P&L and priced book have different position counts")
+    if len(batch.pnl_total) == 0:
+        raise ValueError("Tail contributions need at least one scenario")
+
+    labels = book.labels[by]
+    codes = book.codes[by]
+    n_groups = len(labels)
+    group_pnl = np.stack([np.bincount(codes, weights=row, minlength=n_groups) for row in batch.pnl_total])
+    totals = group_pnl.sum(axis=1)
+
+    n_tail = max(1, int(np.ceil(round(len(totals) * (1.0 - alpha), 9))))
+    tail = _ascending_order(totals, n_tail)
+    worst = tail[0]
+
+    es_contribution = group_pnl[tail].mean(axis=0)
+    standalone = np.sort(group_pnl, axis=0)[:n_tail].mean(axis=0)
+    es_total = float(totals[tail].mean())
+
+    out = pd.DataFrame(
+        {
+            by: labels,
+            "es_contribution": es_contribution,
+            "pct_es": 0.0 if abs(es_total) < 1e-9 else es_contribution / es_total * 100.0,
+            "worst_scenario_pnl": group_pnl[worst],
+            "standalone_es": standalone,
+            "diversification": es_contribution - standalone,
+        }
+    )
+    return out.sort_values("es_contribution").reset_index(drop=True)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+from stress_wizard.config import load_settings
+
+
+def _batch(args: argparse.Namespace) -> int:
+    from stress_wizard.calc.batch_runner import BatchSettings, run_batch
+    from stress_wizard.exporter.persistence import list_scenario_dirs
+
+    root = Path(args.root or load_settings().root_path)
+    scenario_dirs = list_scenario_dirs(root)
+    if args.scenarios:
+        scenario_dirs = [p for p in scenario_dirs if any(p.match(pattern) for pattern in args.scenarios)]
+    if not scenario_dirs:
+        print(f"No saved scenarios found under {root / 'scenarios'}", file=sys.stderr)
+        return 1
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r{done}/{total} scenarios", end="", file=sys.stderr, flush=True)
+
+    manifest = run_batch(
+        root,
+        args.bundle,
+        scenario_dirs=scenario_dirs,
+        output_dir=args.output,
+        workers=args.workers,
+        settings=BatchSettings(
+            correlation_regime=args.correlation_regime,
+            liquidity_bps=args.liquidity_bps,
+            funding_spread_bps=args.funding_bps,
+        ),
+        progress=None if args.quiet else progress,
+        use_cache=not args.no_cache,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"run_id={manifest['run_id']} succeeded={manifest['succeeded']} failed={manifest['failed']} cached={manifest['cached']}")
+    print(f"output_dir={manifest['output_dir']}")
+    return 0 if manifest["failed"] == 0 else 2
+
+
+def _save_demo_bundle(args: argparse.Namespace) -> int:
+    from stress_wizard.data.columnar_store import save_bundle
+    from stress_wizard.data.demo_data import generate_demo_bundle
+
+    root = Path(args.root or load_settings().root_path)
+    paths = save_bundle(generate_demo_bundle(risk_driver_count=args.drivers), root, args.name)
+    for table, path in paths.items():
+        print(f"{table}={path}")
+    return 0
+
+
+def _generate_bundle(args: argparse.Namespace) -> int:
+    from stress_wizard.data.synthetic import SyntheticConfig, write_synthetic_bundle
+
+    root = Path(args.root or load_settings().root_path)
+    config = SyntheticConfig(
+        positions=args.positions,
+        drivers=args.drivers,
+        seed=args.seed,
+        books=args.books,
+        drivers_per_position=args.drivers_per_position,
+    )
+
+    def progress(table: str, done: int, total: int) -> None:
+        print(f"\r{table}: {done:,}/{total:,} rows", end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+    paths = write_synthetic_bundle(root, args.name, config, progress=None if args.quiet else progress)
+    for table, path in paths.items():
+        print(f"{table}={path}")
+    return 0
+
+
+def _benchmark(args: argparse.Namespace) -> int:
+    from stress_wizard.benchmarks import (
+        SCALES,
+        append_history,
+        find_regressions,
+        format_record,
+        load_baseline,
+        run_benchmarks,
+        save_baseline,
+    )
+
+    unknown = [name for name in args.scales if name not in SCALES]
+    if unknown:
+        print(f"Unknown scale(s) {unknown}; choose from {list(SCALES)}", file=sys.stderr)
+        return 1
+    record = run_benchmarks(
+        [SCALES[name] for name in args.scales],
+        case_names=args.cases,
+        repeat=args.repeat,
+        progress=None if args.quiet else lambda msg: print(msg, file=sys.stderr, flush=True),
+    )
+    print(format_record(record))
+    print(f"history={append_history(record, args.output)}")
+
+    regressions = find_regressions(record, load_baseline(args.output), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression.describe()}")
+    if args.update_baseline:
+        print(f"baseline={save_baseline(record, args.output)}")
+    return 2 if regressions and not args.update_baseline else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="stress_wizard", description="Headless Stress Scenario Wizard tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Price saved scenarios against a stored bundle on all cores.")
+    batch.add_argument("--root", help="Scenario root (defaults to root_path in app_settings.json).")
+    batch.add_argument("--bundle", required=True, help="Stored bundle name under <root>/portfolios.")
+    batch.add_argument("--scenarios", nargs="*", help="Only run scenario folders matching these glob patterns.")
+    batch.add_argument("--output", help="Output folder (defaults to <root>/batch_runs/<timestamp>_<run_id>).")
+    batch.add_argument("--workers", type=int, help="Worker processes (defaults to the CPU count).")
+    batch.add_argument("--correlation-regime", type=float, default=0.35)
+    batch.add_argument("--liquidity-bps", type=float, default=12.0)
+    batch.add_argument("--funding-bps", type=float, default=25.0)
+    batch.add_argument("--no-cache", action="store_true", help="Reprice every scenario instead of reusing <root>/result_cache.")
+    batch.add_argument("--quiet", action="store_true", help="No progress output.")
+    batch.set_defaults(handler=_batch)
+
+    demo = sub.add_parser("save-demo-bundle", help="Write a generated demo bundle to the columnar store.")
+    demo.add_argument("--root", help="Scenario root (defaults to root_path in app_settings.json).")
+    demo.add_argument("--name", default="demo")
+    demo.add_argument("--drivers", type=int, default=60_000, help="Risk driver count.")
+    demo.set_defaults(handler=_save_demo_bundle)
+
+    synthetic = sub.add_parser("generate-bundle", help="Stream a large seeded synthetic bundle into the columnar store.")
+    synthetic.add_argument("--root", help="Scenario root (defaults to root_path in app_settings.json).")
+    synthetic.add_argument("--name", default="synthetic")
+    synthetic.add_argument("--positions", type=int, default=1_000_000)
+    synthetic.add_argument("--drivers", type=int, default=1_000_000, help="Risk driver count.")
+    synthetic.add_argument("--seed", type=int, default=42)
+    synthetic.add_argument("--books", type=int, default=2_000)
+    synthetic.add_argument("--drivers-per-position", type=int, default=0, help="Also write long-format driver sensitivities.")
+    synthetic.add_argument("--quiet", action="store_true", help="No progress output.")
+    synthetic.set_defaults(handler=_generate_bundle)
+
+    bench = sub.add_parser("benchmark", help="Time the calc, attribution and ingestion hot paths on demo data.")
+    bench.add_argument("--scales", nargs="+", default=["3.5k"], help="Scales to run: 3.5k, 100k, 1m.")
+    bench.add_argument("--cases", nargs="*", help="Only run these cases (a prefix such as 'attribution' selects a group).")
+    bench.add_argument("--repeat", type=int, default=3, help="Timed repeats per case; the median is recorded.")
+    bench.add_argument("--output", default="benchmarks", help="Folder holding history.jsonl and baseline.json.")
+    bench.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / RSS growth vs the baseline.")
+    bench.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    bench.add_argument("--quiet", action="store_true", help="No progress output.")
+    bench.set_defaults(handler=_benchmark)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
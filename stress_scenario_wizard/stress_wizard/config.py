@@ -43,6 +43,10 @@ class AppSettings:
     ai_provider: str = "OPENAI"
     ai_model: str = "gpt-4o-mini"
     save_last_session: bool = True
+    fast_start: bool = True  # show the window first and load the bundle in the background
+    last_bundle: str = ""  # stored bundle under <root>/portfolios restored at start
+    result_cache_enabled: bool = True
+    result_cache_max_mb: int = 2048
     governance: GovernanceSettings = field(default_factory=GovernanceSettings)
     email: EmailSettings = field(default_factory=EmailSettings)
 
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+
+from stress_wizard.data.demo_data import STRING_DTYPE
+from stress_wizard.exporter.persistence import ensure_root_structure
+from stress_wizard.models import DataBundle
+
+
+# Portfolio tables live under portfolios/<name>, market tables under market_data_cache/<name>.
+BUNDLE_TABLES = {
+    "positions": "portfolios",
+    "sensitivities": "portfolios",
+    "market_data": "market_data_cache",
+    "risk_drivers": "market_data_cache",
+}
+# Tables a bundle may omit; they are written only when non-empty.
+OPTIONAL_TABLES = {"driver_sensitivities": "portfolios"}
+BATCH_ROWS = 262_144
+# pandas 3 keeps string columns Arrow-backed on conversion; 2.x would copy them into Python objects.
+ARROW_BACKED_STRINGS = int(pd.__version__.split(".")[0]) >= 3
+MANIFEST_NAME = "bundle.json"
+
+
+def table_path(root: Path, name: str, table: str) -> Path:
+    return root / {**BUNDLE_TABLES, **OPTIONAL_TABLES}[table] / name / f"{table}.arrow"
+
+
+def _arrow_schema(table: pa.Table) -> pa.Schema:
+    # An all-null first batch infers the null type; store such columns as strings instead.
+    fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def write_table_batches(frames: Iterable[pd.DataFrame], path: Path) -> int:
+    """Stream frames with a common set of columns into one Arrow IPC file; returns rows written.
+
+    The schema is taken from the first frame and later frames are cast to it, so only one frame is
+    held in memory at a time; callers streaming inferred types must pin them up front (see
+    `FileImporter.stream_import`).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".arrow.tmp")
+    rows = 0
+    writer: pa.ipc.RecordBatchFileWriter | None = None
+    schema: pa.Schema | None = None
+    try:
+        # Uncompressed Arrow IPC so the file can be memory-mapped and read without decoding.
+        with pa.OSFile(str(tmp), "wb") as sink:
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    schema = _arrow_schema(table)
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table.cast(schema), max_chunksize=BATCH_ROWS)
+                rows += table.num_rows
+            if writer is None:
+                raise ValueError(f"No data to write to {path}")
+            writer.close()
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+    return rows
+
+
+def _update_manifest(root: Path, name: str, rows: dict[str, int]) -> None:
+    path = root / "portfolios" / name / MANIFEST_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {"name": name, "rows": {}}
+    manifest["rows"].update(rows)
+    manifest["saved_at"] = datetime.now().isoformat()
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def save_table(frames: pd.DataFrame | Iterable[pd.DataFrame], root: Path | str, name: str, table: str) -> Path:
+    """Write one bundle table, either a whole frame or an iterable of chunks."""
+    if table not in BUNDLE_TABLES and table not in OPTIONAL_TABLES:
+        raise ValueError(f"Unknown bundle table: {table}")
+    root = Path(root)
+    ensure_root_structure(root)
+    path = table_path(root, name, table)
+    rows = write_table_batches([frames] if isinstance(frames, pd.DataFrame) else frames, path)
+    _update_manifest(root, name, {table: rows})
+    return path
+
+
+def save_bundle(bundle: DataBundle, root: Path | str, name: str) -> dict[str, Path]:
+    """Write each bundle frame as an Arrow IPC file and return the paths by table."""
+    paths = {table: save_table(getattr(bundle, table), root, name, table) for table in BUNDLE_TABLES}
+    for table in OPTIONAL_TABLES:
+        if not getattr(bundle, table).empty:
+            paths[table] = save_table(getattr(bundle, table), root, name, table)
+    return paths
+
+
+def list_stored_bundles(root: Path | str) -> list[str]:
+    """Names of stored bundles that have all four tables."""
+    portfolios = Path(root) / "portfolios"
+    if not portfolios.exists():
+        return []
+    names = []
+    for manifest in sorted(portfolios.glob(f"*/{MANIFEST_NAME}")):
+        rows = json.loads(manifest.read_text(encoding="utf-8")).get("rows", {})
+        if set(BUNDLE_TABLES).issubset(rows):
+            names.append(manifest.parent.name)
+    return names
+
+
+def _map_table(path: Path) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+class StoredBundle:
+    """Memory-mapped view over a saved bundle.
+
+    Opening maps the files without reading them; a table is converted to pandas only when it is
+    first read, and its pages are faulted in then. Numeric (and Arrow-backed string) columns stay
+    views over the map, so several processes mapping the same files share the OS page cache.
+    """
+
+    def __init__(self, root: Path | str, name: str) -> None:
+        self.root = Path(root)
+        self.name = name
+        self.tables: dict[str, pa.Table] = {}
+        for table in BUNDLE_TABLES:
+            path = table_path(self.root, name, table)
+            if not path.exists():
+                raise FileNotFoundError(f"Stored bundle '{name}' has no {table} table at {path}")
+            self.tables[table] = _map_table(path)
+        for table in OPTIONAL_TABLES:
+            path = table_path(self.root, name, table)
+            if path.exists():
+                self.tables[table] = _map_table(path)
+
+    def columns(self, table: str) -> list[str]:
+        return list(self.tables[table].column_names)
+
+    def row_count(self, table: str) -> int:
+        return int(self.tables[table].num_rows)
+
+    def column(self, table: str, column: str) -> pd.Series:
+        return self.frame(table, [column])[column]
+
+    def frame(self, table: str, columns: list[str] | None = None) -> pd.DataFrame:
+        data = self.tables[table]
+        if columns is not None:
+            data = data.select([c for c in columns if c in data.column_names])
+        return table_frame(data)
+
+    def to_bundle(self, columns: dict[str, list[str]] | None = None) -> DataBundle:
+        """A DataBundle whose tables are converted from the mapped files on first access."""
+        return StoredDataBundle(self, columns)
+
+
+class StoredDataBundle(DataBundle):
+    """DataBundle over a StoredBundle; each table becomes a DataFrame the first time it is read.
+
+    Tables that are never touched (e.g. market data during a pricing run) are never converted.
+    Assigning a table replaces it as on a plain DataBundle.
+    """
+
+    __slots__ = ("source", "selected")
+
+    def __init__(self, source: StoredBundle, columns: dict[str, list[str]] | None = None) -> None:
+        self.source = source
+        self.selected = columns or {}
+
+    def __getattr__(self, name: str) -> pd.DataFrame:
+        # Only reached while a table slot is still unset.
+        if name not in BUNDLE_TABLES and name not in OPTIONAL_TABLES:
+            raise AttributeError(name)
+        source = object.__getattribute__(self, "source")
+        frame = source.frame(name, self.selected.get(name)) if name in source.tables else pd.DataFrame()
+        setattr(self, name, frame)
+        return frame
+
+
+def _string_dtype(dtype: pa.DataType) -> pd.StringDtype | None:
+    return STRING_DTYPE if pa.types.is_string(dtype) or pa.types.is_large_string(dtype) else None
+
+
+def table_frame(data: pa.Table) -> pd.DataFrame:
+    """Convert an Arrow table without copying string columns into Python objects."""
+    # split_blocks avoids consolidating numeric columns, so they stay views over the mapped file;
+    # on pandas 2.x string columns are mapped to the generator's Arrow string dtype for the same reason.
+    return data.to_pandas(split_blocks=True, types_mapper=None if ARROW_BACKED_STRINGS else _string_dtype)
+
+
+def open_table(root: Path | str, name: str, table: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Memory-map a single stored table, e.g. one written by a streaming import."""
+    data = _map_table(table_path(Path(root), name, table))
+    if columns is not None:
+        data = data.select([c for c in columns if c in data.column_names])
+    return table_frame(data)
+
+
+def open_bundle(root: Path | str, name: str, columns: dict[str, list[str]] | None = None) -> DataBundle:
+    """Open a saved bundle as a DataBundle, optionally restricted to `columns` per table."""
+    return StoredBundle(root, name).to_bundle(columns)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import random
 from typing import Iterable
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from stress_wizard.models import DataBundle
 
@@ -37,28 +39,57 @@ CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "CNY"]
 GEOS = ["US", "EMEA", "APAC", "LATAM"]
 SECTORS = ["Tech", "Energy", "Financials", "Healthcare", "Industrials", "Utilities"]
 TENORS = ["1M", "3M", "6M", "1Y", "2Y", "3Y", "5Y", "7Y", "10Y", "20Y", "30Y"]
+# Arrow-backed strings with NaN missing values; pandas < 2.3 spells this storage "pyarrow_numpy".
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+STRING_DTYPE = (
+    pd.StringDtype("pyarrow", na_value=np.nan) if _PANDAS_VERSION >= (2, 3) else pd.StringDtype("pyarrow_numpy")
+)
 
 
 def _rng(seed: int = 42) -> np.random.Generator:
     return np.random.default_rng(seed)
 
 
+def string_column(values: pa.Array | pa.ChunkedArray) -> pd.Series:
+    return pd.Series(values, dtype=STRING_DTYPE)
+
+
+def choice_labels(rng: np.random.Generator, labels: list[str], n: int, p: list[float] | np.ndarray | None = None) -> pa.Array:
+    """Arrow version of `rng.choice(labels, n, p=p)` (same draws), without per-row Python strings."""
+    codes = rng.integers(0, len(labels), n) if p is None else rng.choice(len(labels), n, p=p)
+    return pc.take(pa.array(labels, pa.string()), pa.array(codes))
+
+
+def _pick(rng: np.random.Generator, labels: list[str], n: int, p: list[float] | np.ndarray | None = None) -> pd.Series:
+    return string_column(choice_labels(rng, labels, n, p))
+
+
+def numbered_labels(prefix: str, numbers: np.ndarray, width: int) -> pa.Array:
+    """f"{prefix}{i:0{width}d}" for each i, built with Arrow string kernels."""
+    digits = pc.utf8_lpad(pc.cast(pa.array(numbers), pa.string()), width, "0")
+    return pc.binary_join_element_wise(prefix, digits, "")
+
+
+def offset_days(now: datetime, days: np.ndarray) -> np.ndarray:
+    return np.datetime64(now, "us") + np.asarray(days, dtype="timedelta64[D]")
+
+
 def generate_positions(n: int = 3_500, seed: int = 42) -> pd.DataFrame:
     rng = _rng(seed)
     now = datetime.now()
 
     positions = pd.DataFrame(
         {
-            "instrument_id": [f"INS-{i:06d}" for i in range(1, n + 1)],
-            "asset_class": rng.choice(ASSET_CLASSES, n),
-            "sub_asset_class": rng.choice(["Macro", "Flow", "Options", "Credit", "Commod"], n),
-            "desk": rng.choice(DESKS, n),
-            "book": rng.choice([f"BOOK-{i:03d}" for i in range(1, 101)], n),
+            "instrument_id": string_column(numbered_labels("INS-", np.arange(1, n + 1), 6)),
+            "asset_class": _pick(rng, ASSET_CLASSES, n),
+            "sub_asset_class": _pick(rng, ["Macro", "Flow", "Options", "Credit", "Commod"], n),
+            "desk": _pick(rng, DESKS, n),
+            "book": _pick(rng, [f"BOOK-{i:03d}" for i in range(1, 101)], n),
             "notional": rng.normal(7_500_000, 2_500_000, n).clip(250_000, 30_000_000),
             "direction": rng.choice([1, -1], n),
-            "maturity": [now + timedelta(days=int(x)) for x in rng.integers(30, 3650, n)],
-            "currency": rng.choice(CURRENCIES, n),
-            "geography": rng.choice(GEOS, n),
+            "maturity": offset_days(now, rng.integers(30, 3650, n)),
+            "currency": _pick(rng, CURRENCIES, n),
+            "geography": _pick(rng, GEOS, n),
         }
     )
     return positions
@@ -92,21 +123,22 @@ def generate_sensitivities(positions: pd.DataFrame, seed: int = 43) -> pd.DataFr
 
 def generate_risk_driver_taxonomy(n: int = 300_000, seed: int = 44) -> pd.DataFrame:
     rng = _rng(seed)
-    asset_class = rng.choice(ASSET_CLASSES, n)
-    sector = rng.choice(SECTORS, n)
-    geography = rng.choice(GEOS, n)
-    tenor = rng.choice(TENORS, n)
+    asset_class = choice_labels(rng, ASSET_CLASSES, n)
+    sector = choice_labels(rng, SECTORS, n)
+    geography = choice_labels(rng, GEOS, n)
+    tenor = choice_labels(rng, TENORS, n)
+    name = pc.binary_join_element_wise(asset_class, sector, geography, tenor, numbered_labels("", np.arange(n), 7), "_")
 
     df = pd.DataFrame(
         {
-            "driver_id": [f"DRV-{i:07d}" for i in range(1, n + 1)],
-            "name": [f"{asset_class[i]}_{sector[i]}_{geography[i]}_{tenor[i]}_{i:07d}" for i in range(n)],
-            "asset_class": asset_class,
-            "geography": geography,
-            "tenor": tenor,
-            "sector": sector,
-            "issuer": rng.choice([f"Issuer-{i:05d}" for i in range(1, 5001)], n),
-            "curve_point": rng.choice(["Front", "Belly", "Long"], n),
+            "driver_id": string_column(numbered_labels("DRV-", np.arange(1, n + 1), 7)),
+            "name": string_column(name),
+            "asset_class": string_column(asset_class),
+            "geography": string_column(geography),
+            "tenor": string_column(tenor),
+            "sector": string_column(sector),
+            "issuer": _pick(rng, [f"Issuer-{i:05d}" for i in range(1, 5001)], n),
+            "curve_point": _pick(rng, ["Front", "Belly", "Long"], n),
         }
     )
     return df
@@ -123,12 +155,7 @@ def generate_market_data(risk_drivers: pd.DataFrame, seed: int = 45) -> pd.DataF
         rng.normal(100.0, 35.0, n),
     )
 
-    as_of = np.array(
-        [
-            now - timedelta(days=int(x))
-            for x in rng.choice([0, 1, 2, 3], size=n, p=[0.6, 0.25, 0.1, 0.05])
-        ]
-    )
+    as_of = offset_days(now, -rng.choice([0, 1, 2, 3], size=n, p=[0.6, 0.25, 0.1, 0.05]))
 
     return pd.DataFrame(
         {
@@ -136,12 +163,42 @@ def generate_market_data(risk_drivers: pd.DataFrame, seed: int = 45) -> pd.DataF
             "asset_class": risk_drivers["asset_class"],
             "level": levels,
             "as_of": as_of,
-            "source": rng.choice(["Bloomberg", "Refinitiv", "Internal"], n),
+            "source": _pick(rng, ["Bloomberg", "Refinitiv", "Internal"], n),
+        }
+    )
+
+
+def generate_driver_sensitivities(positions: pd.DataFrame, risk_drivers: pd.DataFrame, drivers_per_position: int = 4, seed: int = 47) -> pd.DataFrame:
+    """Long-format instrument x driver deltas: each instrument loads on a few drivers of its asset class."""
+    rng = _rng(seed)
+    n = len(positions)
+    by_class = {ac: grp.to_numpy() for ac, grp in risk_drivers.groupby("asset_class", sort=False)["driver_id"]}
+    fallback = risk_drivers["driver_id"].to_numpy()
+
+    asset_class = np.repeat(positions["asset_class"].to_numpy(), drivers_per_position)
+    driver_id = np.empty(len(asset_class), dtype=object)
+    for ac in pd.unique(asset_class):
+        mask = asset_class == ac
+        pool = by_class.get(ac, fallback)
+        driver_id[mask] = pool[rng.integers(0, len(pool), int(mask.sum()))]
+
+    # Split each instrument's delta across its drivers with random weights.
+    weights = rng.dirichlet(np.ones(drivers_per_position), n).ravel()
+    scale = np.repeat(positions["notional"].to_numpy() / 1_000_000.0, drivers_per_position)
+    return pd.DataFrame(
+        {
+            "instrument_id": np.repeat(positions["instrument_id"].to_numpy(), drivers_per_position),
+            "driver_id": driver_id,
+            "delta": rng.normal(0.8, 0.35, len(weights)) * weights * scale,
+            "gamma": rng.normal(0.02, 0.01, len(weights)) * weights * scale,
         }
     )
 
 
 def generate_sample_driver_shocks(risk_drivers: pd.DataFrame, n: int = 1_000, seed: int = 46) -> pd.DataFrame:
+    if "driver_id" not in risk_drivers.columns:
+        # No taxonomy loaded yet (e.g. a placeholder bundle): no shocks to seed.
+        return pd.DataFrame({"driver_id": pd.Series(dtype=str), "shock": pd.Series(dtype=float), "lock": pd.Series(dtype=bool)})
     rng = _rng(seed)
     sample = risk_drivers.sample(n=min(n, len(risk_drivers)), random_state=seed).copy()
     sample["shock"] = rng.normal(0.0, 0.08, len(sample))
@@ -149,9 +206,9 @@ def generate_sample_driver_shocks(risk_drivers: pd.DataFrame, n: int = 1_000, se
     return sample[["driver_id", "shock", "lock"]]
 
 
-def generate_demo_bundle(risk_driver_count: int = 60_000) -> DataBundle:
+def generate_demo_bundle(risk_driver_count: int = 60_000, position_count: int = 3_500) -> DataBundle:
     # Default to 60k for instant startup; users can regenerate 300k from the UI.
-    positions = generate_positions()
+    positions = generate_positions(position_count)
     sensitivities = generate_sensitivities(positions)
     risk_drivers = generate_risk_driver_taxonomy(risk_driver_count)
     market_data = generate_market_data(risk_drivers)
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from stress_wizard.data.columnar_store import BATCH_ROWS, open_table, save_table
+from stress_wizard.data.demo_data import (
+    ASSET_CLASSES,
+    CURRENCIES,
+    DESKS,
+    GEOS,
+    SECTORS,
+    TENORS,
+    choice_labels,
+    numbered_labels,
+    offset_days,
+    string_column,
+)
+from stress_wizard.models import DataBundle
+
+
+# Home asset class of each desk; `desk_alignment` of a desk's positions are in it.
+DESK_ASSET_CLASS = {
+    "Rates Macro": "Rates",
+    "Rates Exotics": "Rates",
+    "G10 FX": "FX",
+    "EM FX": "FX",
+    "Equity Derivatives": "Equities",
+    "Cash Equities": "Equities",
+    "IG Credit": "Credit",
+    "HY Credit": "Credit",
+    "Commodities": "Commodities",
+    "Volatility Trading": "Volatility",
+    "Structured Solutions": "Equities",
+    "EM Rates": "Rates",
+    "FX Options": "FX",
+    "Prime Finance": "Equities",
+    "Securitized Products": "Credit",
+    "Municipal": "Rates",
+    "EM Credit": "Credit",
+    "Cross-Asset Vol": "Volatility",
+    "XVA": "Rates",
+}
+# Share of the driver taxonomy per asset class: curves and issuers dominate.
+DRIVER_MIX = {"Rates": 0.30, "FX": 0.08, "Equities": 0.25, "Credit": 0.25, "Commodities": 0.07, "Volatility": 0.05}
+# Random streams: one per table, each split into independently seeded blocks.
+_STREAMS = {"setup": 0, "risk_drivers": 1, "market_data": 2, "positions": 3, "sensitivities": 4, "driver_sensitivities": 5}
+
+Progress = Callable[[str, int, int], None]
+
+
+@dataclass(slots=True)
+class SyntheticConfig:
+    """Shape of a synthetic bundle. The same config (seed, sizes, skew and `as_of`) always yields the same data."""
+
+    positions: int = 1_000_000
+    drivers: int = 1_000_000
+    seed: int = 42
+    as_of: datetime = field(default_factory=lambda: datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+    books: int = 2_000
+    book_concentration: float = 1.1  # Zipf exponent of positions per book; 0 spreads them evenly
+    desk_alignment: float = 0.85  # share of a desk's positions in its home asset class
+    notional_tail: float = 1.6  # Pareto alpha of notionals; lower is fatter-tailed
+    notional_floor: float = 250_000.0
+    notional_cap: float = 5_000_000_000.0
+    issuers: int = 5_000
+    issuer_concentration: float = 1.0  # Zipf exponent of drivers per issuer
+    drivers_per_position: int = 0  # > 0 also generates long-format driver sensitivities
+    block_rows: int = BATCH_ROWS  # each block draws from its own seeded stream, so this is part of the shape too
+
+
+def _block_rng(config: SyntheticConfig, stream: str, block: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(config.seed, spawn_key=(_STREAMS[stream], block)))
+
+
+def _blocks(total: int, block_rows: int) -> Iterator[tuple[int, int, int]]:
+    for block, start in enumerate(range(0, total, block_rows)):
+        yield block, start, min(start + block_rows, total)
+
+
+def _zipf(count: int, exponent: float) -> np.ndarray:
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -exponent
+    return weights / weights.sum()
+
+
+def _width(count: int, minimum: int) -> int:
+    return max(minimum, len(str(count)))
+
+
+@dataclass(slots=True)
+class _Layout:
+    """Per-bundle structure drawn once: which desk owns each book and how often books are used."""
+
+    book_labels: pa.Array
+    book_desk: np.ndarray
+    book_p: np.ndarray
+    desk_home: np.ndarray
+
+
+def _layout(config: SyntheticConfig) -> _Layout:
+    rng = _block_rng(config, "setup", 0)
+    book_desk = rng.integers(0, len(DESKS), config.books)
+    # Shuffle so the busiest books are not all on the first desks.
+    book_p = rng.permutation(_zipf(config.books, config.book_concentration))
+    return _Layout(
+        book_labels=numbered_labels("BOOK-", np.arange(1, config.books + 1), _width(config.books, 3)),
+        book_desk=book_desk,
+        book_p=book_p,
+        desk_home=np.array([ASSET_CLASSES.index(DESK_ASSET_CLASS[d]) for d in DESKS]),
+    )
+
+
+@dataclass(slots=True)
+class _DriverPool:
+    """Driver ids grouped by asset class, for drawing same-class drivers per position."""
+
+    driver_id: pa.ChunkedArray | pa.Array
+    order: np.ndarray
+    offsets: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_frame(cls, drivers: pd.DataFrame) -> _DriverPool:
+        codes = pd.Categorical(drivers["asset_class"], categories=ASSET_CLASSES).codes.astype(np.int64)
+        codes[codes < 0] = len(ASSET_CLASSES)  # classes outside ASSET_CLASSES sort last and are never drawn
+        counts = np.bincount(codes, minlength=len(ASSET_CLASSES) + 1)[: len(ASSET_CLASSES)]
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        driver_id = pa.array(drivers["driver_id"])
+        return cls(driver_id=driver_id, order=np.argsort(codes, kind="stable"), offsets=offsets, counts=counts)
+
+    def draw(self, rng: np.random.Generator, asset_class: np.ndarray) -> pa.Array:
+        counts = self.counts[asset_class]
+        # A class without drivers draws from the whole taxonomy.
+        empty = counts == 0
+        start = np.where(empty, 0, self.offsets[asset_class])
+        span = np.where(empty, len(self.order), counts)
+        rows = self.order[start + (rng.random(len(asset_class)) * span).astype(np.int64)]
+        return pc.take(self.driver_id, pa.array(rows))
+
+
+def risk_driver_blocks(config: SyntheticConfig) -> Iterator[pd.DataFrame]:
+    width = _width(config.drivers, 7)
+    mix = np.array([DRIVER_MIX[ac] for ac in ASSET_CLASSES])
+    issuers = numbered_labels("Issuer-", np.arange(1, config.issuers + 1), _width(config.issuers, 5))
+    issuer_p = _zipf(config.issuers, config.issuer_concentration)
+    for block, start, stop in _blocks(config.drivers, config.block_rows):
+        rng = _block_rng(config, "risk_drivers", block)
+        n = stop - start
+        number = numbered_labels("", np.arange(start + 1, stop + 1), width)
+        asset_class = choice_labels(rng, ASSET_CLASSES, n, mix / mix.sum())
+        sector = choice_labels(rng, SECTORS, n)
+        geography = choice_labels(rng, GEOS, n)
+        tenor = choice_labels(rng, TENORS, n)
+        yield pd.DataFrame(
+            {
+                "driver_id": string_column(pc.binary_join_element_wise("DRV-", number, "")),
+                "name": string_column(pc.binary_join_element_wise(asset_class, sector, geography, tenor, number, "_")),
+                "asset_class": string_column(asset_class),
+                "geography": string_column(geography),
+                "tenor": string_column(tenor),
+                "sector": string_column(sector),
+                "issuer": string_column(pc.take(issuers, pa.array(rng.choice(config.issuers, n, p=issuer_p)))),
+                "curve_point": string_column(choice_labels(rng, ["Front", "Belly", "Long"], n)),
+            }
+        )
+
+
+def market_data_blocks(config: SyntheticConfig, drivers: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for block, start, stop in _blocks(len(drivers), config.block_rows):
+        rng = _block_rng(config, "market_data", block)
+        part = drivers.iloc[start:stop]
+        n = stop - start
+        rates = part["asset_class"].eq("Rates").to_numpy()
+        yield pd.DataFrame(
+            {
+                "driver_id": part["driver_id"].reset_index(drop=True),
+                "asset_class": part["asset_class"].reset_index(drop=True),
+                "level": np.where(rates, rng.normal(2.5, 1.0, n), rng.lognormal(np.log(100.0), 0.35, n)),
+                "as_of": offset_days(config.as_of, -rng.choice(4, n, p=[0.6, 0.25, 0.1, 0.05])),
+                "source": string_column(choice_labels(rng, ["Bloomberg", "Refinitiv", "Internal"], n)),
+            }
+        )
+
+
+def position_blocks(config: SyntheticConfig, pool: _DriverPool) -> Iterator[pd.DataFrame]:
+    """Positions with concentrated books, desks that own books, desk-aligned asset classes and Pareto notionals."""
+    layout = _layout(config)
+    width = _width(config.positions, 6)
+    classes = pa.array(ASSET_CLASSES)
+    for block, start, stop in _blocks(config.positions, config.block_rows):
+        rng = _block_rng(config, "positions", block)
+        n = stop - start
+        book = rng.choice(config.books, n, p=layout.book_p)
+        desk = layout.book_desk[book]
+        aligned = rng.random(n) < config.desk_alignment
+        asset_class = np.where(aligned, layout.desk_home[desk], rng.integers(0, len(ASSET_CLASSES), n))
+        notional = np.minimum(config.notional_floor * (1.0 + rng.pareto(config.notional_tail, n)), config.notional_cap)
+        yield pd.DataFrame(
+            {
+                "instrument_id": string_column(numbered_labels("INS-", np.arange(start + 1, stop + 1), width)),
+                "asset_class": string_column(pc.take(classes, pa.array(asset_class))),
+                "sub_asset_class": string_column(choice_labels(rng, ["Macro", "Flow", "Options", "Credit", "Commod"], n)),
+                "desk": string_column(pc.take(pa.array(DESKS), pa.array(desk))),
+                "book": string_column(pc.take(layout.book_labels, pa.array(book))),
+                "notional": notional,
+                "direction": rng.choice([1, -1], n),
+                "maturity": offset_days(config.as_of, rng.integers(30, 3650, n)),
+                "currency": string_column(choice_labels(rng, CURRENCIES, n)),
+                "geography": string_column(choice_labels(rng, GEOS, n)),
+                "driver_id": string_column(pool.draw(rng, asset_class)),
+            }
+        )
+
+
+def sensitivity_blocks(config: SyntheticConfig, positions: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for block, start, stop in _blocks(len(positions), config.block_rows):
+        rng = _block_rng(config, "sensitivities", block)
+        part = positions.iloc[start:stop]
+        n = stop - start
+        scale = part["notional"].to_numpy() / 1_000_000.0
+        vega = rng.normal(0.1, 0.07, n) * scale
+        vega[rng.random(n) < 0.02] = np.nan  # sparse gaps, as in the demo bundle
+        yield pd.DataFrame(
+            {
+                "instrument_id": part["instrument_id"].reset_index(drop=True),
+                "delta": rng.normal(0.8, 0.35, n) * scale,
+                "gamma": rng.normal(0.02, 0.01, n) * scale,
+                "vega": vega,
+                "rho": rng.normal(0.05, 0.04, n) * scale,
+                "cs01": rng.normal(0.08, 0.03, n) * scale,
+                "dv01": rng.normal(0.06, 0.02, n) * scale,
+                "theta": rng.normal(-0.03, 0.02, n) * scale,
+                "convexity": rng.normal(0.015, 0.008, n) * scale,
+                "cross_gamma": rng.normal(0.005, 0.002, n) * scale,
+            }
+        )
+
+
+def driver_sensitivity_blocks(config: SyntheticConfig, positions: pd.DataFrame, pool: _DriverPool) -> Iterator[pd.DataFrame]:
+    k = config.drivers_per_position
+    instrument_id = pa.array(positions["instrument_id"])
+    class_code = pd.Categorical(positions["asset_class"], categories=ASSET_CLASSES).codes.astype(np.int64)
+    for block, start, stop in _blocks(len(positions), config.block_rows):
+        rng = _block_rng(config, "driver_sensitivities", block)
+        part = positions.iloc[start:stop]
+        n = stop - start
+        weights = rng.dirichlet(np.ones(k), n).ravel()
+        scale = np.repeat(part["notional"].to_numpy() / 1_000_000.0, k)
+        yield pd.DataFrame(
+            {
+                "instrument_id": string_column(pc.take(instrument_id, pa.array(np.repeat(np.arange(start, stop), k)))),
+                "driver_id": string_column(pool.draw(rng, np.repeat(class_code[start:stop], k))),
+                "delta": rng.normal(0.8, 0.35, n * k) * weights * scale,
+                "gamma": rng.normal(0.02, 0.01, n * k) * weights * scale,
+            }
+        )
+
+
+def _counted(blocks: Iterator[pd.DataFrame], table: str, total: int, progress: Progress | None) -> Iterator[pd.DataFrame]:
+    done = 0
+    for frame in blocks:
+        yield frame
+        done += len(frame)
+        if progress is not None:
+            progress(table, done, total)
+
+
+def write_synthetic_bundle(root: Path | str, name: str, config: SyntheticConfig | None = None, progress: Progress | None = None) -> dict[str, Path]:
+    """Stream a synthetic bundle block by block into the columnar store; returns the paths by table.
+
+    Only one block per table is in memory while writing. Later tables (market data, sensitivities)
+    read the columns they depend on back from the memory-mapped files written before them.
+    """
+    config = config or SyntheticConfig()
+    paths = {"risk_drivers": save_table(_counted(risk_driver_blocks(config), "risk_drivers", config.drivers, progress), root, name, "risk_drivers")}
+    drivers = open_table(root, name, "risk_drivers", ["driver_id", "asset_class"])
+    paths["market_data"] = save_table(_counted(market_data_blocks(config, drivers), "market_data", config.drivers, progress), root, name, "market_data")
+    pool = _DriverPool.from_frame(drivers)
+    paths["positions"] = save_table(_counted(position_blocks(config, pool), "positions", config.positions, progress), root, name, "positions")
+    positions = open_table(root, name, "positions", ["instrument_id", "asset_class", "notional"])
+    paths["sensitivities"] = save_table(_counted(sensitivity_blocks(config, positions), "sensitivities", config.positions, progress), root, name, "sensitivities")
+    if config.drivers_per_position > 0:
+        total = config.positions * config.drivers_per_position
+        blocks = driver_sensitivity_blocks(config, positions, pool)
+        paths["driver_sensitivities"] = save_table(_counted(blocks, "driver_sensitivities", total, progress), root, name, "driver_sensitivities")
+    return paths
+
+
+def generate_synthetic_bundle(config: SyntheticConfig | None = None) -> DataBundle:
+    """In-memory version of `write_synthetic_bundle`, with identical data."""
+    config = config or SyntheticConfig()
+    drivers = pd.concat(risk_driver_blocks(config), ignore_index=True)
+    pool = _DriverPool.from_frame(drivers)
+    positions = pd.concat(position_blocks(config, pool), ignore_index=True)
+    driver_sens = pd.DataFrame()
+    if config.drivers_per_position > 0:
+        driver_sens = pd.concat(driver_sensitivity_blocks(config, positions, pool), ignore_index=True)
+    return DataBundle(
+        positions=positions,
+        sensitivities=pd.concat(sensitivity_blocks(config, positions), ignore_index=True),
+        market_data=pd.concat(market_data_blocks(config, drivers), ignore_index=True),
+        risk_drivers=drivers,
+        driver_sensitivities=driver_sens,
+    )
@@ -7,6 +7,7 @@ from typing import Any
 
 import pandas as pd
 
+from stress_wizard.instrumentation import traced
 from stress_wizard.models import Scenario
 
 
@@ -66,18 +67,21 @@ def _serialize_scenario(scenario: Scenario) -> dict[str, Any]:
     return payload
 
 
+@traced("export.scenario_config")
 def write_scenario_config(scenario_dir: Path, scenario: Scenario) -> Path:
     path = scenario_dir / "scenario_config.json"
     path.write_text(json.dumps(_serialize_scenario(scenario), indent=2), encoding="utf-8")
     return path
 
 
+@traced("export.driver_shocks")
 def write_driver_shocks(scenario_dir: Path, shocks: pd.DataFrame) -> Path:
     path = scenario_dir / "driver_shocks.csv"
     shocks.to_csv(path, index=False)
     return path
 
 
+@traced("export.results_workbook")
 def write_results_workbook(scenario_dir: Path, sheets: dict[str, pd.DataFrame]) -> Path:
     path = scenario_dir / "pnl_results.xlsx"
     with pd.ExcelWriter(path, engine="openpyxl") as writer:
@@ -86,6 +90,7 @@ def write_results_workbook(scenario_dir: Path, sheets: dict[str, pd.DataFrame])
     return path
 
 
+@traced("export.narrative")
 def write_narrative(scenario_dir: Path, narrative: str) -> Path:
     path = scenario_dir / "narrative.md"
     path.write_text(narrative, encoding="utf-8")
@@ -109,6 +114,7 @@ def append_audit_log(scenario_dir: Path, action: str, actor: str, details: dict[
     return path
 
 
+@traced("export.governance_artifacts")
 def write_governance_artifacts(
     scenario_dir: Path,
     approval_status: dict[str, Any],
@@ -119,3 +125,22 @@ def write_governance_artifacts(
     (gov_dir / "approval_status.json").write_text(json.dumps(approval_status, indent=2), encoding="utf-8")
     (gov_dir / "comments_thread.json").write_text(json.dumps(comments, indent=2), encoding="utf-8")
     (gov_dir / "distribution_log.json").write_text(json.dumps(distribution_log, indent=2), encoding="utf-8")
+
+
+def list_scenario_dirs(root: Path) -> list[Path]:
+    """Saved scenario folders under `root/scenarios`, oldest first by folder name."""
+    scenarios = root / "scenarios"
+    if not scenarios.exists():
+        return []
+    return [path.parent for path in sorted(scenarios.glob("*/scenario_config.json"))]
+
+
+def read_scenario_config(scenario_dir: Path) -> dict[str, Any]:
+    return json.loads((scenario_dir / "scenario_config.json").read_text(encoding="utf-8"))
+
+
+def read_driver_shocks(scenario_dir: Path) -> pd.DataFrame:
+    path = scenario_dir / "driver_shocks.csv"
+    if not path.exists():
+        return pd.DataFrame(columns=["driver_id", "shock"])
+    return pd.read_csv(path)
@@ -5,6 +5,8 @@ from pathlib import Path
 
 import pandas as pd
 
+from stress_wizard.instrumentation import traced
+
 
 def build_narrative_document(
     scenario_name: str,
@@ -38,6 +40,7 @@ def build_shock_justification_table(driver_shocks: pd.DataFrame) -> pd.DataFrame
     return table
 
 
+@traced("export.pdf_summary")
 def export_pdf_summary(path: Path, title: str, summary_lines: list[str]) -> Path:
     try:
         from reportlab.lib.pagesizes import letter
@@ -67,6 +70,7 @@ def export_pdf_summary(path: Path, title: str, summary_lines: list[str]) -> Path
     return path
 
 
+@traced("export.pptx_summary")
 def export_pptx_summary(path: Path, title: str, bullets: list[str]) -> Path:
     try:
         from pptx import Presentation
@@ -3,6 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 import difflib
 
+import numpy as np
+import pandas as pd
+
+from stress_wizard.instrumentation import traced
+
 
 @dataclass(slots=True)
 class MappingSuggestion:
@@ -37,6 +42,7 @@ REQUIRED_FIELDS = {
     ],
     "market_data": ["driver_id", "asset_class", "level", "as_of"],
     "risk_drivers": ["driver_id", "name", "asset_class", "geography", "tenor", "sector"],
+    "driver_sensitivities": ["instrument_id", "driver_id", "delta"],
 }
 
 
@@ -67,6 +73,22 @@ SYNONYMS = {
     "as_of": ["asof", "timestamp", "date"],
 }
 
+NUMERIC_FIELDS = {
+    "notional",
+    "direction",
+    "delta",
+    "gamma",
+    "vega",
+    "rho",
+    "cs01",
+    "dv01",
+    "theta",
+    "convexity",
+    "cross_gamma",
+    "level",
+}
+DATETIME_FIELDS = {"maturity", "as_of"}
+
 
 def _normalize(text: str) -> str:
     return text.lower().replace(" ", "_").replace("-", "_")
@@ -101,3 +123,18 @@ def suggest_mappings(source_columns: list[str], category: str) -> list[MappingSu
             )
 
     return suggestions
+
+
+@traced("ingestion.apply_mapping")
+def apply_mapping(frame: pd.DataFrame, mapping: dict[str, str] | None = None) -> pd.DataFrame:
+    """Rename source columns to their targets and coerce known numeric/date fields.
+
+    Unparseable values become NaN/NaT so every chunk of a streamed file ends up with the same dtypes.
+    """
+    out = frame.rename(columns=mapping) if mapping else frame.copy()
+    for col in out.columns:
+        if col in NUMERIC_FIELDS:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(np.float64)
+        elif col in DATETIME_FIELDS:
+            out[col] = pd.to_datetime(out[col], errors="coerce")
+    return out
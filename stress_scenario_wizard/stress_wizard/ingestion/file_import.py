@@ -1,21 +1,115 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+
+from stress_wizard.data.columnar_store import save_table
+from stress_wizard.ingestion.column_mapper import DATETIME_FIELDS, NUMERIC_FIELDS, apply_mapping
+from stress_wizard.instrumentation import traced
 
 
 SUPPORTED_EXTENSIONS = {".csv", ".xlsx", ".xls", ".json", ".parquet"}
+DEFAULT_CHUNK_ROWS = 250_000
+DISTINCT_SKETCH_SIZE = 4_096
+
+ProgressCallback = Callable[[int, float], None]
 
 
 class FileImportError(RuntimeError):
     """Raised when a file import operation fails."""
 
 
+@dataclass(slots=True)
+class _ColumnSketch:
+    """Null count, k-minimum-values distinct estimate and bottom-k reservoir sample for one column."""
+
+    dtype: str
+    nulls: int = 0
+    hashes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint64))
+    sample_keys: np.ndarray = field(default_factory=lambda: np.empty(0))
+    sample_values: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=object))
+
+    def update(self, series: pd.Series, rng: np.random.Generator, sample_size: int) -> None:
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+
+        hashed = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        self.hashes = np.union1d(self.hashes, hashed)[:DISTINCT_SKETCH_SIZE]
+
+        keys = np.concatenate([self.sample_keys, rng.random(len(values))])
+        pool = np.concatenate([self.sample_values, values.to_numpy(dtype=object)])
+        keep = np.argsort(keys)[:sample_size] if len(keys) <= sample_size else np.argpartition(keys, sample_size)[:sample_size]
+        self.sample_keys = keys[keep]
+        self.sample_values = pool[keep]
+
+    def distinct(self) -> int:
+        if len(self.hashes) < DISTINCT_SKETCH_SIZE:
+            return len(self.hashes)
+        kth = float(self.hashes[-1]) / 2.0**64
+        return int(round((DISTINCT_SKETCH_SIZE - 1) / kth))
+
+
+class StreamingColumnStats:
+    """Column stats accumulated chunk by chunk in bounded memory.
+
+    Distinct counts are exact below DISTINCT_SKETCH_SIZE values and a KMV estimate (~2% error) above.
+    """
+
+    def __init__(self, sample_size: int = 3, seed: int = 0) -> None:
+        self.sample_size = sample_size
+        self.rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._columns: dict[str, _ColumnSketch] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            sketch = self._columns.setdefault(col, _ColumnSketch(dtype=str(chunk[col].dtype)))
+            sketch.update(chunk[col], self._rng, self.sample_size)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                {
+                    "column": col,
+                    "dtype": sketch.dtype,
+                    "null_count": sketch.nulls,
+                    "null_pct": 0.0 if self.rows == 0 else round(sketch.nulls / self.rows * 100, 2),
+                    "unique_count": sketch.distinct(),
+                    "sample_values": ", ".join(str(x) for x in sketch.sample_values),
+                }
+                for col, sketch in self._columns.items()
+            ]
+        )
+
+
+@dataclass(slots=True)
+class StreamImportResult:
+    category: str
+    path: Path
+    rows: int
+    stats: pd.DataFrame
+
+
+def _widen_integers(chunk: pd.DataFrame) -> pd.DataFrame:
+    # A later chunk may hold nulls in an integer column, so keep one float dtype from the start.
+    ints = [col for col in chunk.columns if pd.api.types.is_integer_dtype(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col])]
+    return chunk.astype({col: np.float64 for col in ints}) if ints else chunk
+
+
 class FileImporter:
     """File importer with preview + summary utilities."""
 
+    @traced("ingestion.load")
     def load(self, path: str | Path, sheet_name: str | None = None) -> pd.DataFrame:
         file_path = Path(path)
         if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
@@ -35,6 +129,191 @@ class FileImporter:
         except Exception as exc:
             raise FileImportError(f"Failed to load file {file_path}: {exc}") from exc
 
+    def iter_chunks(
+        self,
+        path: str | Path,
+        sheet_name: str | None = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        progress: ProgressCallback | None = None,
+        dtype: dict[str, Any] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the file in chunks of at most `chunk_rows` rows.
+
+        CSV, Parquet, JSON-lines and .xlsx are read incrementally; a JSON array or legacy .xls
+        file has to be parsed whole and is then sliced. `progress` receives (rows, fraction).
+        `dtype` maps columns to the dtype every chunk should have; CSV and JSON parse straight to it.
+        """
+        file_path = Path(path)
+        suffix = file_path.suffix.lower()
+        if suffix not in SUPPORTED_EXTENSIONS:
+            raise FileImportError(f"Unsupported file type: {file_path.suffix}")
+
+        try:
+            if suffix == ".csv":
+                chunks = self._csv_chunks(file_path, chunk_rows, dtype)
+            elif suffix == ".parquet":
+                chunks = self._parquet_chunks(file_path, chunk_rows)
+            elif suffix == ".xlsx":
+                chunks = self._xlsx_chunks(file_path, sheet_name, chunk_rows)
+            elif suffix == ".json" and not self._is_json_array(file_path):
+                chunks = self._json_lines_chunks(file_path, chunk_rows, dtype)
+            elif suffix == ".json":
+                chunks = self._sliced(pd.read_json(file_path, dtype=dtype if dtype else True), chunk_rows)
+            else:
+                chunks = self._sliced(self.load(file_path, sheet_name=sheet_name), chunk_rows)
+
+            rows = 0
+            for chunk, fraction in chunks:
+                if dtype and suffix not in (".csv", ".json"):
+                    chunk = chunk.astype({col: dtype[col] for col in chunk.columns if col in dtype})
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows, min(fraction, 1.0))
+                yield chunk
+        except FileImportError:
+            raise
+        except Exception as exc:
+            raise FileImportError(f"Failed to stream file {file_path}: {exc}") from exc
+
+    @traced("ingestion.stream_import")
+    def stream_import(
+        self,
+        path: str | Path,
+        root: str | Path,
+        bundle_name: str,
+        category: str,
+        mapping: dict[str, str] | None = None,
+        sheet_name: str | None = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        progress: ProgressCallback | None = None,
+    ) -> StreamImportResult:
+        """Map, coerce and profile the file chunk by chunk, writing it to the columnar store.
+
+        Peak memory is one chunk plus fixed-size stats sketches regardless of file size; open the
+        result with `columnar_store.open_table`.
+        """
+        stats = StreamingColumnStats()
+
+        def prepared() -> Iterator[pd.DataFrame]:
+            dtype = self._text_dtypes(Path(path), sheet_name, mapping)
+            for chunk in self.iter_chunks(path, sheet_name=sheet_name, chunk_rows=chunk_rows, progress=progress, dtype=dtype):
+                chunk = _widen_integers(apply_mapping(chunk, mapping))
+                stats.update(chunk)
+                yield chunk
+
+        try:
+            written = save_table(prepared(), root, bundle_name, category)
+        except FileImportError:
+            raise
+        except Exception as exc:
+            raise FileImportError(f"Failed to import {path} into {category}: {exc}") from exc
+        return StreamImportResult(category=category, path=written, rows=stats.rows, stats=stats.to_frame())
+
+    def _text_dtypes(self, file_path: Path, sheet_name: str | None, mapping: dict[str, str] | None) -> dict[str, Any] | None:
+        # Types inferred from the first chunk need not hold for later ones (a column that starts
+        # all-null, codes that look numeric until a letter appears), so every source column that
+        # does not map to a known numeric/date field is read as a nullable string. Parquet has a fixed schema.
+        if file_path.suffix.lower() == ".parquet":
+            return None
+        typed = NUMERIC_FIELDS | DATETIME_FIELDS
+        return {col: pd.StringDtype() for col in self._header(file_path, sheet_name) if (mapping or {}).get(col, col) not in typed}
+
+    def _header(self, file_path: Path, sheet_name: str | None) -> list[str]:
+        """Column names read from the head of the file, without parsing the rows."""
+        suffix = file_path.suffix.lower()
+        if suffix == ".csv":
+            return list(pd.read_csv(file_path, nrows=0).columns)
+        if suffix == ".xlsx":
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+                return [str(h) for h in next(sheet.iter_rows(max_row=1, values_only=True), ())]
+            finally:
+                workbook.close()
+        if suffix == ".xls":
+            return list(pd.read_excel(file_path, sheet_name=sheet_name or 0, nrows=0).columns)
+        return list(self._first_json_record(file_path))
+
+    @staticmethod
+    def _first_json_record(file_path: Path, block: int = 65_536) -> dict[str, Any]:
+        # Decode only as much of the file as the first record needs, for JSON lines and arrays alike.
+        decoder = json.JSONDecoder()
+        text = ""
+        with file_path.open("r", encoding="utf-8") as handle:
+            while True:
+                more = handle.read(block)
+                text += more
+                start = text.lstrip().lstrip("[").lstrip()
+                try:
+                    record, _ = decoder.raw_decode(start)
+                except json.JSONDecodeError:
+                    if not more:
+                        return {}
+                    continue
+                return record if isinstance(record, dict) else {}
+
+    @staticmethod
+    def _csv_chunks(file_path: Path, chunk_rows: int, dtype: dict[str, Any] | None = None) -> Iterator[tuple[pd.DataFrame, float]]:
+        size = max(file_path.stat().st_size, 1)
+        with file_path.open("rb") as handle, pd.read_csv(handle, chunksize=chunk_rows, dtype=dtype) as reader:
+            for chunk in reader:
+                yield chunk, handle.tell() / size
+
+    @staticmethod
+    def _json_lines_chunks(file_path: Path, chunk_rows: int, dtype: dict[str, Any] | None = None) -> Iterator[tuple[pd.DataFrame, float]]:
+        size = max(file_path.stat().st_size, 1)
+        with file_path.open("rb") as handle, pd.read_json(handle, lines=True, chunksize=chunk_rows, dtype=dtype if dtype else True) as reader:
+            for chunk in reader:
+                yield chunk, handle.tell() / size
+
+    @staticmethod
+    def _parquet_chunks(file_path: Path, chunk_rows: int) -> Iterator[tuple[pd.DataFrame, float]]:
+        parquet = pq.ParquetFile(file_path)
+        total = max(parquet.metadata.num_rows, 1)
+        rows = 0
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            rows += batch.num_rows
+            yield batch.to_pandas(), rows / total
+
+    @staticmethod
+    def _xlsx_chunks(file_path: Path, sheet_name: str | None, chunk_rows: int) -> Iterator[tuple[pd.DataFrame, float]]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            total = max((sheet.max_row or 1) - 1, 1)
+            rows_iter = sheet.iter_rows(values_only=True)
+            header = [str(h) for h in next(rows_iter, ())]
+            buffer: list[tuple[Any, ...]] = []
+            done = 0
+            for row in rows_iter:
+                buffer.append(row)
+                if len(buffer) == chunk_rows:
+                    done += len(buffer)
+                    yield pd.DataFrame(buffer, columns=header), done / total
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header), 1.0
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _is_json_array(file_path: Path) -> bool:
+        with file_path.open("r", encoding="utf-8") as handle:
+            while True:
+                ch = handle.read(1)
+                if not ch or not ch.isspace():
+                    return ch == "["
+
+    @staticmethod
+    def _sliced(frame: pd.DataFrame, chunk_rows: int) -> Iterator[tuple[pd.DataFrame, float]]:
+        total = max(len(frame), 1)
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start : start + chunk_rows], min(start + chunk_rows, total) / total
+
     def available_sheets(self, path: str | Path) -> list[str]:
         file_path = Path(path)
         if file_path.suffix.lower() not in {".xlsx", ".xls"}:
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+SEVERITIES = ("HIGH", "MEDIUM", "LOW")
+GREEK_COLUMNS = ["delta", "gamma", "vega", "rho", "cs01", "dv01", "theta", "convexity"]
+
+
+@dataclass(slots=True)
+class ValidationSettings:
+    stale_after_days: int = 1  # market data dated before T-minus this many days is stale
+    max_abs_notional: float = 1e11
+    now: datetime | None = None  # defaults to the time of each validation run
+
+    def stale_cutoff(self) -> datetime:
+        # Whole days, so the cutoff (and every cache key that depends on it) only moves at midnight.
+        today = (self.now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=self.stale_after_days)
+
+    def token(self) -> tuple:
+        return (self.stale_cutoff().isoformat(), self.max_abs_notional)
+
+
+@dataclass(slots=True)
+class KeySet:
+    """Key values of `table.column` on the rows where `where` holds (all rows when None)."""
+
+    name: str
+    table: str
+    column: str
+    optional_columns: tuple[str, ...] = ()
+    where: Callable[[pd.DataFrame], np.ndarray] | None = None
+
+    def columns_in(self, frame: pd.DataFrame) -> list[str]:
+        return [self.column, *(c for c in self.optional_columns if c in frame.columns)]
+
+
+@dataclass(slots=True)
+class RuleContext:
+    settings: ValidationSettings
+    keys: pa.Array | None = None  # the rule's reference KeySet, when it has one
+
+
+@dataclass(slots=True)
+class ValidationRule:
+    """One data-quality check.
+
+    `check` gets the rule's columns for a run of rows and returns a boolean mask of failing rows.
+    Row-local rules (`scope="rows"`) are evaluated per partition, so unchanged partitions reuse
+    their result; `scope="table"` rules (e.g. duplicates) see the whole column and rerun whenever
+    any partition of it changes. `message` is formatted with `count`.
+    """
+
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    check: Callable[[pd.DataFrame, RuleContext], np.ndarray]
+    severity: str
+    category: str
+    message: str
+    recommendation: str
+    scope: str = "rows"
+    reference: KeySet | None = None
+    optional_columns: tuple[str, ...] = ()
+
+    def columns_in(self, frame: pd.DataFrame) -> list[str]:
+        return [*self.columns, *(c for c in self.optional_columns if c in frame.columns)]
+
+
+def _complete_greeks(frame: pd.DataFrame) -> np.ndarray:
+    present = [c for c in GREEK_COLUMNS if c in frame.columns]
+    if not present:
+        return np.zeros(len(frame), dtype=bool)
+    return frame[present].notna().all(axis=1).to_numpy()
+
+
+def decoded(values: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    """Plain values of a dictionary-encoded (pandas categorical) array; other arrays pass through."""
+    return pc.cast(values, values.type.value_type) if pa.types.is_dictionary(values.type) else values
+
+
+def _not_in_reference(column: str) -> Callable[[pd.DataFrame, RuleContext], np.ndarray]:
+    def check(frame: pd.DataFrame, ctx: RuleContext) -> np.ndarray:
+        # pc.is_in hashes the reference once; Series.isin on Arrow strings goes through Python objects.
+        values = decoded(pa.array(frame[column], from_pandas=True))
+        keys = decoded(ctx.keys)
+        keys = keys if keys.type == values.type else keys.cast(values.type)
+        return ~np.asarray(pc.is_in(values, value_set=keys), dtype=bool)
+
+    return check
+
+
+def _duplicated(column: str) -> Callable[[pd.DataFrame, RuleContext], np.ndarray]:
+    return lambda frame, ctx: frame[column].duplicated().to_numpy()
+
+
+def _stale_as_of(frame: pd.DataFrame, ctx: RuleContext) -> np.ndarray:
+    as_of = pd.to_datetime(frame["as_of"], errors="coerce")
+    return (as_of < ctx.settings.stale_cutoff()).to_numpy()
+
+
+def _notional_out_of_range(frame: pd.DataFrame, ctx: RuleContext) -> np.ndarray:
+    notional = pd.to_numeric(frame["notional"], errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return ~np.isfinite(notional) | (notional == 0.0) | (np.abs(notional) > ctx.settings.max_abs_notional)
+
+
+COMPLETE_GREEKS = KeySet("complete_greeks", "sensitivities", "instrument_id", tuple(GREEK_COLUMNS), _complete_greeks)
+POSITION_IDS = KeySet("position_ids", "positions", "instrument_id")
+MARKET_DRIVER_IDS = KeySet("market_driver_ids", "market_data", "driver_id")
+
+
+RULES: list[ValidationRule] = [
+    ValidationRule(
+        "missing_greeks",
+        "positions",
+        ("instrument_id",),
+        _not_in_reference("instrument_id"),
+        "MEDIUM",
+        "sensitivities",
+        "{count} positions have no sensitivity row with complete Greeks.",
+        "Load the missing sensitivities or fill gaps from the risk system before running.",
+        reference=COMPLETE_GREEKS,
+    ),
+    ValidationRule(
+        "orphaned_sensitivities",
+        "sensitivities",
+        ("instrument_id",),
+        _not_in_reference("instrument_id"),
+        "LOW",
+        "sensitivities",
+        "{count} sensitivity rows do not match any position.",
+        "Check the instrument_id mapping or drop sensitivities for closed positions.",
+        reference=POSITION_IDS,
+    ),
+    ValidationRule(
+        "duplicate_instrument_ids",
+        "positions",
+        ("instrument_id",),
+        _duplicated("instrument_id"),
+        "MEDIUM",
+        "duplicates",
+        "Detected {count} duplicate instrument IDs in positions.",
+        "Deduplicate by latest timestamp or aggregate by book/desk.",
+        scope="table",
+    ),
+    ValidationRule(
+        "duplicate_driver_ids",
+        "risk_drivers",
+        ("driver_id",),
+        _duplicated("driver_id"),
+        "MEDIUM",
+        "duplicates",
+        "Detected {count} duplicate driver IDs in the risk driver taxonomy.",
+        "Deduplicate by latest timestamp or merge the taxonomy sources.",
+        scope="table",
+    ),
+    ValidationRule(
+        "stale_market_data",
+        "market_data",
+        ("as_of",),
+        _stale_as_of,
+        "MEDIUM",
+        "market_data",
+        "{count} market data points are older than T-1.",
+        "Refresh data source or document override in methodology notes.",
+    ),
+    ValidationRule(
+        "notional_out_of_range",
+        "positions",
+        ("notional",),
+        _notional_out_of_range,
+        "MEDIUM",
+        "positions",
+        "{count} positions have a zero, missing or implausibly large notional.",
+        "Check the notional units and scaling of the source extract.",
+    ),
+    ValidationRule(
+        "drivers_without_market_data",
+        "risk_drivers",
+        ("driver_id",),
+        _not_in_reference("driver_id"),
+        "LOW",
+        "market_data",
+        "{count} risk drivers have no market data.",
+        "Extend the market data extract or retire unused drivers.",
+        reference=MARKET_DRIVER_IDS,
+    ),
+]
+
+
+def register_rule(rule: ValidationRule) -> ValidationRule:
+    """Add `rule` to the default registry, replacing any rule with the same name."""
+    if rule.severity not in SEVERITIES:
+        raise ValueError(f"Unknown severity: {rule.severity}")
+    if rule.scope not in ("rows", "table"):
+        raise ValueError(f"Unknown rule scope: {rule.scope}")
+    RULES[:] = [r for r in RULES if r.name != rule.name]
+    RULES.append(rule)
+    return rule
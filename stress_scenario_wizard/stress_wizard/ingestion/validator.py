@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+import hashlib
+from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
+from stress_wizard.ingestion.validation_rules import RULES, KeySet, RuleContext, ValidationRule, ValidationSettings, decoded
+from stress_wizard.instrumentation import span, traced
 from stress_wizard.models import (
     REQUIRED_DRIVER_COLUMNS,
     REQUIRED_MARKET_COLUMNS,
@@ -13,12 +20,33 @@ from stress_wizard.models import (
 )
 
 
+# Rows per fingerprinted partition; an in-place edit re-evaluates only the partitions it touches.
+PARTITION_ROWS = 65_536
+
+
 @dataclass(slots=True)
 class ValidationIssue:
     severity: str
     category: str
     message: str
     recommendation: str
+    rule: str = ""
+    count: int = 0
+
+
+@dataclass(slots=True)
+class RuleResult:
+    rule: str
+    table: str
+    rows: np.ndarray  # positions of the failing rows in `table`, for drill-down
+    checked: int
+    evaluated_partitions: int = 0
+    reused_partitions: int = 0
+    skipped: str = ""  # why the rule could not run, e.g. missing columns
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
 
 
 @dataclass(slots=True)
@@ -30,18 +58,221 @@ class ValidationScorecard:
     stale_market_data_count: int
     missing_required_columns: dict[str, list[str]]
     issues: list[ValidationIssue]
+    rules: dict[str, RuleResult] = field(default_factory=dict)
+
+    def issue_rows(self, rule: str, frame: pd.DataFrame) -> pd.DataFrame:
+        """The rows of `frame` (the rule's table) that failed `rule`."""
+        result = self.rules.get(rule)
+        return frame.iloc[result.rows] if result is not None else frame.iloc[:0]
+
+
+def _update_array(digest: Any, chunk: pa.Array) -> None:
+    # Hashes only the sliced range of the buffers, so a partition costs its own size, not the column's.
+    n, offset, kind = len(chunk), chunk.offset, chunk.type
+    digest.update(f"{kind}:{n}".encode())
+    if chunk.null_count:
+        digest.update(np.asarray(pc.is_null(chunk), dtype=bool).tobytes())
+    buffers = chunk.buffers()
+    if pa.types.is_string(kind) or pa.types.is_large_string(kind) or pa.types.is_binary(kind) or pa.types.is_large_binary(kind):
+        width = np.int64 if pa.types.is_large_string(kind) or pa.types.is_large_binary(kind) else np.int32
+        offsets = np.frombuffer(buffers[1], dtype=width)[offset : offset + n + 1]
+        digest.update((offsets - offsets[0]).tobytes())
+        if buffers[2] is not None:
+            digest.update(memoryview(buffers[2])[offsets[0] : offsets[-1]])
+    elif pa.types.is_primitive(kind) and not pa.types.is_boolean(kind):
+        size = kind.bit_width // 8
+        digest.update(memoryview(buffers[1])[offset * size : (offset + n) * size])
+    else:
+        digest.update(repr(chunk.to_pylist()).encode())
+
+
+def column_partition_digests(column: pd.Series, bounds: Sequence[tuple[int, int]]) -> list[bytes]:
+    """Content hash of each `[start, stop)` slice of a column."""
+    if isinstance(column.dtype, np.dtype) and column.dtype != object:
+        values = np.ascontiguousarray(column.to_numpy())
+        return [hashlib.blake2b(values[start:stop].view(np.uint8), digest_size=16).digest() for start, stop in bounds]
+    arrow = decoded(pa.array(column, from_pandas=True))
+    out = []
+    for start, stop in bounds:
+        digest = hashlib.blake2b(digest_size=16)
+        part = arrow.slice(start, stop - start)
+        for chunk in part.chunks if isinstance(part, pa.ChunkedArray) else [part]:
+            _update_array(digest, chunk)
+        out.append(digest.digest())
+    return out
+
+
+def _hash(*parts: Any) -> bytes:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+
+def _rows_of(bounds: Sequence[tuple[int, int]], parts: Sequence[int]) -> np.ndarray:
+    return np.concatenate([np.arange(*bounds[p]) for p in parts]) if parts else np.empty(0, dtype=np.intp)
+
+
+class _Run:
+    """Per-call state of `BundleValidator.validate`: partition digests and reference key sets."""
+
+    def __init__(self, validator: BundleValidator, tables: dict[str, pd.DataFrame]) -> None:
+        self.tables = tables
+        self.settings = validator.settings
+        self.token = validator.settings.token()
+        self.previous = validator._cache
+        self.used: dict[tuple, Any] = {}
+        self.partition_rows = validator.partition_rows
+        self._bounds: dict[str, list[tuple[int, int]]] = {}
+        self._columns: dict[tuple[str, str], list[bytes]] = {}
+        self._keysets: dict[str, tuple[bytes, Callable[[], pa.Array]] | None] = {}
+
+    def lookup(self, key: tuple) -> Any:
+        value = self.previous.get(key)
+        if value is not None:
+            self.used[key] = value
+        return value
+
+    def bounds(self, table: str) -> list[tuple[int, int]]:
+        if table not in self._bounds:
+            n = len(self.tables[table])
+            self._bounds[table] = [(start, min(start + self.partition_rows, n)) for start in range(0, n, self.partition_rows)]
+        return self._bounds[table]
+
+    def digests(self, table: str, columns: Sequence[str]) -> list[bytes]:
+        bounds = self.bounds(table)
+        for column in columns:
+            if (table, column) not in self._columns:
+                self._columns[table, column] = column_partition_digests(self.tables[table][column], bounds)
+        per_column = [self._columns[table, c] for c in columns]
+        return [_hash(tuple(columns), *(d[p] for d in per_column)) for p in range(len(bounds))]
+
+    def keyset(self, keyset: KeySet) -> tuple[bytes, Callable[[], pa.Array]] | None:
+        """(digest, loader) of a reference key set, built from cached per-partition keys."""
+        if keyset.name in self._keysets:
+            return self._keysets[keyset.name]
+        frame = self.tables.get(keyset.table)
+        if frame is None or keyset.column not in frame.columns:
+            self._keysets[keyset.name] = None
+            return None
+        columns = keyset.columns_in(frame)
+        bounds = self.bounds(keyset.table)
+        digests = self.digests(keyset.table, columns)
+        parts: list[tuple[pa.Array, bytes] | None] = [self.lookup(("keys", keyset.name, d)) for d in digests]
+        dirty = [p for p, hit in enumerate(parts) if hit is None]
+        if dirty:
+            sub = frame[columns] if len(dirty) == len(bounds) else frame[columns].iloc[_rows_of(bounds, dirty)]
+            keep = np.ones(len(sub), dtype=bool) if keyset.where is None else np.asarray(keyset.where(sub), dtype=bool)
+            values = decoded(pa.array(sub[keyset.column], from_pandas=True))
+            offset = 0
+            for p in dirty:
+                n = bounds[p][1] - bounds[p][0]
+                keys = values.slice(offset, n).filter(pa.array(keep[offset : offset + n]))
+                keys = keys.combine_chunks() if isinstance(keys, pa.ChunkedArray) else keys
+                digest = hashlib.blake2b(digest_size=16)
+                _update_array(digest, keys)
+                parts[p] = self.used[("keys", keyset.name, digests[p])] = (keys, digest.digest())
+                offset += n
+        kind = parts[0][0].type if parts else pa.string()
+        entry = (_hash(keyset.name, *(d for _, d in parts)), lambda: pa.concat_arrays([k.cast(kind) for k, _ in parts]) if parts else pa.array([], kind))
+        self._keysets[keyset.name] = entry
+        return entry
+
+    def evaluate(self, rule: ValidationRule) -> RuleResult:
+        frame = self.tables.get(rule.table)
+        if frame is None:
+            return RuleResult(rule.name, rule.table, np.empty(0, dtype=np.intp), 0, skipped=f"no {rule.table} table")
+        missing = [c for c in rule.columns if c not in frame.columns]
+        if missing:
+            return RuleResult(rule.name, rule.table, np.empty(0, dtype=np.intp), len(frame), skipped=f"missing {', '.join(missing)}")
+        reference = None
+        if rule.reference is not None:
+            reference = self.keyset(rule.reference)
+            if reference is None:
+                ref = rule.reference
+                return RuleResult(rule.name, rule.table, np.empty(0, dtype=np.intp), len(frame), skipped=f"missing {ref.table}.{ref.column}")
+
+        columns = rule.columns_in(frame)
+        token = (rule.name, self.token, None if reference is None else reference[0])
+        bounds = self.bounds(rule.table)
+        digests = self.digests(rule.table, columns)
+        ctx = RuleContext(self.settings)
+
+        if rule.scope == "table":
+            key = ("table", token, _hash(*digests))
+            rows = self.lookup(key)
+            if rows is not None:
+                return RuleResult(rule.name, rule.table, rows, len(frame), reused_partitions=len(bounds))
+            if reference is not None:
+                ctx.keys = reference[1]()
+            rows = self.used[key] = np.flatnonzero(np.asarray(rule.check(frame[columns], ctx), dtype=bool))
+            return RuleResult(rule.name, rule.table, rows, len(frame), evaluated_partitions=len(bounds))
+
+        parts: list[np.ndarray | None] = [self.lookup(("rows", token, d)) for d in digests]
+        dirty = [p for p, hit in enumerate(parts) if hit is None]
+        if dirty:
+            if reference is not None:
+                ctx.keys = reference[1]()
+            # All stale partitions go through the rule in one vectorized call, then split back up.
+            sub = frame[columns] if len(dirty) == len(bounds) else frame[columns].iloc[_rows_of(bounds, dirty)]
+            mask = np.asarray(rule.check(sub, ctx), dtype=bool)
+            offset = 0
+            for p in dirty:
+                n = bounds[p][1] - bounds[p][0]
+                parts[p] = self.used[("rows", token, digests[p])] = np.flatnonzero(mask[offset : offset + n])
+                offset += n
+        rows = np.concatenate([part + bounds[p][0] for p, part in enumerate(parts)]) if parts else np.empty(0, dtype=np.intp)
+        return RuleResult(rule.name, rule.table, rows, len(frame), len(dirty), len(bounds) - len(dirty))
+
+
+class BundleValidator:
+    """Runs the validation rule registry over a bundle, reusing results for unchanged partitions.
+
+    Each table is split into `partition_rows` slices and every slice is fingerprinted from the Arrow
+    or NumPy buffers of the columns a rule reads. Results are cached per (rule, settings, partition
+    fingerprint, reference key set), so validating again after a small in-place edit only reruns the
+    rules that read the edited columns, on the edited partitions. Inserting or deleting rows shifts
+    every later partition and costs a full pass. The cache keeps only what the last run used.
+    """
+
+    def __init__(self, rules: Sequence[ValidationRule] | None = None, settings: ValidationSettings | None = None, partition_rows: int = PARTITION_ROWS) -> None:
+        if partition_rows <= 0:
+            raise ValueError("partition_rows must be positive")
+        self.rules = RULES if rules is None else list(rules)
+        self.settings = settings or ValidationSettings()
+        self.partition_rows = partition_rows
+        self._cache: dict[tuple, Any] = {}
+
+    def validate(self, tables: dict[str, pd.DataFrame]) -> dict[str, RuleResult]:
+        run = _Run(self, tables)
+        results = {}
+        for rule in self.rules:
+            with span("ingestion.validate_rule", rule=rule.name) as attrs:
+                results[rule.name] = result = run.evaluate(rule)
+                attrs.update(evaluated=result.evaluated_partitions, reused=result.reused_partitions, issues=result.count)
+        self._cache = run.used
+        return results
+
+    def clear(self) -> None:
+        self._cache = {}
 
 
 def _missing_columns(frame: pd.DataFrame, required: set[str]) -> list[str]:
     return sorted([col for col in required if col not in frame.columns])
 
 
+def _coverage(result: RuleResult | None) -> float:
+    if result is None or result.skipped or result.checked == 0:
+        return 0.0
+    return (1.0 - result.count / result.checked) * 100.0
+
+
+@traced("ingestion.validate_bundle")
 def validate_bundle(
     positions: pd.DataFrame,
     sensitivities: pd.DataFrame,
     market_data: pd.DataFrame,
     risk_drivers: pd.DataFrame,
+    validator: BundleValidator | None = None,
 ) -> ValidationScorecard:
+    """Score a bundle with the rule registry; pass a long-lived `validator` to reuse earlier results."""
     issues: list[ValidationIssue] = []
     missing_required: dict[str, list[str]] = {
         "positions": _missing_columns(positions, REQUIRED_POSITION_COLUMNS),
@@ -61,50 +292,31 @@ def validate_bundle(
                 )
             )
 
-    merged = positions.merge(sensitivities, on="instrument_id", how="left") if "instrument_id" in positions and "instrument_id" in sensitivities else positions.copy()
-    greek_cols = ["delta", "gamma", "vega", "rho", "cs01", "dv01", "theta", "convexity"]
-    existing_greek_cols = [c for c in greek_cols if c in merged.columns]
-    if existing_greek_cols:
-        complete = (~merged[existing_greek_cols].isna()).all(axis=1)
-        greek_coverage = float(complete.mean()) * 100.0 if len(merged) > 0 else 0.0
-    else:
-        greek_coverage = 0.0
-
-    if "driver_id" in market_data.columns and "driver_id" in risk_drivers.columns:
-        coverage = risk_drivers["driver_id"].isin(market_data["driver_id"]).mean() * 100.0
-    else:
-        coverage = 0.0
-
-    duplicate_count = 0
-    if "instrument_id" in positions.columns:
-        duplicate_count += int(positions.duplicated(subset=["instrument_id"]).sum())
-    if "driver_id" in risk_drivers.columns:
-        duplicate_count += int(risk_drivers.duplicated(subset=["driver_id"]).sum())
-
-    stale_market = 0
-    if "as_of" in market_data.columns:
-        as_of = pd.to_datetime(market_data["as_of"], errors="coerce")
-        stale_market = int((as_of < (datetime.now() - timedelta(days=1))).sum())
-
-    if stale_market > 0:
-        issues.append(
-            ValidationIssue(
-                severity="MEDIUM",
-                category="market_data",
-                message=f"{stale_market} market data points are older than T-1.",
-                recommendation="Refresh data source or document override in methodology notes.",
-            )
-        )
-
-    if duplicate_count > 0:
-        issues.append(
-            ValidationIssue(
-                severity="MEDIUM",
-                category="duplicates",
-                message=f"Detected {duplicate_count} duplicate IDs.",
-                recommendation="Deduplicate by latest timestamp or aggregate by book/desk.",
+    validator = validator or BundleValidator()
+    tables = {"positions": positions, "sensitivities": sensitivities, "market_data": market_data, "risk_drivers": risk_drivers}
+    results = validator.validate(tables)
+    rules = {rule.name: rule for rule in validator.rules}
+    for name, result in results.items():
+        if result.count:
+            rule = rules[name]
+            issues.append(
+                ValidationIssue(
+                    severity=rule.severity,
+                    category=rule.category,
+                    message=rule.message.format(count=result.count),
+                    recommendation=rule.recommendation,
+                    rule=name,
+                    count=result.count,
+                )
             )
-        )
+
+    def count(name: str) -> int:
+        return results[name].count if name in results else 0
+
+    greek_coverage = _coverage(results.get("missing_greeks"))
+    coverage = _coverage(results.get("drivers_without_market_data"))
+    duplicate_count = count("duplicate_instrument_ids") + count("duplicate_driver_ids")
+    stale_market = count("stale_market_data")
 
     penalty = (
         len([i for i in issues if i.severity == "HIGH"]) * 15
@@ -122,4 +334,5 @@ def validate_bundle(
         stale_market_data_count=stale_market,
         missing_required_columns=missing_required,
         issues=issues,
+        rules=results,
     )
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import functools
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, TypeVar
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_CAPACITY = 4_096
+PROFILE_MODES = ("cprofile", "pyinstrument")
+TRACE_FORMATS = ("json", "chrome")
+
+
+@dataclass(slots=True)
+class SpanRecord:
+    name: str
+    start_ns: int  # perf_counter_ns relative to the tracer's epoch
+    duration_ns: int
+    thread_id: int
+    thread_name: str
+    depth: int
+    parent: str | None = None
+    peak_rss_mb: float | None = None  # process high-water mark when the span closed
+    alloc_peak_mb: float | None = None  # tracemalloc peak inside the span (track_allocations only)
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return self.duration_ns / 1e9
+
+    @property
+    def ms(self) -> float:
+        return self.duration_ns / 1e6
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size in MiB: VmHWM on Linux (resettable), else the process-lifetime ru_maxrss."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024.0
+
+
+@dataclass(slots=True)
+class _Frame:
+    name: str
+    start_ns: int
+    alloc_base: int = 0
+    alloc_peak: int = 0  # highest traced allocation seen so far, including closed children
+
+
+class Tracer:
+    """Collects timed spans into a fixed-size ring buffer; the oldest spans drop off first.
+
+    Spans nest per thread. With `track_allocations`, tracemalloc runs while enabled and each span
+    also records the peak Python/NumPy allocation above its starting point; that slows
+    allocation-heavy code, so it is off by default.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, enabled: bool = True, track_allocations: bool = False) -> None:
+        self.enabled = enabled
+        self.epoch_ns = time.perf_counter_ns()
+        self.epoch_wall = datetime.now()
+        self._spans: deque[SpanRecord] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._track_allocations = False
+        self._started_tracemalloc = False
+        self.track_allocations = track_allocations
+
+    @property
+    def track_allocations(self) -> bool:
+        return self._track_allocations
+
+    @track_allocations.setter
+    def track_allocations(self, value: bool) -> None:
+        if value and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not value and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._track_allocations = value
+
+    @property
+    def capacity(self) -> int:
+        return self._spans.maxlen or 0
+
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block. The yielded dict can be filled with extra attributes."""
+        if not self.enabled:
+            yield attrs
+            return
+        stack = self._stack()
+        tracking = self._track_allocations and tracemalloc.is_tracing()
+        frame = _Frame(name=name, start_ns=time.perf_counter_ns())
+        if tracking:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].alloc_peak = max(stack[-1].alloc_peak, peak)
+            tracemalloc.reset_peak()
+            frame.alloc_base = frame.alloc_peak = current
+        stack.append(frame)
+        try:
+            yield attrs
+        finally:
+            end = time.perf_counter_ns()
+            stack.pop()
+            alloc_mb = None
+            if tracking:
+                frame.alloc_peak = max(frame.alloc_peak, tracemalloc.get_traced_memory()[1])
+                alloc_mb = (frame.alloc_peak - frame.alloc_base) / 2**20
+                if stack:
+                    stack[-1].alloc_peak = max(stack[-1].alloc_peak, frame.alloc_peak)
+            thread = threading.current_thread()
+            self.record(
+                SpanRecord(
+                    name=name,
+                    start_ns=frame.start_ns - self.epoch_ns,
+                    duration_ns=end - frame.start_ns,
+                    thread_id=thread.ident or 0,
+                    thread_name=thread.name,
+                    depth=len(stack),
+                    parent=stack[-1].name if stack else None,
+                    peak_rss_mb=peak_rss_mb(),
+                    alloc_peak_mb=alloc_mb,
+                    attrs=attrs,
+                )
+            )
+
+    def record(self, span: SpanRecord) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, prefix: str | None = None, since_ns: int | None = None) -> list[SpanRecord]:
+        with self._lock:
+            out = list(self._spans)
+        if prefix is not None:
+            out = [s for s in out if s.name.startswith(prefix)]
+        if since_ns is not None:
+            out = [s for s in out if s.start_ns >= since_ns]
+        return out
+
+    def last(self, name: str) -> SpanRecord | None:
+        with self._lock:
+            return next((s for s in reversed(self._spans) if s.name == name), None)
+
+    def children(self, span: SpanRecord) -> list[SpanRecord]:
+        """Spans that closed inside `span` on the same thread, one level down."""
+        end = span.start_ns + span.duration_ns
+        return [
+            s
+            for s in self.spans(since_ns=span.start_ns)
+            if s.thread_id == span.thread_id and s.depth == span.depth + 1 and s.start_ns + s.duration_ns <= end
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "epoch": self.epoch_wall.isoformat(),
+            "pid": os.getpid(),
+            "spans": [asdict(s) for s in self.spans()],
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Trace Event Format ('X' complete events); open in chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        spans = self.spans()
+        events: list[dict[str, Any]] = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "stress_wizard"}}]
+        for tid, thread_name in sorted({(s.thread_id, s.thread_name) for s in spans}):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        for s in spans:
+            args = {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v) for k, v in s.attrs.items()}
+            if s.peak_rss_mb is not None:
+                args["peak_rss_mb"] = round(s.peak_rss_mb, 1)
+            if s.alloc_peak_mb is not None:
+                args["alloc_peak_mb"] = round(s.alloc_peak_mb, 3)
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": s.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": s.start_ns / 1e3,
+                    "dur": s.duration_ns / 1e3,
+                    "pid": pid,
+                    "tid": s.thread_id,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: Path | str, fmt: str = "chrome") -> Path:
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format: {fmt}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = self.to_chrome_trace() if fmt == "chrome" else self.to_json()
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        return path
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **attrs: Any):
+    """`with span("calc.greek_pnl", rows=n):` on the process-wide tracer."""
+    return TRACER.span(name, **attrs)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of `span` for whole functions."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with TRACER.span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def summarize(root: SpanRecord, tracer: Tracer | None = None, top: int = 4) -> str:
+    """One-line breakdown of a span's slowest children, e.g. for a status bar."""
+    children = sorted((tracer or TRACER).children(root), key=lambda s: s.duration_ns, reverse=True)[:top]
+    parts = [f"{s.name.rsplit('.', 1)[-1]} {s.ms:,.0f}" for s in children]
+    rss = "" if root.peak_rss_mb is None else f" | peak RSS {root.peak_rss_mb:,.0f} MiB"
+    detail = f" ({', '.join(parts)} ms)" if parts else ""
+    return f"{root.name} {root.ms:,.0f} ms{detail}{rss}"
+
+
+@dataclass(slots=True)
+class ProfileCapture:
+    mode: str
+    path: Path
+
+
+@contextmanager
+def capture_profile(mode: str, output_dir: Path | str, label: str = "run") -> Iterator[ProfileCapture]:
+    """Profile the enclosed block on the current thread.
+
+    "cprofile" writes a pstats `.prof` file (open with snakeviz or `python -m pstats`);
+    "pyinstrument" writes an HTML call tree and needs the optional pyinstrument package.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+    folder = Path(output_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    stem = f"{label}_{datetime.now():%Y%m%d_%H%M%S_%f}"
+
+    if mode == "cprofile":
+        import cProfile
+
+        capture = ProfileCapture(mode=mode, path=folder / f"{stem}.prof")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield capture
+        finally:
+            profiler.disable()
+            profiler.dump_stats(capture.path)
+        return
+
+    try:
+        from pyinstrument import Profiler
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError("pyinstrument is required for pyinstrument profiling") from exc
+    capture = ProfileCapture(mode=mode, path=folder / f"{stem}.html")
+    profiler = Profiler()
+    profiler.start()
+    try:
+        yield capture
+    finally:
+        profiler.stop()
+        capture.path.write_text(profiler.output_html(), encoding="utf-8")
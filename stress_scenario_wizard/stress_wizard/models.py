@@ -68,6 +68,8 @@ class DataBundle:
     sensitivities: pd.DataFrame
     market_data: pd.DataFrame
     risk_drivers: pd.DataFrame
+    # Optional long-format position x driver sensitivities: instrument_id, driver_id, delta[, gamma].
+    driver_sensitivities: pd.DataFrame = field(default_factory=lambda: pd.DataFrame())
 
 
 REQUIRED_POSITION_COLUMNS = {
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass(slots=True)
+class BetaMatrix:
+    """Sparse (drivers x benchmarks) loading matrix built from a beta map.
+
+    A driver may load on several benchmarks (market, sector, style...); its shock is the
+    beta-weighted sum of the benchmark shocks, so one scenario is a mat-vec and many are a mat-mat.
+    """
+
+    driver_ids: pd.Index
+    benchmark_ids: pd.Index
+    loadings: sparse.csr_matrix
+    default_beta: float = 1.0
+    fingerprint: str = ""
+    source: weakref.ref[pd.DataFrame] | None = field(default=None, repr=False)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.loadings.shape
+
+    def is_built_from(self, beta_map: pd.DataFrame, default_beta: float, verify: bool = False) -> bool:
+        """True if the loadings match `beta_map`.
+
+        The frame the matrix was built from is accepted without hashing it; any other frame is
+        compared by content. Pass `verify` after editing the source frame in place.
+        """
+        if self.default_beta != default_beta:
+            return False
+        if not verify and self.source is not None and self.source() is beta_map:
+            return True
+        return self.fingerprint == beta_map_fingerprint(beta_map)
+
+    def shock_vector(self, benchmark_shocks: pd.DataFrame | pd.Series | dict[str, float]) -> np.ndarray:
+        """Benchmark shocks aligned to `benchmark_ids`; unshocked benchmarks are 0."""
+        if isinstance(benchmark_shocks, pd.DataFrame):
+            deduped = benchmark_shocks.drop_duplicates("benchmark_id", keep="last")
+            benchmark_shocks = pd.Series(deduped["shock"].to_numpy(dtype=np.float64), index=deduped["benchmark_id"].to_numpy())
+        elif isinstance(benchmark_shocks, dict):
+            benchmark_shocks = pd.Series(benchmark_shocks, dtype=np.float64)
+        return benchmark_shocks.reindex(self.benchmark_ids).fillna(0.0).to_numpy(dtype=np.float64)
+
+    def propagate(self, benchmark_shocks: pd.DataFrame | pd.Series | dict[str, float]) -> pd.DataFrame:
+        """Child shocks for one scenario as a driver_id/shock frame."""
+        return pd.DataFrame({"driver_id": self.driver_ids, "shock": self.loadings @ self.shock_vector(benchmark_shocks)})
+
+    def propagate_many(self, scenarios: pd.DataFrame) -> pd.DataFrame:
+        """Child shocks for many scenarios: `scenarios` is benchmarks (index) x scenarios (columns)."""
+        aligned = scenarios.reindex(self.benchmark_ids).fillna(0.0).to_numpy(dtype=np.float64)
+        return pd.DataFrame(self.loadings @ aligned, index=self.driver_ids, columns=scenarios.columns)
+
+
+def beta_map_fingerprint(beta_map: pd.DataFrame) -> str:
+    """Content hash of the driver_id/benchmark_id/beta columns; other columns do not affect the loadings."""
+    columns = [col for col in ("driver_id", "benchmark_id", "beta") if col in beta_map.columns]
+    digest = hashlib.blake2b(",".join(columns).encode(), digest_size=20)
+    digest.update(pd.util.hash_pandas_object(beta_map[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def build_beta_matrix(beta_map: pd.DataFrame, default_beta: float = 1.0) -> BetaMatrix:
+    """Build the loading matrix from `beta_map` columns driver_id, benchmark_id, beta.
+
+    Drivers keep their first-appearance order; missing betas use `default_beta` and repeated
+    (driver, benchmark) pairs are summed.
+    """
+    driver_codes, driver_ids = pd.factorize(beta_map["driver_id"])
+    bench_codes, benchmark_ids = pd.factorize(beta_map["benchmark_id"])
+    if "beta" in beta_map.columns:
+        betas = pd.to_numeric(beta_map["beta"], errors="coerce").fillna(default_beta).to_numpy(dtype=np.float64)
+    else:
+        betas = np.full(len(beta_map), default_beta, dtype=np.float64)
+
+    # Rows with a missing driver or benchmark id carry no loading.
+    keep = (driver_codes >= 0) & (bench_codes >= 0)
+    loadings = sparse.csr_matrix(
+        (betas[keep], (driver_codes[keep], bench_codes[keep])),
+        shape=(len(driver_ids), len(benchmark_ids)),
+    )
+    loadings.sum_duplicates()
+    return BetaMatrix(
+        driver_ids=pd.Index(driver_ids),
+        benchmark_ids=pd.Index(benchmark_ids),
+        loadings=loadings,
+        default_beta=default_beta,
+        fingerprint=beta_map_fingerprint(beta_map),
+        source=weakref.ref(beta_map),
+    )
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import re
 
 import numpy as np
 import pandas as pd
 
+from stress_wizard.scenario.beta_matrix import BetaMatrix, build_beta_matrix
+from stress_wizard.scenario.driver_search import DriverSearchIndex, is_regex_query
+
 
 @dataclass(slots=True)
 class PropagationRule:
@@ -13,7 +17,41 @@ class PropagationRule:
     multiplier: float
 
 
-def search_risk_drivers(risk_drivers: pd.DataFrame, query: str, limit: int = 5000) -> pd.DataFrame:
+RULE_LEVEL_COLUMNS = {
+    "asset class": "asset_class",
+    "sector": "sector",
+    "issuer": "issuer",
+    "tenor": "tenor",
+    "geography": "geography",
+}
+
+TENOR_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)([DWMY])$")
+TENOR_UNIT_YEARS = {"D": 1.0 / 365.0, "W": 7.0 / 365.0, "M": 1.0 / 12.0, "Y": 1.0}
+
+DEFAULT_TENOR_DECAY = {
+    "1M": 1.00,
+    "3M": 0.98,
+    "6M": 0.96,
+    "1Y": 0.94,
+    "2Y": 0.92,
+    "3Y": 0.90,
+    "5Y": 0.88,
+    "7Y": 0.86,
+    "10Y": 0.84,
+    "20Y": 0.80,
+    "30Y": 0.76,
+}
+
+
+def search_risk_drivers(risk_drivers: pd.DataFrame, query: str, limit: int = 5000, index: DriverSearchIndex | None = None) -> pd.DataFrame:
+    """Case-insensitive substring search over the taxonomy.
+
+    With a prebuilt `index` for this frame the lookup is indexed and also accepts ranked, fielded
+    queries such as ``geo:EMEA tenor:10Y``. Without one, or for a regular expression such as
+    ``equit.*emea``, every column is scanned.
+    """
+    if index is not None and index.matches(risk_drivers) and not is_regex_query(query):
+        return index.search(risk_drivers, query, limit)
     if not query.strip():
         return risk_drivers.head(limit).copy()
 
@@ -34,60 +72,141 @@ def apply_bulk_shock(shock_table: pd.DataFrame, driver_ids: list[str], shock: fl
     return out
 
 
+def _category_lookup(values: pd.Series, mapping: dict[str, float], default: float) -> np.ndarray:
+    """Map each value through `mapping` by evaluating it once per distinct category."""
+    codes, uniques = pd.factorize(values.astype(str))
+    lut = np.array([mapping.get(u, default) for u in uniques] + [default], dtype=np.float64)
+    return lut[codes]
+
+
+def _contains_mask(risk_drivers: pd.DataFrame, col: str, pattern: str, index: DriverSearchIndex | None) -> np.ndarray:
+    if index is not None and index.matches(risk_drivers) and col in index.facets:
+        # Facet columns: match the handful of labels, then gather by the prebuilt row codes.
+        facet = index.facets[col]
+        return facet.mask(pd.Series(facet.labels, dtype=object).str.contains(pattern, case=False, na=False).to_numpy(dtype=bool))
+    return risk_drivers[col].astype(str).str.contains(pattern, case=False, na=False).to_numpy(dtype=bool)
+
+
+def tenor_in_years(label: str) -> float:
+    """Parse tenor labels like 3M, 10Y, 2W or 1D; returns NaN when unrecognised."""
+    match = TENOR_PATTERN.match(str(label).strip().upper())
+    if match is None:
+        return float("nan")
+    return float(match.group(1)) * TENOR_UNIT_YEARS[match.group(2)]
+
+
+@dataclass(slots=True)
+class TenorCurve:
+    """Tenor multiplier curve, linearly interpolated in years and flat beyond its end points."""
+
+    points: dict[str, float]
+    _years: np.ndarray = field(init=False, repr=False)
+    _values: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        parsed = sorted((tenor_in_years(k), float(v)) for k, v in self.points.items() if not np.isnan(tenor_in_years(k)))
+        if not parsed:
+            raise ValueError("TenorCurve needs at least one parseable tenor point")
+        self._years = np.array([p[0] for p in parsed])
+        self._values = np.array([p[1] for p in parsed])
+
+    def multiplier(self, label: str, default: float = 1.0) -> float:
+        years = tenor_in_years(label)
+        return default if np.isnan(years) else float(np.interp(years, self._years, self._values))
+
+    def lookup(self, labels: np.ndarray, default: float = 1.0) -> np.ndarray:
+        """Multiplier per label, with `default` appended for a -1 (missing) code."""
+        return np.array([self.multiplier(label, default) for label in labels] + [default], dtype=np.float64)
+
+    def multipliers(self, tenors: pd.Series, default: float = 1.0) -> np.ndarray:
+        codes, uniques = pd.factorize(tenors.astype(str))
+        return self.lookup(np.asarray(uniques, dtype=object), default)[codes]
+
+
+DEFAULT_TENOR_CURVE = TenorCurve(DEFAULT_TENOR_DECAY)
+
+
+def rule_multipliers(risk_drivers: pd.DataFrame, rules: list[PropagationRule]) -> np.ndarray:
+    """Product of the multipliers of every rule whose level column equals its key (case-insensitive).
+
+    Rules chain down the hierarchy, e.g. Asset Class -> Sector -> Issuer -> Tenor.
+    """
+    out = np.ones(len(risk_drivers), dtype=np.float64)
+    for rule in rules:
+        col = RULE_LEVEL_COLUMNS.get(rule.level.strip().lower())
+        if col is None:
+            raise ValueError(f"Unknown propagation level: {rule.level}")
+        if col not in risk_drivers.columns:
+            continue
+        codes, uniques = pd.factorize(risk_drivers[col].astype(str).str.lower())
+        lut = np.append(np.where(np.asarray(uniques, dtype=object) == rule.key.lower(), rule.multiplier, 1.0), 1.0)
+        out *= lut[codes]
+    return out
+
+
 def hierarchical_propagation(
     risk_drivers: pd.DataFrame,
     parent_filters: dict[str, str],
     parent_shock: float,
     decay: float = 0.95,
     sector_multipliers: dict[str, float] | None = None,
+    tenor_curve: TenorCurve | dict[str, float] | None = None,
+    rules: list[PropagationRule] | None = None,
+    index: DriverSearchIndex | None = None,
 ) -> pd.DataFrame:
+    """Propagate `parent_shock` to the drivers matching `parent_filters`.
+
+    Each child gets parent_shock * tenor multiplier * sector multiplier * chained rule multipliers.
+    Unparseable tenors use `decay`. Passing the taxonomy's search `index` reuses its facet codes
+    for the filters and tenor lookup instead of scanning strings.
+    """
     sector_multipliers = sector_multipliers or {}
-    mask = pd.Series(True, index=risk_drivers.index)
+    if tenor_curve is None:
+        tenor_curve = DEFAULT_TENOR_CURVE
+    elif isinstance(tenor_curve, dict):
+        tenor_curve = TenorCurve(tenor_curve)
+
+    mask = np.ones(len(risk_drivers), dtype=bool)
     for col, value in parent_filters.items():
         if col in risk_drivers.columns:
-            mask &= risk_drivers[col].astype(str).str.contains(value, case=False, na=False)
+            mask &= _contains_mask(risk_drivers, col, value, index)
 
-    impacted = risk_drivers.loc[mask].copy()
-    if impacted.empty:
+    if not mask.any():
         return pd.DataFrame(columns=["driver_id", "shock", "method"])
+    rows = np.flatnonzero(mask)
+
+    def column(col: str, default: str) -> pd.Series:
+        # Slice single columns rather than copying every taxonomy column for the impacted rows.
+        return risk_drivers[col].iloc[rows] if col in risk_drivers.columns else pd.Series([default] * len(rows))
+
+    if index is not None and index.matches(risk_drivers) and "tenor" in index.facets:
+        facet = index.facets["tenor"]
+        tenor_mult = tenor_curve.lookup(facet.labels, decay)[facet.codes[rows]]
+    else:
+        tenor_mult = tenor_curve.multipliers(column("tenor", "5Y"), decay)
+    multiplier = tenor_mult * _category_lookup(column("sector", ""), sector_multipliers, 1.0)
+    if rules:
+        used = [c for c in RULE_LEVEL_COLUMNS.values() if c in risk_drivers.columns]
+        multiplier *= rule_multipliers(risk_drivers[used].iloc[rows], rules)
 
-    # Example propagation logic: maturity bucket and sector multiplier.
-    tenor_decay = {
-        "1M": 1.00,
-        "3M": 0.98,
-        "6M": 0.96,
-        "1Y": 0.94,
-        "2Y": 0.92,
-        "3Y": 0.90,
-        "5Y": 0.88,
-        "7Y": 0.86,
-        "10Y": 0.84,
-        "20Y": 0.80,
-        "30Y": 0.76,
-    }
-
-    shocks = []
-    for _, row in impacted.iterrows():
-        tenor_mult = tenor_decay.get(str(row.get("tenor", "5Y")), decay)
-        sector_mult = sector_multipliers.get(str(row.get("sector", "")), 1.0)
-        shocks.append(parent_shock * tenor_mult * sector_mult)
-
-    impacted["shock"] = np.array(shocks)
-    impacted["method"] = "hierarchical"
-    return impacted[["driver_id", "shock", "method"]]
+    out = risk_drivers[["driver_id"]].iloc[rows]
+    return out.assign(shock=parent_shock * multiplier, method="hierarchical")
 
 
 def beta_propagation(
     benchmark_shocks: pd.DataFrame,
     beta_map: pd.DataFrame,
     default_beta: float = 1.0,
+    matrix: BetaMatrix | None = None,
+    verify: bool = False,
 ) -> pd.DataFrame:
-    """Apply benchmark shock * beta to children.
+    """Apply benchmark shock * beta to children, summing over every benchmark a driver loads on.
 
     `benchmark_shocks` columns: benchmark_id, shock
     `beta_map` columns: driver_id, benchmark_id, beta
+    Pass a cached `matrix` built from this beta map to skip rebuilding the sparse loadings; set
+    `verify` if the beta map may have been edited in place since (see `BetaMatrix.is_built_from`).
     """
-    merged = beta_map.merge(benchmark_shocks, on="benchmark_id", how="left")
-    merged["beta"] = merged["beta"].fillna(default_beta)
-    merged["shock"] = merged["shock"].fillna(0.0) * merged["beta"]
-    return merged[["driver_id", "shock"]]
+    if matrix is None or not matrix.is_built_from(beta_map, default_beta, verify):
+        matrix = build_beta_matrix(beta_map, default_beta)
+    return matrix.propagate(benchmark_shocks)
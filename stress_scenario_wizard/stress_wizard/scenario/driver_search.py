@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from stress_wizard.ingestion.validator import column_partition_digests
+
+SEARCH_COLUMNS = ("driver_id", "name", "asset_class", "geography", "tenor", "desk")
+FIELD_ALIASES = {
+    "id": "driver_id",
+    "driver": "driver_id",
+    "driver_id": "driver_id",
+    "name": "name",
+    "ac": "asset_class",
+    "asset": "asset_class",
+    "asset_class": "asset_class",
+    "geo": "geography",
+    "geography": "geography",
+    "region": "geography",
+    "tenor": "tenor",
+    "desk": "desk",
+}
+# Columns with at most this many distinct values are indexed as categorical facets.
+FACET_MAX_LABELS = 4_096
+INDEX_DIR_NAME = "driver_search"
+# Characters that make a query a regular expression; such queries go to the column scan instead.
+REGEX_CHARS = frozenset(".^$*+?{}[]|()\\")
+
+
+@dataclass(slots=True)
+class TrigramPostings:
+    """Byte-trigram inverted index: rows[offsets[i]:offsets[i + 1]] contain trigram keys[i]."""
+
+    keys: np.ndarray
+    offsets: np.ndarray
+    rows: np.ndarray
+
+    def candidates(self, term: bytes) -> np.ndarray:
+        """Sorted rows containing every trigram of `term` (a superset of substring matches)."""
+        grams = np.unique(_trigram_keys(np.frombuffer(term, dtype=np.uint8)))
+        ix = np.searchsorted(self.keys, grams)
+        if (ix >= len(self.keys)).any() or (self.keys[np.minimum(ix, len(self.keys) - 1)] != grams).any():
+            return np.empty(0, dtype=self.rows.dtype)
+        lists = sorted((self.rows[self.offsets[i] : self.offsets[i + 1]] for i in ix), key=len)
+        out = lists[0]
+        for rows in lists[1:]:
+            # Posting lists are sorted, so membership is a binary search into the longer list.
+            pos = np.searchsorted(rows, out)
+            out = out[rows[np.minimum(pos, len(rows) - 1)] == out]
+            if out.size == 0:
+                break
+        return out
+
+
+def _trigram_keys(data: np.ndarray) -> np.ndarray:
+    data = data.astype(np.uint32)
+    return (data[..., :-2] << 16) | (data[..., 1:-1] << 8) | data[..., 2:]
+
+
+def build_trigram_postings(values: pa.Array) -> TrigramPostings:
+    """Vectorised trigram index over UTF-8 bytes of already-lowercased strings."""
+    binary = pc.cast(values, pa.large_binary())
+    binary = binary.combine_chunks() if isinstance(binary, pa.ChunkedArray) else binary
+    if len(binary) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return TrigramPostings(keys=empty.astype(np.uint32), offsets=np.zeros(1, dtype=np.int64), rows=empty.astype(np.int32))
+    _, offset_buf, data_buf = binary.buffers()
+    offsets = np.frombuffer(offset_buf, dtype=np.int64)[binary.offset : binary.offset + len(binary) + 1]
+    data = np.frombuffer(data_buf, dtype=np.uint8)[offsets[0] : offsets[-1]] if data_buf is not None else np.empty(0, dtype=np.uint8)
+    offsets = offsets - offsets[0]
+
+    # A trigram starts at every byte followed by at least two more bytes of the same string.
+    lengths = np.diff(offsets)
+    row_of = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    valid = np.arange(len(data), dtype=np.int64) + 2 < np.repeat(offsets[1:], lengths)
+    grams = _trigram_keys(np.concatenate((data, np.zeros(2, dtype=np.uint8))))[valid]
+    rows = row_of[valid]
+    combined = np.sort((grams.astype(np.int64) << 32) | rows)
+    if combined.size:
+        combined = combined[np.concatenate(([True], combined[1:] != combined[:-1]))]
+
+    gram_of = (combined >> 32).astype(np.uint32)
+    starts = np.flatnonzero(np.concatenate(([True], gram_of[1:] != gram_of[:-1]))) if gram_of.size else np.empty(0, dtype=np.int64)
+    keys = gram_of[starts]
+    return TrigramPostings(
+        keys=keys,
+        offsets=np.append(starts, len(combined)).astype(np.int64),
+        rows=(combined & 0xFFFFFFFF).astype(np.int32),
+    )
+
+
+@dataclass(slots=True)
+class FacetColumn:
+    codes: np.ndarray
+    labels: np.ndarray  # lowercased
+
+    def mask(self, matches: np.ndarray) -> np.ndarray:
+        return matches[self.codes]
+
+
+@dataclass(slots=True)
+class _TermMatch:
+    """Rows known to match one query term, per-column candidate masks still to verify, and exact hits."""
+
+    term: str
+    certain: np.ndarray
+    exact: np.ndarray
+    pending: dict[str, np.ndarray] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class DriverSearchIndex:
+    """Prebuilt search over the risk-driver taxonomy.
+
+    Low-cardinality columns become facets (integer codes per row) and are matched by scanning
+    their few labels. Free-text columns get a trigram index whose candidates are checked for the
+    real substring. Regular expressions are not supported (see `is_regex_query`; `search_risk_drivers`
+    scans the columns for those). Queries are whitespace-separated terms that must all match; `field:value`
+    terms match one column (exact label for facets, substring for text). A term that exactly
+    equals a driver id or facet label ranks the row higher.
+    """
+
+    row_count: int
+    fingerprint: str = ""
+    facets: dict[str, FacetColumn] = field(default_factory=dict)
+    text: dict[str, pa.Array] = field(default_factory=dict, repr=False)
+    postings: dict[str, TrigramPostings] = field(default_factory=dict, repr=False)
+    source: pd.DataFrame | None = field(default=None, repr=False)
+
+    @property
+    def columns(self) -> list[str]:
+        return [*self.text, *self.facets]
+
+    def matches(self, frame: pd.DataFrame) -> bool:
+        return self.source is frame
+
+    def _facet_match(self, col: str, term: str, exact: bool) -> np.ndarray:
+        labels = self.facets[col].labels
+        if exact:
+            return labels == term
+        return np.fromiter((term in str(label) for label in labels), dtype=bool, count=len(labels))
+
+    def _match_term(self, term: str, col: str | None) -> _TermMatch:
+        match = _TermMatch(term=term, certain=np.zeros(self.row_count, dtype=bool), exact=np.zeros(self.row_count, dtype=bool))
+        text_cols = [col] if col in self.text else ([] if col is not None else list(self.text))
+        facet_cols = [col] if col in self.facets else ([] if col is not None else list(self.facets))
+
+        for name in facet_cols:
+            # Free terms match labels by substring; fielded terms need the exact label.
+            labels = self._facet_match(name, term, exact=col is not None)
+            if labels.any():
+                match.certain |= self.facets[name].mask(labels)
+            exact = labels if col is not None else self._facet_match(name, term, exact=True)
+            if exact.any():
+                match.exact |= self.facets[name].mask(exact)
+
+        encoded = term.encode("utf-8")
+        for name in text_cols:
+            if len(encoded) < 3:
+                # Too short for a trigram lookup: every row is a candidate, verified page by page.
+                match.pending[name] = np.ones(self.row_count, dtype=bool)
+                continue
+            rows = self.postings[name].candidates(encoded)
+            if rows.size == 0:
+                continue
+            if len(encoded) == 3:
+                match.certain[rows] = True
+            else:
+                match.pending[name] = np.zeros(self.row_count, dtype=bool)
+                match.pending[name][rows] = True
+
+        if col in (None, "driver_id") and "driver_id" in self.text:
+            hit = pc.index(self.text["driver_id"], term).as_py()
+            if hit >= 0:
+                match.exact[hit] = True
+        return match
+
+    def _verify(self, rows: np.ndarray, match: _TermMatch) -> np.ndarray:
+        """Which `rows` really match, checking trigram candidates for the full substring."""
+        ok = match.certain[rows]
+        for name, candidates in match.pending.items():
+            todo = np.flatnonzero(~ok & candidates[rows])
+            if todo.size:
+                hit = pc.match_substring(self.text[name].take(pa.array(rows[todo])), match.term).to_numpy(zero_copy_only=False)
+                ok[todo[hit]] = True
+        return ok
+
+    def search_rows(self, query: str, limit: int = 5000) -> np.ndarray:
+        """Row positions of matches, best first (more exact id/label hits, then taxonomy order)."""
+        terms = parse_query(query)
+        if not terms:
+            return np.arange(min(limit, self.row_count))
+
+        possible = np.ones(self.row_count, dtype=bool)
+        score = np.zeros(self.row_count, dtype=np.int32)
+        matches = []
+        for col, term in terms:
+            match = self._match_term(term, col)
+            reach = match.certain.copy()
+            for candidates in match.pending.values():
+                reach |= candidates
+            possible &= reach
+            score += match.exact
+            matches.append(match)
+            if not possible.any():
+                return np.empty(0, dtype=np.int64)
+
+        ordered = np.flatnonzero(possible)
+        if score[ordered].any():
+            ordered = ordered[np.argsort(-score[ordered], kind="stable")]
+        if not any(m.pending for m in matches):
+            return ordered[:limit]
+
+        # Candidates are only verified a page at a time, until `limit` confirmed rows are found.
+        found: list[np.ndarray] = []
+        need = limit
+        step = max(limit, 256)
+        for start in range(0, len(ordered), step):
+            block = ordered[start : start + step]
+            ok = np.ones(len(block), dtype=bool)
+            for match in matches:
+                ok &= self._verify(block, match)
+            found.append(block[ok][:need])
+            need -= len(found[-1])
+            if need <= 0:
+                break
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def search(self, risk_drivers: pd.DataFrame, query: str, limit: int = 5000) -> pd.DataFrame:
+        return risk_drivers.iloc[self.search_rows(query, limit)].copy()
+
+
+def is_regex_query(query: str) -> bool:
+    """True when `query` uses regex syntax, which the trigram index cannot answer."""
+    return any(ch in REGEX_CHARS for ch in query)
+
+
+def parse_query(query: str) -> list[tuple[str | None, str]]:
+    """Split a query into (column or None, lowercased term) pairs; unknown prefixes stay free text."""
+    terms: list[tuple[str | None, str]] = []
+    for token in query.lower().split():
+        prefix, sep, value = token.partition(":")
+        if sep and value and prefix in FIELD_ALIASES:
+            terms.append((FIELD_ALIASES[prefix], value))
+        else:
+            terms.append((None, token))
+    return terms
+
+
+def _lowered(series: pd.Series) -> pa.Array:
+    values = pa.array(series.astype(str).to_numpy(dtype=object), type=pa.large_string())
+    return pc.utf8_lower(values)
+
+
+def taxonomy_fingerprint(risk_drivers: pd.DataFrame) -> str:
+    """Content hash of the searchable columns, so a saved index is not reused for an edited taxonomy."""
+    digest = hashlib.blake2b(digest_size=20)
+    bounds = [(0, len(risk_drivers))]
+    for col in SEARCH_COLUMNS:
+        if col in risk_drivers.columns:
+            digest.update(col.encode())
+            digest.update(column_partition_digests(risk_drivers[col], bounds)[0])
+    return digest.hexdigest()
+
+
+def build_driver_search_index(risk_drivers: pd.DataFrame) -> DriverSearchIndex:
+    index = DriverSearchIndex(row_count=len(risk_drivers), fingerprint=taxonomy_fingerprint(risk_drivers), source=risk_drivers)
+    for col in SEARCH_COLUMNS:
+        if col not in risk_drivers.columns:
+            continue
+        lowered = _lowered(risk_drivers[col])
+        codes, labels = pd.factorize(lowered.to_numpy(zero_copy_only=False))
+        if col != "driver_id" and col != "name" and len(labels) <= FACET_MAX_LABELS:
+            index.facets[col] = FacetColumn(codes=codes.astype(np.int32), labels=np.asarray(labels, dtype=object))
+        else:
+            index.text[col] = lowered
+            index.postings[col] = build_trigram_postings(lowered)
+    return index
+
+
+def save_driver_search_index(index: DriverSearchIndex, folder: Path) -> Path:
+    """Persist the index as .npy files (memory-mapped on load) plus a small JSON manifest."""
+    target = folder / INDEX_DIR_NAME
+    target.mkdir(parents=True, exist_ok=True)
+    manifest = {"row_count": index.row_count, "fingerprint": index.fingerprint, "facets": {}, "text": list(index.text)}
+    for col, facet in index.facets.items():
+        np.save(target / f"{col}.codes.npy", facet.codes)
+        manifest["facets"][col] = [str(x) for x in facet.labels]
+    for col, postings in index.postings.items():
+        for part in ("keys", "offsets", "rows"):
+            np.save(target / f"{col}.{part}.npy", getattr(postings, part))
+    (target / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return target
+
+
+def load_driver_search_index(folder: Path, risk_drivers: pd.DataFrame) -> DriverSearchIndex | None:
+    """Load a saved index for `risk_drivers`; returns None when missing or built for another taxonomy."""
+    target = folder / INDEX_DIR_NAME
+    manifest_path = target / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest["row_count"] != len(risk_drivers):
+        return None
+    fingerprint = taxonomy_fingerprint(risk_drivers)
+    if manifest.get("fingerprint") != fingerprint:
+        return None
+
+    index = DriverSearchIndex(row_count=len(risk_drivers), fingerprint=fingerprint, source=risk_drivers)
+    for col, labels in manifest["facets"].items():
+        index.facets[col] = FacetColumn(codes=np.load(target / f"{col}.codes.npy", mmap_mode="r"), labels=np.asarray(labels, dtype=object))
+    for col in manifest["text"]:
+        index.text[col] = _lowered(risk_drivers[col])
+        index.postings[col] = TrigramPostings(*(np.load(target / f"{col}.{part}.npy", mmap_mode="r") for part in ("keys", "offsets", "rows")))
+    return index
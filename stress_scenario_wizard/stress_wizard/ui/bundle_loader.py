@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from stress_wizard.app_state import load_startup_bundle
+from stress_wizard.ingestion.file_import import FileImporter
+
+
+logger = logging.getLogger(__name__)
+
+# Stored bundle that files imported from the ingestion tab are streamed into.
+IMPORT_BUNDLE_NAME = "imports"
+
+
+class _LoaderSignals(QObject):
+    loaded = Signal(str, object, object)  # name, DataBundle, DriverSearchIndex | None
+    failed = Signal(str)
+
+
+class BundleLoadJob(QRunnable):
+    """Runs `load_startup_bundle` off the GUI thread; the result is applied by the receiver."""
+
+    def __init__(self, root: Path | str, name: str | None) -> None:
+        super().__init__()
+        self.root = root
+        self.name = name
+        self.signals = _LoaderSignals()
+
+    def run(self) -> None:
+        try:
+            name, bundle, index = load_startup_bundle(self.root, self.name)
+            self.signals.loaded.emit(name, bundle, index)
+        except Exception as exc:  # pragma: no cover - surfaced to the UI
+            logger.exception("Loading bundle %s failed", self.name)
+            self.signals.failed.emit(str(exc))
+
+
+class _ImportSignals(QObject):
+    progress = Signal(int, float)  # rows read, fraction of the file
+    finished = Signal(object)  # StreamImportResult
+    failed = Signal(str)
+
+
+class StreamImportJob(QRunnable):
+    """Runs `FileImporter.stream_import` into IMPORT_BUNDLE_NAME off the GUI thread, chunk by chunk."""
+
+    def __init__(self, importer: FileImporter, path: Path | str, root: Path | str, category: str, sheet_name: str | None = None) -> None:
+        super().__init__()
+        self.importer = importer
+        self.path = path
+        self.root = root
+        self.category = category
+        self.sheet_name = sheet_name
+        self.signals = _ImportSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.importer.stream_import(
+                self.path,
+                self.root,
+                IMPORT_BUNDLE_NAME,
+                self.category,
+                sheet_name=self.sheet_name,
+                progress=self.signals.progress.emit,
+            )
+            self.signals.finished.emit(result)
+        except Exception as exc:  # pragma: no cover - surfaced to the UI
+            logger.exception("Importing %s failed", self.path)
+            self.signals.failed.emit(str(exc))
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from stress_wizard.app_state import CALCULATION_STAGES, AppState, CalculationInputs, calculation_stages
+from stress_wizard.ui.signals import AppSignals
+
+
+logger = logging.getLogger(__name__)
+
+STAGE_PROGRESS = {"summary": 40, "attribution": 70, "shift": 100}
+
+
+@dataclass(slots=True)
+class CalculationRequest:
+    correlation_regime: float = 0.35
+    liquidity_bps: float = 12.0
+    funding_spread_bps: float = 25.0
+    revaluation: str = "taylor"
+    profile: str | None = None  # "cprofile" | "pyinstrument" to profile this run
+    inputs: CalculationInputs | None = None  # snapshot of AppState, taken on the GUI thread when the job starts
+
+
+class _JobSignals(QObject):
+    stage = Signal(int, str, object)
+    cancelled = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class CalculationJob(QRunnable):
+    """Runs `calculation_stages` over the request's input snapshot off the GUI thread.
+
+    The job never touches AppState: the caches and outputs it produces travel back with its
+    signals and are applied by the service on the GUI thread. The cancel flag is polled between
+    stages and inside the shift table.
+    """
+
+    def __init__(self, job_id: int, request: CalculationRequest) -> None:
+        super().__init__()
+        if request.inputs is None:
+            raise ValueError("CalculationJob needs a request with an inputs snapshot")
+        self.job_id = job_id
+        self.request = request
+        self.signals = _JobSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def run(self) -> None:
+        try:
+            for stage, outputs in calculation_stages(self.request.inputs, self._cancel.is_set, self.request.profile):
+                self.signals.stage.emit(self.job_id, stage, outputs)
+            if self._cancel.is_set():
+                self.signals.cancelled.emit(self.job_id, self.request.inputs)
+        except Exception as exc:  # pragma: no cover - surfaced to the UI
+            logger.exception("Calculation job %s failed", self.job_id)
+            self.signals.failed.emit(self.job_id, str(exc))
+
+
+class CalculationService(QObject):
+    """Debounced, cancellable background calculations with staged delivery on AppSignals.
+
+    Each job prices a snapshot of AppState taken when it starts and its results are applied back
+    on the GUI thread, so the worker never reads or writes the live state. A dedicated single-thread
+    pool serialises jobs; stages from superseded jobs are dropped, but the caches they built are kept.
+    """
+
+    def __init__(self, state: AppState, signals: AppSignals, debounce_ms: int = 300, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.state = state
+        self.signals = signals
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self._job_id = 0
+        self._current: CalculationJob | None = None
+        self._pending: CalculationRequest | None = None
+        # Jobs stopped by `cancel()`; jobs superseded by a newer request end without a cancelled signal.
+        self._user_cancelled: set[int] = set()
+        # Profiler applied to the next job that starts, then cleared.
+        self.profile_next: str | None = None
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._start_pending)
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None
+
+    def request(self, request: CalculationRequest, immediate: bool = False) -> None:
+        """Queue a run; a new request cancels the running job and restarts the debounce window."""
+        self._cancel_current()
+        self._pending = request
+        if immediate:
+            self._debounce.stop()
+            self._start_pending()
+        else:
+            self._debounce.start()
+
+    def cancel(self) -> None:
+        self._debounce.stop()
+        self._pending = None
+        if self._current is not None:
+            self._user_cancelled.add(self._current.job_id)
+        self._cancel_current()
+
+    def _cancel_current(self) -> None:
+        if self._current is not None:
+            self._current.cancel()
+            self._current = None
+
+    def _start_pending(self) -> None:
+        if self._pending is None:
+            return
+        self._job_id += 1
+        if self.profile_next is not None:
+            self._pending.profile, self.profile_next = self.profile_next, None
+        request, self._pending = self._pending, None
+        request.inputs = self.state.calculation_inputs(
+            correlation_regime=request.correlation_regime,
+            liquidity_bps=request.liquidity_bps,
+            funding_spread_bps=request.funding_spread_bps,
+            revaluation=request.revaluation,
+        )
+        job = CalculationJob(self._job_id, request)
+        job.signals.stage.connect(self._on_stage)
+        job.signals.cancelled.connect(self._on_cancelled)
+        job.signals.failed.connect(self._on_failed)
+        self._current = job
+        self.signals.calculation_progress.emit(0, "queued")
+        self.pool.start(job)
+
+    def _is_current(self, job_id: int) -> bool:
+        return self._current is not None and self._current.job_id == job_id
+
+    def _on_stage(self, job_id: int, stage: str, outputs: object) -> None:
+        if not self._is_current(job_id):
+            return
+        if stage == CALCULATION_STAGES[-1]:
+            self.state.apply_calculation(self._current.request.inputs, outputs)
+        self.signals.calculation_progress.emit(STAGE_PROGRESS.get(stage, 0), stage)
+        self.signals.calculation_stage.emit(stage, outputs)
+        if stage == CALCULATION_STAGES[-1]:
+            self._current = None
+            self.signals.calculation_complete.emit()
+
+    def _on_cancelled(self, job_id: int, inputs: CalculationInputs) -> None:
+        self.state.apply_calculation(inputs)
+        if job_id not in self._user_cancelled:
+            return
+        self._user_cancelled.discard(job_id)
+        if self._current is None and self._pending is None:
+            self.signals.calculation_cancelled.emit()
+
+    def _on_failed(self, job_id: int, message: str) -> None:
+        if not self._is_current(job_id):
+            return
+        self._current = None
+        self.signals.calculation_failed.emit(message)
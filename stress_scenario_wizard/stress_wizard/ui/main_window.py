@@ -5,18 +5,20 @@ import json
 from pathlib import Path
 
 import pandas as pd
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from PySide6.QtGui import QAction, QKeySequence
 from PySide6.QtWidgets import (
     QDockWidget,
     QFileDialog,
+    QLabel,
     QMainWindow,
     QMessageBox,
     QStatusBar,
     QTabWidget,
 )
 
-from stress_wizard.app_state import AppState
+from stress_wizard.app_state import AppState, load_startup_bundle
+from stress_wizard.calc.result_cache import ResultCache
 from stress_wizard.config import AppSettings, save_settings
 from stress_wizard.exporter.persistence import (
     append_audit_log,
@@ -33,13 +35,21 @@ from stress_wizard.exporter.reporting import (
     export_pdf_summary,
     export_pptx_summary,
 )
+from stress_wizard.instrumentation import TRACER, summarize
+from stress_wizard.ui.bundle_loader import BundleLoadJob
 from stress_wizard.ui.signals import AppSignals
-from stress_wizard.ui.widgets.calculation_widget import CalculationWidget
-from stress_wizard.ui.widgets.dashboard_widget import DashboardWidget
-from stress_wizard.ui.widgets.data_ingestion_widget import DataIngestionWidget
 from stress_wizard.ui.widgets.governance_widget import GovernanceWidget
-from stress_wizard.ui.widgets.library_widget import ScenarioLibraryWidget
-from stress_wizard.ui.widgets.scenario_designer_widget import ScenarioDesignerWidget
+from stress_wizard.ui.widgets.lazy_tab import LazyTab
+
+
+# key, title, needs the data bundle. Tabs are built on first view; data tabs wait for the bundle.
+TABS = (
+    ("ingestion", "1) Ingestion", True),
+    ("scenario", "2) Scenario Design", True),
+    ("calculation", "3) Calculation", True),
+    ("dashboard", "4) Dashboard", True),
+    ("library", "8) Scenario Library", False),
+)
 
 
 class MainWindow(QMainWindow):
@@ -47,7 +57,9 @@ class MainWindow(QMainWindow):
         super().__init__(parent)
         self.settings = settings
         self.state = AppState()
+        self._configure_result_cache()
         self.signals = AppSignals()
+        self.bundle_name: str | None = None
 
         self.last_save_time: datetime | None = None
         self.current_scenario_dir: Path | None = None
@@ -58,36 +70,33 @@ class MainWindow(QMainWindow):
         self._init_ui()
         self._connect_signals()
         self._setup_autosave()
-        self._load_recovery()
+        self._load_bundle()
 
     def _init_ui(self) -> None:
         self.setWindowTitle("Stress Scenario Generation Wizard")
         self.resize(1680, 980)
 
         self.tabs = QTabWidget(self)
-
-        self.ingestion_widget = DataIngestionWidget(self.state, self.signals, self)
-        self.scenario_widget = ScenarioDesignerWidget(self.state, self.signals, self)
-        self.calc_widget = CalculationWidget(self.state, self.signals, self)
-        self.dashboard_widget = DashboardWidget(self.state, self.signals, self)
-        self.library_widget = ScenarioLibraryWidget(self.settings, self)
-
-        self.tabs.addTab(self.ingestion_widget, "1) Ingestion")
-        self.tabs.addTab(self.scenario_widget, "2) Scenario Design")
-        self.tabs.addTab(self.calc_widget, "3) Calculation")
-        self.tabs.addTab(self.dashboard_widget, "4) Dashboard")
-        self.tabs.addTab(self.library_widget, "8) Scenario Library")
+        self.lazy_tabs: dict[str, LazyTab] = {}
+        for key, title, needs_bundle in TABS:
+            placeholder = "Loading portfolio data..." if needs_bundle else "Loading..."
+            self.lazy_tabs[key] = LazyTab(lambda key=key: self._build_tab(key), placeholder, self.tabs)
+            self.tabs.addTab(self.lazy_tabs[key], title)
+        self.tabs.currentChanged.connect(self._ensure_current_tab)
 
         self.setCentralWidget(self.tabs)
 
-        self.governance_widget = GovernanceWidget(self.state, self.settings, self.signals, self)
+        # The governance panel tracks the current scenario, which needs the bundle's risk drivers.
+        self.governance_tab = LazyTab(lambda: GovernanceWidget(self.state, self.settings, self.signals, self), "Loading portfolio data...")
         self.governance_dock = QDockWidget("Governance Panel", self)
-        self.governance_dock.setWidget(self.governance_widget)
+        self.governance_dock.setWidget(self.governance_tab)
         self.governance_dock.setAllowedAreas(Qt.DockWidgetArea.AllDockWidgetAreas)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.governance_dock)
 
         self.status = QStatusBar(self)
         self.setStatusBar(self.status)
+        self.timing_label = QLabel("")
+        self.status.addPermanentWidget(self.timing_label)
         self._refresh_status("Ready")
 
         self._init_menu()
@@ -136,10 +145,19 @@ class MainWindow(QMainWindow):
         toggle_gov.triggered.connect(lambda: self.governance_dock.setVisible(not self.governance_dock.isVisible()))
         view_menu.addAction(toggle_gov)
 
+        profile_action = QAction("Profile Next Calculation", self)
+        profile_action.triggered.connect(self._profile_next_calculation)
+        view_menu.addAction(profile_action)
+
+        trace_action = QAction("Export Timing Trace...", self)
+        trace_action.triggered.connect(self._export_timing_trace)
+        view_menu.addAction(trace_action)
+
     def _connect_signals(self) -> None:
         self.signals.status_message.connect(self._refresh_status)
         self.signals.scenario_changed.connect(self._snapshot_for_undo)
         self.signals.calculation_complete.connect(lambda: self._refresh_status("Calculation complete"))
+        self.signals.calculation_complete.connect(self._show_timings)
         self.signals.governance_changed.connect(self._sync_governance_to_exports)
 
     def _setup_autosave(self) -> None:
@@ -148,12 +166,140 @@ class MainWindow(QMainWindow):
         if self.settings.autosave_enabled:
             self.autosave_timer.start(max(15, self.settings.autosave_interval_seconds) * 1000)
 
+    def _build_tab(self, key: str):
+        # Widget modules are imported here so their dependencies (plotly, Qt WebEngine) load on first view.
+        if key == "ingestion":
+            from stress_wizard.ui.widgets.data_ingestion_widget import DataIngestionWidget
+
+            return DataIngestionWidget(self.state, self.signals, self.settings.root_dir, self)
+        if key == "scenario":
+            from stress_wizard.ui.widgets.scenario_designer_widget import ScenarioDesignerWidget
+
+            return ScenarioDesignerWidget(self.state, self.signals, self)
+        if key == "calculation":
+            from stress_wizard.ui.widgets.calculation_widget import CalculationWidget
+
+            return CalculationWidget(self.state, self.signals, self)
+        if key == "dashboard":
+            from stress_wizard.ui.widgets.dashboard_widget import DashboardWidget
+
+            widget = DashboardWidget(self.state, self.signals, self)
+            widget.refresh()
+            return widget
+        from stress_wizard.ui.widgets.library_widget import ScenarioLibraryWidget
+
+        return ScenarioLibraryWidget(self.settings, self)
+
+    def _ensure_current_tab(self) -> None:
+        key, _title, needs_bundle = TABS[self.tabs.currentIndex()]
+        if self.bundle_ready or not needs_bundle:
+            self.lazy_tabs[key].ensure()
+
+    def _tab_built(self, key: str) -> bool:
+        return self.lazy_tabs[key].built
+
+    @property
+    def bundle_ready(self) -> bool:
+        return self.bundle_name is not None
+
+    @property
+    def ingestion_widget(self):
+        return self.lazy_tabs["ingestion"].ensure()
+
+    @property
+    def scenario_widget(self):
+        return self.lazy_tabs["scenario"].ensure()
+
+    @property
+    def calc_widget(self):
+        return self.lazy_tabs["calculation"].ensure()
+
+    @property
+    def dashboard_widget(self):
+        return self.lazy_tabs["dashboard"].ensure()
+
+    @property
+    def governance_widget(self):
+        return self.governance_tab.ensure()
+
+    @property
+    def library_widget(self):
+        return self.lazy_tabs["library"].ensure()
+
+    def _load_bundle(self) -> None:
+        """Restore the last-used stored bundle; with fast_start the window is usable meanwhile."""
+        root, name = self.settings.root_dir, self.settings.last_bundle or None
+        if not self.settings.fast_start:
+            self._on_bundle_loaded(*load_startup_bundle(root, name))
+            return
+        self._refresh_status("Loading portfolio data...")
+        self._bundle_job = BundleLoadJob(root, name)
+        self._bundle_job.signals.loaded.connect(self._on_bundle_loaded)
+        self._bundle_job.signals.failed.connect(self._on_bundle_failed)
+        QThreadPool.globalInstance().start(self._bundle_job)
+
+    def _on_bundle_loaded(self, name: str, bundle, driver_index) -> None:
+        self.state.use_bundle(bundle, driver_index)
+        self.bundle_name = name
+        if self.settings.last_bundle != name:
+            self.settings.last_bundle = name
+            save_settings(self.settings)
+        self._load_recovery()
+        self.governance_tab.ensure()
+        self._ensure_current_tab()
+        self.signals.data_changed.emit()
+        self._refresh_status(f"Loaded portfolio '{name}'")
+
+    def _on_bundle_failed(self, message: str) -> None:
+        QMessageBox.critical(self, "Portfolio Load Failed", message)
+        self._refresh_status("Portfolio data could not be loaded")
+
+    def _require_bundle(self) -> bool:
+        if not self.bundle_ready:
+            self._refresh_status("Portfolio data is still loading")
+        return self.bundle_ready
+
+    def _configure_result_cache(self) -> None:
+        if not self.settings.result_cache_enabled:
+            self.state.result_cache = None
+            return
+        self.state.result_cache = ResultCache(self.settings.root_dir, max_bytes=self.settings.result_cache_max_mb * 2**20)
+
     def _refresh_status(self, message: str) -> None:
         db_state = "DB: Demo/File"
-        portfolio_state = f"Positions: {len(self.state.data_bundle.positions):,}"
+        portfolio_state = f"Positions: {len(self.state.data_bundle.positions):,}" if self.bundle_ready else "Positions: loading"
         saved = self.last_save_time.strftime("%H:%M:%S") if self.last_save_time else "never"
         self.status.showMessage(f"{message} | {db_state} | {portfolio_state} | Last Save: {saved}")
 
+    def _show_timings(self) -> None:
+        run = TRACER.last("calculation.run")
+        if run is None:
+            return
+        self.timing_label.setText(f"{summarize(run)} (cached)" if self.state.outputs.cached else summarize(run))
+        # Tooltip: the run's span tree on the calculation thread, in start order.
+        end = run.start_ns + run.duration_ns
+        spans = sorted(
+            (s for s in TRACER.spans(since_ns=run.start_ns) if s is not run and s.thread_id == run.thread_id and s.start_ns + s.duration_ns <= end),
+            key=lambda s: s.start_ns,
+        )
+        self.timing_label.setToolTip("\n".join(f"{'  ' * (s.depth - run.depth - 1)}{s.name}: {s.ms:,.1f} ms" for s in spans[:60]))
+        profile = self.state.outputs.profile_path
+        if profile is not None:
+            self._refresh_status(f"Calculation complete, profile written to {profile}")
+
+    def _profile_next_calculation(self) -> None:
+        self.calc_widget.service.profile_next = "cprofile"
+        self._refresh_status(f"Next calculation will be profiled into {self.state.profile_dir}")
+
+    def _export_timing_trace(self) -> None:
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Export Timing Trace", "stress_wizard_trace.json", "Chrome trace (*.json);;Span list (*.json)"
+        )
+        if not path:
+            return
+        TRACER.dump(path, "json" if selected.startswith("Span") else "chrome")
+        self._refresh_status(f"Timing trace written to {path}")
+
     def _snapshot_for_undo(self) -> None:
         scenario = self.state.ensure_scenario()
         payload = scenario.shocks.risk_driver_shocks.to_json(orient="records")
@@ -185,8 +331,11 @@ class MainWindow(QMainWindow):
         self._restore_snapshot(payload)
 
     def _new_scenario(self) -> None:
+        if not self._require_bundle():
+            return
         self.state.create_new_scenario("Untitled Stress Scenario")
-        self.scenario_widget._initialize_defaults()  # noqa: SLF001
+        if self._tab_built("scenario"):
+            self.scenario_widget._initialize_defaults()  # noqa: SLF001
         self._refresh_status("Created new scenario")
 
     def _default_root(self) -> Path:
@@ -195,6 +344,8 @@ class MainWindow(QMainWindow):
         return root
 
     def _save(self) -> None:
+        if not self._require_bundle():
+            return
         scenario = self.state.ensure_scenario()
         scenario_dir = create_scenario_structure(self._default_root(), scenario)
         self.current_scenario_dir = scenario_dir
@@ -238,7 +389,8 @@ class MainWindow(QMainWindow):
 
         self.last_save_time = datetime.now()
         self._refresh_status("Scenario saved")
-        self.library_widget.refresh()
+        if self._tab_built("library"):
+            self.library_widget.refresh()
 
     def _save_as(self) -> None:
         chosen = QFileDialog.getExistingDirectory(self, "Select Save Root", self.settings.root_path)
@@ -246,9 +398,12 @@ class MainWindow(QMainWindow):
             return
         self.settings.root_path = chosen
         save_settings(self.settings)
+        self._configure_result_cache()
         self._save()
 
     def _export(self) -> None:
+        if not self._require_bundle():
+            return
         scenario = self.state.ensure_scenario()
         gov_state = self.governance_widget.workflow.load_state(scenario.metadata.scenario_id)
         if self.settings.governance.mandatory_export_approval and gov_state.get("state") != "Approved":
@@ -313,12 +468,13 @@ class MainWindow(QMainWindow):
             name = payload.get("scenario_name")
             if name:
                 self.state.create_new_scenario(name)
-                self.scenario_widget._initialize_defaults()  # noqa: SLF001
+                if self._tab_built("scenario"):
+                    self.scenario_widget._initialize_defaults()  # noqa: SLF001
         except Exception:
             return
 
     def _write_recovery(self) -> None:
-        if not self.settings.save_last_session:
+        if not self.settings.save_last_session or self.state.scenario is None:
             return
         scenario = self.state.ensure_scenario()
         payload = {
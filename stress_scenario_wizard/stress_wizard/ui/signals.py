@@ -7,5 +7,9 @@ class AppSignals(QObject):
     data_changed = Signal()
     scenario_changed = Signal()
     calculation_complete = Signal()
+    calculation_progress = Signal(int, str)  # percent, stage
+    calculation_stage = Signal(str, object)  # stage, AnalysisOutputs
+    calculation_cancelled = Signal()
+    calculation_failed = Signal(str)
     governance_changed = Signal()
     status_message = Signal(str)
@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
     QGroupBox,
     QHBoxLayout,
     QLabel,
+    QProgressBar,
     QPushButton,
     QTableView,
     QTextEdit,
@@ -15,7 +16,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from stress_wizard.app_state import AppState
+from stress_wizard.app_state import AnalysisOutputs, AppState
+from stress_wizard.ui.calculation_service import CalculationRequest, CalculationService
 from stress_wizard.ui.signals import AppSignals
 from stress_wizard.ui.widgets.pandas_model import LazyDataFrameModel
 
@@ -30,7 +32,11 @@ class CalculationWidget(QWidget):
         self.attrib_model = LazyDataFrameModel(pd.DataFrame())
         self.shift_model = LazyDataFrameModel(pd.DataFrame())
 
+        self.service = CalculationService(state, signals, parent=self)
+        self._attribution: dict[str, pd.DataFrame] = {}
+
         self._build_ui()
+        self._connect_signals()
 
     def _build_ui(self) -> None:
         root = QVBoxLayout(self)
@@ -51,13 +57,31 @@ class CalculationWidget(QWidget):
         self.funding_bps.setRange(0.0, 1000.0)
         self.funding_bps.setValue(25.0)
 
+        # Grid modes only affect positions covered by the state's revaluation grid.
+        self.pricing_mode = QComboBox()
+        self.pricing_mode.addItems(["taylor", "bilinear", "cubic"])
+
         run_btn = QPushButton("Run Stress Calculation")
         run_btn.clicked.connect(self._run)
 
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.service.cancel)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(run_btn)
+        buttons.addWidget(self.cancel_btn)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setValue(0)
+
         cfg.addRow("Correlation Regime (0-1)", self.corr_regime)
         cfg.addRow("Liquidity Widening (bps)", self.liquidity_bps)
         cfg.addRow("Funding Stress (bps)", self.funding_bps)
-        cfg.addRow("", run_btn)
+        cfg.addRow("Nonlinear Pricing", self.pricing_mode)
+        cfg.addRow("", buttons)
+        cfg.addRow("Progress", self.progress)
 
         self.summary_text = QTextEdit()
         self.summary_text.setReadOnly(True)
@@ -93,13 +117,57 @@ class CalculationWidget(QWidget):
         root.addWidget(QLabel("Position-Level Drilldown"))
         root.addWidget(results_table, stretch=1)
 
-    def _run(self) -> None:
-        outputs = self.state.run_calculation(
+    def _connect_signals(self) -> None:
+        for spin in (self.corr_regime, self.liquidity_bps, self.funding_bps):
+            spin.valueChanged.connect(self._schedule)
+        self.pricing_mode.currentTextChanged.connect(self._schedule)
+        self.signals.calculation_progress.connect(self._on_progress)
+        self.signals.calculation_stage.connect(self._on_stage)
+        self.signals.calculation_cancelled.connect(self._on_cancelled)
+        self.signals.calculation_failed.connect(self._on_failed)
+
+    def _request(self) -> CalculationRequest:
+        return CalculationRequest(
             correlation_regime=float(self.corr_regime.value()),
             liquidity_bps=float(self.liquidity_bps.value()),
             funding_spread_bps=float(self.funding_bps.value()),
+            revaluation=self.pricing_mode.currentText(),
         )
 
+    def _run(self) -> None:
+        self.service.request(self._request(), immediate=True)
+
+    def _schedule(self) -> None:
+        # Only auto-rerun once the user has results on screen; edits are debounced by the service.
+        if not self.state.outputs.results.empty or self.service.busy:
+            self.service.request(self._request())
+
+    def _on_progress(self, percent: int, stage: str) -> None:
+        self.progress.setValue(percent)
+        self.progress.setFormat(f"{stage} (%p%)")
+        self.cancel_btn.setEnabled(percent < 100)
+
+    def _on_stage(self, stage: str, outputs: AnalysisOutputs) -> None:
+        if stage == "summary":
+            self._show_summary(outputs)
+        elif stage == "attribution":
+            self._refresh_attribution_view(outputs=outputs)
+        elif stage == "shift":
+            self.shift_model.set_frame(outputs.sensitivity.head(1000))
+            self.signals.status_message.emit("Stress calculation completed.")
+
+    def _on_cancelled(self) -> None:
+        self.cancel_btn.setEnabled(self.service.busy)
+        if not self.service.busy:
+            self.progress.setValue(0)
+            self.signals.status_message.emit("Stress calculation cancelled.")
+
+    def _on_failed(self, message: str) -> None:
+        self.cancel_btn.setEnabled(False)
+        self.progress.setValue(0)
+        self.signals.status_message.emit(f"Stress calculation failed: {message}")
+
+    def _show_summary(self, outputs: AnalysisOutputs) -> None:
         summary_lines = [
             f"Position Count: {outputs.summary.get('position_count', 0):,}",
             f"Loss-Making Positions: {outputs.summary.get('loss_positions', 0):,}",
@@ -115,17 +183,14 @@ class CalculationWidget(QWidget):
             f"Liquidity Adjustment: {outputs.summary.get('pnl_liquidity', 0.0):,.2f}",
         ]
         self.summary_text.setPlainText("\n".join(summary_lines))
-
         self.results_model.set_frame(outputs.results.head(12000))
-        self.shift_model.set_frame(outputs.sensitivity.head(1000))
-        self._refresh_attribution_view()
-
-        self.signals.calculation_complete.emit()
-        self.signals.status_message.emit("Stress calculation completed.")
 
-    def _refresh_attribution_view(self) -> None:
+    def _refresh_attribution_view(self, *_args: object, outputs: AnalysisOutputs | None = None) -> None:
+        if outputs is not None:
+            self._attribution = outputs.attribution
+        attribution = self._attribution or self.state.outputs.attribution
         view = self.attrib_view.currentText()
-        if view in self.state.outputs.attribution:
-            self.attrib_model.set_frame(self.state.outputs.attribution[view])
+        if view in attribution:
+            self.attrib_model.set_frame(attribution[view])
         else:
             self.attrib_model.set_frame(pd.DataFrame())
@@ -3,7 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 import pandas as pd
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
 from PySide6.QtWidgets import (
     QComboBox,
     QFileDialog,
@@ -13,6 +13,7 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QSpinBox,
     QSplitter,
@@ -23,23 +24,34 @@ from PySide6.QtWidgets import (
 )
 
 from stress_wizard.app_state import AppState
+from stress_wizard.data.columnar_store import open_table
 from stress_wizard.ingestion.column_mapper import REQUIRED_FIELDS, suggest_mappings
-from stress_wizard.ingestion.file_import import FileImporter
-from stress_wizard.ingestion.validator import validate_bundle
+from stress_wizard.ingestion.file_import import FileImporter, StreamImportResult
+from stress_wizard.ingestion.validator import ValidationScorecard
+from stress_wizard.ui.bundle_loader import IMPORT_BUNDLE_NAME, StreamImportJob
 from stress_wizard.ui.signals import AppSignals
 from stress_wizard.ui.widgets.pandas_model import LazyDataFrameModel
 
 
 class DataIngestionWidget(QWidget):
-    def __init__(self, state: AppState, signals: AppSignals, parent: QWidget | None = None) -> None:
+    """File import, column profiling and validation for the current bundle.
+
+    Files are streamed chunk by chunk into the columnar store under `root` (see
+    `FileImporter.stream_import`) and the stored table is memory-mapped into the bundle.
+    """
+
+    def __init__(self, state: AppState, signals: AppSignals, root: Path | str, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.state = state
         self.signals = signals
+        self.root = Path(root)
         self.file_importer = FileImporter()
+        self._import_job: StreamImportJob | None = None
 
         self.preview_model = LazyDataFrameModel(pd.DataFrame())
         self.stats_model = LazyDataFrameModel(pd.DataFrame())
         self.mapping_model = LazyDataFrameModel(pd.DataFrame())
+        self._scorecard: ValidationScorecard | None = None
 
         self._build_ui()
         self._load_bundle_preview()
@@ -68,7 +80,7 @@ class DataIngestionWidget(QWidget):
         source_layout.addRow("File", file_row)
 
         self.category_combo = QComboBox()
-        self.category_combo.addItems(["positions", "sensitivities", "market_data", "risk_drivers"])
+        self.category_combo.addItems(["positions", "sensitivities", "market_data", "risk_drivers", "driver_sensitivities"])
         source_layout.addRow("Target Category", self.category_combo)
 
         load_row = QHBoxLayout()
@@ -80,6 +92,11 @@ class DataIngestionWidget(QWidget):
         load_row.addWidget(validate_btn)
         source_layout.addRow("Actions", load_row)
 
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 100)
+        self.import_progress.setValue(0)
+        source_layout.addRow("Import Progress", self.import_progress)
+
         sql_help = QLabel("SQL connection profiles are supported in the backend module; demo mode uses file import and synthetic data.")
         sql_help.setWordWrap(True)
         source_layout.addRow("SQL", sql_help)
@@ -101,7 +118,8 @@ class DataIngestionWidget(QWidget):
 
         left = QWidget()
         left_layout = QVBoxLayout(left)
-        left_layout.addWidget(QLabel("Preview (first 100 rows)"))
+        self.preview_label = QLabel("Preview (first 100 rows)")
+        left_layout.addWidget(self.preview_label)
         preview_table = QTableView()
         preview_table.setModel(self.preview_model)
         preview_table.setAlternatingRowColors(True)
@@ -130,11 +148,23 @@ class DataIngestionWidget(QWidget):
         self.validation_text.setReadOnly(True)
         self.validation_text.setMinimumHeight(140)
 
+        drill_row = QHBoxLayout()
+        self.issue_combo = QComboBox()
+        self.issue_combo.setEnabled(False)
+        self.issue_combo.setMinimumWidth(320)
+        show_rows_btn = QPushButton("Show Failing Rows")
+        show_rows_btn.clicked.connect(self._show_issue_rows)
+        drill_row.addWidget(QLabel("Drill down:"))
+        drill_row.addWidget(self.issue_combo)
+        drill_row.addWidget(show_rows_btn)
+        drill_row.addStretch(1)
+
         root.addWidget(source_group)
         root.addWidget(generator_group)
         root.addWidget(splitter, stretch=1)
         root.addWidget(QLabel("Data Validation Dashboard"))
         root.addWidget(self.validation_text)
+        root.addLayout(drill_row)
 
     def _browse_file(self) -> None:
         file_path, _ = QFileDialog.getOpenFileName(
@@ -162,21 +192,47 @@ class DataIngestionWidget(QWidget):
         if not path:
             QMessageBox.warning(self, "File Missing", "Select a file to import.")
             return
+        if self._import_job is not None:
+            return
 
+        sheet = self.sheet_combo.currentText() if self.sheet_combo.isEnabled() else None
+        job = self._import_job = StreamImportJob(self.file_importer, path, self.root, self.category_combo.currentText(), sheet)
+        job.signals.progress.connect(self._on_import_progress)
+        job.signals.finished.connect(self._on_import_finished)
+        job.signals.failed.connect(self._on_import_failed)
+        self.load_btn.setEnabled(False)
+        self.import_progress.setValue(0)
+        QThreadPool.globalInstance().start(job)
+
+    def _on_import_progress(self, rows: int, fraction: float) -> None:
+        self.import_progress.setValue(int(round(fraction * 100)))
+        self.signals.status_message.emit(f"Importing... {rows:,} rows read")
+
+    def _on_import_finished(self, result: StreamImportResult) -> None:
+        self._import_job = None
+        self.load_btn.setEnabled(True)
+        self.import_progress.setValue(100)
         try:
-            sheet = self.sheet_combo.currentText() if self.sheet_combo.isEnabled() else None
-            frame = self.file_importer.load(path, sheet_name=sheet)
-            category = self.category_combo.currentText()
-            setattr(self.state.data_bundle, category, frame)
-            self.signals.data_changed.emit()
-            self.signals.status_message.emit(f"Loaded {len(frame):,} rows into {category}.")
-            self._preview_frame(frame, category)
+            frame = open_table(self.root, IMPORT_BUNDLE_NAME, result.category)
         except Exception as exc:
             QMessageBox.critical(self, "Import Failed", str(exc))
+            return
+        setattr(self.state.data_bundle, result.category, frame)
+        self.signals.data_changed.emit()
+        self.signals.status_message.emit(f"Loaded {result.rows:,} rows into {result.category}.")
+        self._preview_frame(frame, result.category, result.stats)
 
-    def _preview_frame(self, frame: pd.DataFrame, category: str) -> None:
+    def _on_import_failed(self, message: str) -> None:
+        self._import_job = None
+        self.load_btn.setEnabled(True)
+        self.import_progress.setValue(0)
+        QMessageBox.critical(self, "Import Failed", message)
+
+    def _preview_frame(self, frame: pd.DataFrame, category: str, stats: pd.DataFrame | None = None) -> None:
+        """Show the first rows, column stats and mapping suggestions; streamed imports pass their own stats."""
         preview = self.file_importer.preview(frame)
-        stats = self.file_importer.column_stats(frame)
+        if stats is None:
+            stats = self.file_importer.column_stats(frame)
         mappings = suggest_mappings(frame.columns.tolist(), category)
 
         mapping_df = pd.DataFrame(
@@ -192,6 +248,7 @@ class DataIngestionWidget(QWidget):
         )
 
         self.preview_model.set_frame(preview)
+        self.preview_label.setText("Preview (first 100 rows)")
         self.stats_model.set_frame(stats)
         self.mapping_model.set_frame(mapping_df)
 
@@ -201,13 +258,7 @@ class DataIngestionWidget(QWidget):
         self._preview_frame(frame, category)
 
     def _run_validation(self) -> None:
-        bundle = self.state.data_bundle
-        scorecard = validate_bundle(
-            positions=bundle.positions,
-            sensitivities=bundle.sensitivities,
-            market_data=bundle.market_data,
-            risk_drivers=bundle.risk_drivers,
-        )
+        scorecard = self._scorecard = self.state.validate_data_bundle()
 
         lines = [
             f"Overall Data Quality Score: {scorecard.total_score:.2f}",
@@ -234,6 +285,25 @@ class DataIngestionWidget(QWidget):
 
         self.validation_text.setPlainText("\n".join(lines))
 
+        self.issue_combo.clear()
+        for issue in scorecard.issues:
+            if issue.rule:
+                self.issue_combo.addItem(f"{issue.rule} ({issue.count:,} rows)", issue.rule)
+        self.issue_combo.setEnabled(self.issue_combo.count() > 0)
+
+    def _show_issue_rows(self) -> None:
+        rule = self.issue_combo.currentData()
+        if self._scorecard is None or rule is None:
+            return
+        result = self._scorecard.rules[rule]
+        frame = getattr(self.state.data_bundle, result.table)
+        if len(frame) != result.checked:
+            QMessageBox.information(self, "Data Changed", "The bundle changed since the last validation; run it again.")
+            return
+        rows = self._scorecard.issue_rows(rule, frame)
+        self.preview_model.set_frame(rows)
+        self.preview_label.setText(f"{rule}: {len(rows):,} failing {result.table} rows")
+
     def _regenerate_bundle(self) -> None:
         count = int(self.risk_driver_count.value())
         self.state.regenerate_risk_drivers(count)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+
+class LazyTab(QWidget):
+    """Tab page that builds its real widget the first time it is needed."""
+
+    def __init__(self, factory: Callable[[], QWidget], placeholder: str = "Loading...", parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.factory = factory
+        self.widget: QWidget | None = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel(placeholder)
+        self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._layout.addWidget(self.placeholder)
+
+    @property
+    def built(self) -> bool:
+        return self.widget is not None
+
+    def ensure(self) -> QWidget:
+        if self.widget is None:
+            self.widget = self.factory()
+            self.placeholder.hide()
+            self._layout.addWidget(self.widget)
+        return self.widget
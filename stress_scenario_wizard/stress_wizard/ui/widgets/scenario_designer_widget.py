@@ -245,7 +245,7 @@ class ScenarioDesignerWidget(QWidget):
 
     def _search_drivers(self) -> None:
         query = self.search_input.text().strip()
-        frame = search_risk_drivers(self.state.data_bundle.risk_drivers, query=query, limit=5000)
+        frame = search_risk_drivers(self.state.data_bundle.risk_drivers, query=query, limit=5000, index=self.state.driver_search_index())
 
         scenario = self.state.ensure_scenario()
         shocks = scenario.shocks.risk_driver_shocks[["driver_id", "shock", "lock"]] if not scenario.shocks.risk_driver_shocks.empty else pd.DataFrame(columns=["driver_id", "shock", "lock"])
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import numpy as np
+
+from stress_wizard.calc.attribution import attribution_views, build_attribution_cube
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.engine import compute_pnl
+from stress_wizard.data.demo_data import generate_positions, generate_sensitivities
+
+
+def test_cube_views_match_groupby() -> None:
+    positions = generate_positions(500).drop(columns=["geography"])
+    sensitivities = generate_sensitivities(positions)
+    book = build_priced_book(positions, sensitivities)
+    results = compute_pnl(positions, sensitivities, {"Equities": {"index_pct": -0.1, "vol_atm_pct": 0.3}}, book=book)
+
+    views = attribution_views(results, book)
+
+    expected = results.groupby(["desk", "book"])["pnl_total"].sum()
+    got = views["book"].set_index(["desk", "book"])["pnl"]
+    assert np.allclose(got.loc[expected.index].to_numpy(), expected.to_numpy())
+    assert list(views["geography"]["geography"]) == ["Unknown"]
+    assert list(views["tenor"]["tenor"]) == ["N/A"]
+    assert views["position"]["position_count"].sum() == len(results)
+    assert np.isclose(views["risk_factor"]["pnl"].sum(), results["pnl_total"].sum())
+
+
+def test_cube_without_book_uses_same_groups() -> None:
+    positions = generate_positions(300)
+    sensitivities = generate_sensitivities(positions)
+    book = build_priced_book(positions, sensitivities)
+    results = compute_pnl(positions, sensitivities, {"Rates": {"parallel_shift_bp": 50.0}}, book=book)
+
+    with_book = build_attribution_cube(results, book).view("desk")
+    without = build_attribution_cube(results).view("desk")
+
+    assert list(with_book["desk"]) == list(without["desk"])
+    assert np.allclose(with_book["pnl"], without["pnl"])
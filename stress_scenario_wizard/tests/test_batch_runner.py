@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pyarrow as pa
+
+from stress_wizard.app_state import AppState
+from stress_wizard.calc.batch_runner import BatchSettings, run_batch
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.engine import CalculationConfig, compute_pnl
+from stress_wizard.cli import main
+from stress_wizard.data.columnar_store import save_bundle
+from stress_wizard.data.demo_data import generate_positions, generate_risk_driver_taxonomy, generate_sample_driver_shocks, generate_sensitivities
+from stress_wizard.exporter.persistence import create_scenario_structure, write_driver_shocks, write_scenario_config
+from stress_wizard.models import DataBundle
+
+
+def _library(root, count: int) -> DataBundle:
+    positions = generate_positions(300)
+    drivers = generate_risk_driver_taxonomy(500)
+    positions["driver_id"] = drivers["driver_id"].sample(len(positions), replace=True, random_state=2).to_numpy()
+    bundle = DataBundle(positions=positions, sensitivities=generate_sensitivities(positions), market_data=pd.DataFrame({"driver_id": ["D"], "level": [1.0]}), risk_drivers=drivers)
+    save_bundle(bundle, root, "book")
+
+    state = AppState(data_bundle=bundle)
+    for i in range(count):
+        scenario = state.create_new_scenario(f"Batch {i}")
+        scenario.shocks.asset_class_shocks = {"Equities": {"index_pct": -0.05 * (i + 1)}, "Rates": {"parallel_shift_bp": 25.0 * i}}
+        folder = create_scenario_structure(root, scenario)
+        write_scenario_config(folder, scenario)
+        write_driver_shocks(folder, generate_sample_driver_shocks(drivers, n=50, seed=i))
+    return bundle
+
+
+def test_batch_run_matches_in_process_pricing(tmp_path) -> None:
+    bundle = _library(tmp_path, 5)
+    manifest = run_batch(tmp_path, "book", workers=2, settings=BatchSettings(correlation_regime=0.5))
+
+    assert manifest["succeeded"] == 5 and manifest["failed"] == 0
+    out = tmp_path / "batch_runs"
+    assert json.loads(next(out.glob("*/run_manifest.json")).read_text())["run_id"] == manifest["run_id"]
+
+    book = build_priced_book(bundle.positions, bundle.sensitivities)
+    for entry in manifest["scenarios"]:
+        folder = tmp_path / "scenarios" / entry["folder"]
+        config = json.loads((folder / "scenario_config.json").read_text())
+        expected = compute_pnl(
+            None,
+            None,
+            config["shocks"]["asset_class_shocks"],
+            driver_shocks=pd.read_csv(folder / "driver_shocks.csv"),
+            config=CalculationConfig(correlation_regime=0.5),
+            book=book,
+        )
+        assert abs(entry["pnl_total"] - float(expected["pnl_total"].sum())) < 1e-6
+        stored = pa.ipc.open_file(str(next(out.glob(f"*/results/{entry['results_path']}")))).read_all()
+        assert stored.num_rows == len(bundle.positions)
+
+    # Unchanged scenarios are served from the result cache on the next run.
+    again = run_batch(tmp_path, "book", workers=1, settings=BatchSettings(correlation_regime=0.5))
+    assert again["cached"] == 5 and all(r["cached"] for r in again["scenarios"])
+    assert [r["pnl_total"] for r in again["scenarios"]] == [r["pnl_total"] for r in manifest["scenarios"]]
+
+
+def test_cli_reports_failed_scenarios(tmp_path, capsys) -> None:
+    _library(tmp_path, 2)
+    broken = next((tmp_path / "scenarios").iterdir()) / "scenario_config.json"
+    broken.write_text("{not json", encoding="utf-8")
+
+    code = main(["batch", "--root", str(tmp_path), "--bundle", "book", "--workers", "1", "--quiet"])
+
+    assert code == 2
+    assert "succeeded=1 failed=1" in capsys.readouterr().out
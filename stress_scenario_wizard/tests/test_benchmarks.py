@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import copy
+
+from stress_wizard.benchmarks import (
+    BenchmarkScale,
+    append_history,
+    find_regressions,
+    load_baseline,
+    load_history,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+TINY = BenchmarkScale("tiny", 300, 2_000)
+
+
+def test_run_records_every_selected_case_and_appends_history(tmp_path) -> None:
+    record = run_benchmarks([TINY], case_names=["compute_pnl", "attribution", "export"], repeat=1)
+
+    cases = record["scales"]["tiny"]["cases"]
+    assert {"generate_demo_bundle", "compute_pnl", "attribution.by_desk", "export.results_csv"} <= set(cases)
+    assert "validate_bundle" not in cases
+    assert cases["compute_pnl"]["status"] == "ok" and cases["compute_pnl"]["seconds"] > 0
+    assert all(c["status"] in {"ok", "skipped"} for c in cases.values())
+
+    append_history(record, tmp_path)
+    append_history(record, tmp_path)
+    assert [r["run_id"] for r in load_history(tmp_path)] == [record["run_id"]] * 2
+
+
+def test_regressions_are_flagged_against_the_stored_baseline(tmp_path) -> None:
+    record = run_benchmarks([TINY], case_names=["compute_pnl", "marginal_contribution"], repeat=1)
+    save_baseline(record, tmp_path)
+    assert find_regressions(record, load_baseline(tmp_path)) == []
+
+    slower = copy.deepcopy(record)
+    case = slower["scales"]["tiny"]["cases"]["compute_pnl"]
+    case["seconds"] = case["seconds"] * 3 + 1.0
+    found = find_regressions(slower, load_baseline(tmp_path))
+    assert [(r.case, r.metric) for r in found] == [("compute_pnl", "seconds")]
+    # Within tolerance, or below the absolute floor, is not a regression.
+    case["seconds"] = record["scales"]["tiny"]["cases"]["compute_pnl"]["seconds"] * 1.1
+    assert find_regressions(slower, load_baseline(tmp_path)) == []
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stress_wizard.data.demo_data import generate_risk_driver_taxonomy
+from stress_wizard.scenario.beta_matrix import build_beta_matrix
+from stress_wizard.scenario.bottom_up import DEFAULT_TENOR_DECAY, PropagationRule, TenorCurve, beta_propagation, hierarchical_propagation
+from stress_wizard.scenario.driver_search import build_driver_search_index
+
+
+def test_hierarchical_propagation_matches_row_by_row_rule() -> None:
+    drivers = generate_risk_driver_taxonomy(2_000)
+    out = hierarchical_propagation(drivers, {"asset_class": "rates"}, -0.2, sector_multipliers={"Tech": 1.3})
+
+    impacted = drivers[drivers["asset_class"] == "Rates"]
+    expected = [-0.2 * DEFAULT_TENOR_DECAY[t] * (1.3 if s == "Tech" else 1.0) for t, s in zip(impacted["tenor"], impacted["sector"])]
+    assert out.index.equals(impacted.index)
+    assert np.allclose(out["shock"], expected)
+    assert (out["method"] == "hierarchical").all()
+
+    indexed = hierarchical_propagation(drivers, {"asset_class": "rates"}, -0.2, sector_multipliers={"Tech": 1.3}, index=build_driver_search_index(drivers))
+    pd.testing.assert_frame_equal(indexed, out)
+
+
+def test_tenor_curve_interpolates_and_rules_chain() -> None:
+    curve = TenorCurve({"1Y": 1.0, "5Y": 0.6})
+    assert curve.multiplier("3Y") == pytest.approx(0.8)
+    assert curve.multiplier("18M") == pytest.approx(0.95)
+    assert curve.multiplier("30Y") == pytest.approx(0.6)
+    assert curve.multiplier("bucket-x", default=0.5) == 0.5
+
+    drivers = pd.DataFrame(
+        {
+            "driver_id": ["A", "B", "C"],
+            "asset_class": ["Credit", "Credit", "Rates"],
+            "sector": ["Energy", "Tech", "Energy"],
+            "issuer": ["Issuer-1", "Issuer-2", "Issuer-1"],
+            "tenor": ["3Y", "1Y", "5Y"],
+        }
+    )
+    rules = [PropagationRule("Asset Class", "credit", 2.0), PropagationRule("Sector", "Energy", 1.5), PropagationRule("Issuer", "Issuer-1", 0.5)]
+    out = hierarchical_propagation(drivers, {}, -0.1, tenor_curve={"1Y": 1.0, "5Y": 0.6}, rules=rules)
+    assert np.allclose(out["shock"], [-0.1 * 0.8 * 2.0 * 1.5 * 0.5, -0.1 * 1.0 * 2.0, -0.1 * 0.6 * 1.5 * 0.5])
+
+    with pytest.raises(ValueError):
+        hierarchical_propagation(drivers, {}, -0.1, rules=[PropagationRule("Desk", "X", 1.0)])
+
+
+def test_beta_propagation_sums_multiple_benchmarks() -> None:
+    beta_map = pd.DataFrame(
+        {
+            "driver_id": ["A", "A", "B", "C", "C"],
+            "benchmark_id": ["MKT", "SECTOR", "MKT", "STYLE", "MKT"],
+            "beta": [1.2, 0.5, np.nan, 2.0, 0.3],
+        }
+    )
+    shocks = pd.DataFrame({"benchmark_id": ["MKT", "SECTOR"], "shock": [-0.1, -0.04]})
+
+    out = beta_propagation(shocks, beta_map, default_beta=0.8)
+    assert out["driver_id"].tolist() == ["A", "B", "C"]
+    assert np.allclose(out["shock"], [1.2 * -0.1 + 0.5 * -0.04, 0.8 * -0.1, 0.3 * -0.1])
+
+    matrix = build_beta_matrix(beta_map, default_beta=0.8)
+    assert matrix.shape == (3, 3)
+    scenarios = pd.DataFrame({"base": [-0.1, -0.04, 0.0], "style": [0.0, 0.0, 0.05]}, index=["MKT", "SECTOR", "STYLE"])
+    many = matrix.propagate_many(scenarios)
+    assert np.allclose(many["base"], out["shock"])
+    assert np.allclose(many["style"], [0.0, 0.0, 0.1])
+    pd.testing.assert_frame_equal(beta_propagation(shocks, beta_map, default_beta=0.8, matrix=matrix), out)
+
+
+def test_cached_beta_matrix_is_rebuilt_after_an_in_place_edit() -> None:
+    beta_map = pd.DataFrame({"driver_id": ["A", "B"], "benchmark_id": ["MKT", "MKT"], "beta": [1.0, 2.0]})
+    shocks = pd.DataFrame({"benchmark_id": ["MKT"], "shock": [-0.1]})
+    matrix = build_beta_matrix(beta_map)
+    assert matrix.is_built_from(beta_map.copy(), 1.0)
+
+    beta_map.loc[1, "beta"] = 3.0
+    assert not matrix.is_built_from(beta_map, 1.0, verify=True)
+    assert np.allclose(beta_propagation(shocks, beta_map, matrix=matrix, verify=True)["shock"], [-0.1, -0.3])
+
+
+def test_cached_beta_matrix_skips_hashing_its_source_map() -> None:
+    drivers = np.repeat([f"D{i:06d}" for i in range(100_000)], 3)
+    beta_map = pd.DataFrame({"driver_id": drivers, "benchmark_id": np.tile(["MKT", "SECTOR", "STYLE"], 100_000), "beta": 0.5})
+    shocks = pd.DataFrame({"benchmark_id": ["MKT"], "shock": [-0.1]})
+
+    def best_of(runs: int, fn) -> float:
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    build = best_of(3, lambda: build_beta_matrix(beta_map))
+    matrix = build_beta_matrix(beta_map)
+    cached = best_of(3, lambda: beta_propagation(shocks, beta_map, matrix=matrix))
+    assert cached < build / 4
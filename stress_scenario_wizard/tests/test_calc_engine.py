@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
-from stress_wizard.calc.engine import CalculationConfig, compute_pnl
+from stress_wizard.app_state import AppState, calculation_stages
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.driver_pnl import build_driver_sensitivity_matrix
+from stress_wizard.calc.engine import CalculationConfig, compute_pnl, compute_pnl_batch
+from stress_wizard.data.demo_data import (
+    generate_driver_sensitivities,
+    generate_positions,
+    generate_risk_driver_taxonomy,
+    generate_sensitivities,
+)
+from stress_wizard.models import DataBundle
+from stress_wizard.scenario.bottom_up import apply_bulk_shock
 
 
 def test_compute_pnl_outputs_required_columns() -> None:
@@ -76,3 +88,199 @@ def test_driver_shock_override_replaces_ds() -> None:
     out = compute_pnl(positions, sensitivities, shocks, driver_shocks=driver_shocks)
     # Delta * dS = 1000 * -0.25
     assert round(float(out.iloc[0]["pnl_delta"]), 2) == -250.0
+
+
+def test_driver_matrix_prices_each_driver_and_falls_back_to_asset_class_move() -> None:
+    positions = generate_positions(150)
+    sensitivities = generate_sensitivities(positions)
+    drivers = generate_risk_driver_taxonomy(500)
+    long = generate_driver_sensitivities(positions.iloc[:120], drivers, drivers_per_position=3)
+    book = build_priced_book(positions, sensitivities)
+    matrix = build_driver_sensitivity_matrix(long, book)
+    shocks = {"Equities": {"index_pct": -0.1}, "FX": {"spot_pct": 0.05}, "Commodities": {"oil_pct": -0.2}}
+    driver_shocks = pd.DataFrame({"driver_id": long["driver_id"].drop_duplicates().head(60), "shock": -0.2})
+
+    out = compute_pnl(None, None, shocks, driver_shocks=driver_shocks, book=book, driver_matrix=matrix)
+    base = compute_pnl(None, None, shocks, book=book)
+
+    # Dense reference: shocked drivers move by their shock, the rest by the position's asset-class dS.
+    dense = pd.DataFrame(matrix.delta.toarray(), columns=matrix.driver_ids)
+    move = np.tile(base["dS"].to_numpy()[:, None], (1, dense.shape[1]))
+    shocked = dense.columns.isin(driver_shocks["driver_id"])
+    move[:, shocked] = -0.2
+    expected = (dense.to_numpy() * move).sum(axis=1) * book.direction
+    loaded = np.arange(len(positions)) < 120
+    assert np.allclose(out["pnl_delta"].to_numpy()[loaded], expected[loaded])
+    assert np.allclose(out["pnl_delta"].to_numpy()[~loaded], base["pnl_delta"].to_numpy()[~loaded])
+
+    batch = compute_pnl_batch(book, [shocks], driver_shocks=driver_shocks, driver_matrix=matrix)
+    assert abs(float(batch.scenario_totals()[0]) - float(out["pnl_total"].sum())) < 1e-6
+
+
+def test_driver_id_override_still_applies_to_rows_outside_the_driver_matrix() -> None:
+    positions = generate_positions(200)
+    drivers = generate_risk_driver_taxonomy(800)
+    positions["driver_id"] = drivers["driver_id"].sample(len(positions), replace=True, random_state=3).to_numpy()
+    long = generate_driver_sensitivities(positions.iloc[:150], drivers, drivers_per_position=2)
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=drivers,
+        driver_sensitivities=long,
+    )
+    state = AppState(data_bundle=bundle)
+    scenario = state.ensure_scenario()
+    state.run_calculation()
+
+    unloaded = positions["driver_id"].iloc[150:].tolist()
+    scenario.shocks.risk_driver_shocks = apply_bulk_shock(scenario.shocks.risk_driver_shocks, unloaded, -0.4)
+    patched = state.run_calculation()
+    full = state.run_calculation(incremental=False)
+
+    tail = full.results.iloc[150:]
+    assert np.allclose(tail["shock"], -0.4) and np.allclose(tail["dS"], -0.4)
+    assert abs(patched.summary["pnl_total"] - full.summary["pnl_total"]) < 1e-6
+
+    book = build_priced_book(positions, bundle.sensitivities)
+    matrix = build_driver_sensitivity_matrix(long, book)
+    driver_shocks = scenario.shocks.risk_driver_shocks
+    single = compute_pnl(None, None, scenario.shocks.asset_class_shocks, driver_shocks=driver_shocks, book=book, driver_matrix=matrix)
+    batch = compute_pnl_batch(book, [scenario.shocks.asset_class_shocks], driver_shocks=driver_shocks, driver_matrix=matrix)
+    assert abs(float(batch.scenario_totals()[0]) - float(single["pnl_total"].sum())) < 1e-6
+
+
+def test_compute_pnl_batch_matches_single_scenario() -> None:
+    positions = generate_positions(300)
+    sensitivities = generate_sensitivities(positions)
+    scenarios = [
+        {"Equities": {"index_pct": -0.1, "vol_atm_pct": 0.3}, "Credit": {"ig_bp": 55.0}},
+        {"Rates": {"parallel_shift_bp": 120.0}, "FX": {"spot_pct": -0.04, "vol_pct": 0.2}},
+    ]
+    cfg = CalculationConfig(correlation_regime=0.6)
+
+    batch = compute_pnl_batch(build_priced_book(positions, sensitivities), scenarios, config=cfg)
+
+    assert batch.pnl_total.shape == (2, len(positions))
+    for i, shocks in enumerate(scenarios):
+        single = compute_pnl(positions, sensitivities, shocks, config=cfg)
+        assert abs(float(single["pnl_total"].sum()) - float(batch.scenario_totals()[i])) < 1e-6
+        assert abs(float(single["pnl_gamma"].sum()) - float(batch.components["pnl_gamma"][i].sum())) < 1e-6
+
+
+def test_app_state_reuses_priced_book_until_inputs_change() -> None:
+    positions = generate_positions(200)
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=pd.DataFrame(),
+    )
+    state = AppState(data_bundle=bundle)
+
+    book = state.priced_book()
+    assert state.priced_book() is book
+    assert book.codes["desk"].dtype == "int32"
+
+    state.data_bundle.sensitivities = generate_sensitivities(positions, seed=7)
+    assert state.priced_book() is not book
+
+
+def test_incremental_recalculation_matches_full_run() -> None:
+    positions = generate_positions(400)
+    drivers = generate_risk_driver_taxonomy(2_000)
+    positions["driver_id"] = drivers["driver_id"].sample(len(positions), replace=True, random_state=1).to_numpy()
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=drivers,
+    )
+    state = AppState(data_bundle=bundle)
+    scenario = state.ensure_scenario()
+    state.run_calculation()
+
+    edited = positions["driver_id"].head(25).tolist()
+    scenario.shocks.risk_driver_shocks = apply_bulk_shock(scenario.shocks.risk_driver_shocks, edited, -0.3)
+    patched = state.run_calculation()
+    full = state.run_calculation(incremental=False)
+
+    assert abs(patched.summary["pnl_total"] - full.summary["pnl_total"]) < 1e-6
+    assert np.allclose(patched.sensitivity["delta_vs_base"], full.sensitivity["delta_vs_base"], atol=1e-6)
+    desk_patched = patched.attribution["desk"].set_index("desk")["pnl"]
+    desk_full = full.attribution["desk"].set_index("desk")["pnl"]
+    assert (desk_patched - desk_full.loc[desk_patched.index]).abs().max() < 1e-6
+
+
+def test_incremental_recalculation_with_driver_matrix_matches_full_run() -> None:
+    positions = generate_positions(300)
+    drivers = generate_risk_driver_taxonomy(1_000)
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=drivers,
+        driver_sensitivities=generate_driver_sensitivities(positions, drivers),
+    )
+    state = AppState(data_bundle=bundle)
+    scenario = state.ensure_scenario()
+    state.run_calculation()
+
+    edited = bundle.driver_sensitivities["driver_id"].head(40).tolist()
+    scenario.shocks.risk_driver_shocks = apply_bulk_shock(scenario.shocks.risk_driver_shocks, edited, 0.15)
+    patched = state.run_calculation()
+    full = state.run_calculation(incremental=False)
+
+    assert abs(patched.summary["pnl_total"] - full.summary["pnl_total"]) < 1e-6
+    assert np.allclose(patched.sensitivity["pnl"], full.sensitivity["pnl"], atol=1e-6)
+
+
+def test_cancelled_calculation_leaves_outputs_untouched() -> None:
+    positions = generate_positions(200)
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=generate_risk_driver_taxonomy(500),
+    )
+    state = AppState(data_bundle=bundle)
+    previous = state.outputs
+
+    stages = []
+    for stage, outputs in state.iter_calculation(cancelled=lambda: len(stages) >= 1):
+        stages.append(stage)
+        assert not outputs.results.empty
+
+    assert stages == ["summary"]
+    assert state.outputs is previous
+
+    assert [stage for stage, _ in state.iter_calculation()] == ["summary", "attribution", "shift"]
+    assert not state.outputs.attribution["desk"].empty
+
+
+def test_background_run_prices_its_snapshot_and_applies_back() -> None:
+    positions = generate_positions(200)
+    bundle = DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=pd.DataFrame(),
+        risk_drivers=generate_risk_driver_taxonomy(500),
+    )
+    state = AppState(data_bundle=bundle)
+    scenario = state.ensure_scenario()
+    expected = state.run_calculation(incremental=False).summary["pnl_total"]
+    state = AppState(data_bundle=bundle, scenario=scenario)
+    inputs = state.calculation_inputs(incremental=False)
+
+    # Edits made while the run is in flight must not leak into it.
+    scenario.shocks.asset_class_shocks["Equities"]["index_pct"] = -0.9
+    scenario.shocks.risk_driver_shocks["shock"] = 0.5
+    stages = list(calculation_stages(inputs))
+
+    assert [stage for stage, _ in stages] == ["summary", "attribution", "shift"]
+    assert abs(stages[-1][1].summary["pnl_total"] - expected) < 1e-6
+    assert state.outputs.results.empty and state.priced_book() is not inputs.priced_book
+
+    state.apply_calculation(inputs, stages[-1][1])
+    assert state.outputs is stages[-1][1]
+    assert state.priced_book() is inputs.priced_book
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from stress_wizard.app_state import DEMO_BUNDLE_NAME, AppState, empty_bundle, load_startup_bundle
+from stress_wizard.data.columnar_store import StoredBundle, list_stored_bundles, open_bundle, save_bundle, table_path
+from stress_wizard.data.demo_data import generate_market_data, generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+from stress_wizard.models import DataBundle
+
+
+def _bundle() -> DataBundle:
+    positions = generate_positions(500)
+    drivers = generate_risk_driver_taxonomy(1_000)
+    return DataBundle(
+        positions=positions,
+        sensitivities=generate_sensitivities(positions),
+        market_data=generate_market_data(drivers),
+        risk_drivers=drivers,
+    )
+
+
+def test_saved_bundle_round_trips_under_root_folders(tmp_path) -> None:
+    bundle = _bundle()
+    save_bundle(bundle, tmp_path, "demo")
+
+    assert table_path(tmp_path, "demo", "positions").parent == tmp_path / "portfolios" / "demo"
+    assert table_path(tmp_path, "demo", "risk_drivers").parent == tmp_path / "market_data_cache" / "demo"
+    assert list_stored_bundles(tmp_path) == ["demo"]
+
+    loaded = open_bundle(tmp_path, "demo")
+    for table in ["positions", "sensitivities", "market_data", "risk_drivers"]:
+        pd.testing.assert_frame_equal(getattr(loaded, table), getattr(bundle, table))
+
+
+def test_stored_bundle_with_a_null_text_cell_prices(tmp_path) -> None:
+    bundle = _bundle()
+    bundle.positions.loc[0, "geography"] = None
+    save_bundle(bundle, tmp_path, "demo")
+
+    outputs = AppState(data_bundle=open_bundle(tmp_path, "demo")).run_calculation()
+    assert outputs.summary["position_count"] == 500
+    assert outputs.results["geography"].isna().sum() == 1
+
+
+def test_stored_bundle_reads_selected_columns(tmp_path) -> None:
+    save_bundle(_bundle(), tmp_path, "demo")
+    stored = StoredBundle(tmp_path, "demo")
+
+    assert stored.row_count("risk_drivers") == 1_000
+    subset = stored.to_bundle({"risk_drivers": ["driver_id", "asset_class"]})
+    assert list(subset.risk_drivers.columns) == ["driver_id", "asset_class"]
+    assert stored.column("positions", "notional").dtype == "float64"
+
+
+def test_stored_tables_are_converted_on_first_access(tmp_path, monkeypatch) -> None:
+    save_bundle(_bundle(), tmp_path, "demo")
+    converted: list[str] = []
+    frame = StoredBundle.frame
+    monkeypatch.setattr(StoredBundle, "frame", lambda self, table, columns=None: converted.append(table) or frame(self, table, columns))
+
+    bundle = open_bundle(tmp_path, "demo")
+    assert converted == []
+    assert len(bundle.positions) == 500 and bundle.positions is bundle.positions
+    assert bundle.driver_sensitivities.empty  # not stored: the DataBundle default
+    assert converted == ["positions"]
+
+
+def test_app_state_loads_stored_bundle(tmp_path) -> None:
+    state = AppState(data_bundle=_bundle())
+    state.save_data_bundle(tmp_path, "desk_book")
+
+    other = AppState(data_bundle=_bundle())
+    other.load_stored_bundle(tmp_path, "desk_book")
+    outputs = other.run_calculation()
+    assert outputs.summary["position_count"] == 500
+
+
+def test_startup_restores_the_last_bundle_and_stores_the_demo_once(tmp_path) -> None:
+    name, generated, index = load_startup_bundle(tmp_path, "missing")
+    assert name == DEMO_BUNDLE_NAME and index is not None
+    assert list_stored_bundles(tmp_path) == [DEMO_BUNDLE_NAME]
+
+    name, restored, index = load_startup_bundle(tmp_path)
+    assert name == DEMO_BUNDLE_NAME and index is not None
+    pd.testing.assert_frame_equal(restored.positions, generated.positions, check_dtype=False)
+
+    AppState(data_bundle=_bundle()).save_data_bundle(tmp_path, "desk_book")
+    name, bundle, index = load_startup_bundle(tmp_path, "desk_book")
+    state = AppState(data_bundle=empty_bundle())
+    state.use_bundle(bundle, index)
+    assert name == "desk_book" and state.driver_search_index() is index
+    assert state.run_calculation().summary["position_count"] == 500
+
+
+def test_new_state_refuses_to_run_before_data_is_loaded() -> None:
+    state = AppState()
+    with pytest.raises(ValueError, match="no portfolio data loaded"):
+        state.run_calculation()
+    assert state.outputs.results.empty
+
+
+def test_new_state_starts_empty_and_loading_a_bundle_keeps_edited_shocks(tmp_path) -> None:
+    state = AppState()
+    assert state.data_bundle.positions.empty
+    scenario = state.ensure_scenario()
+    assert scenario.shocks.risk_driver_shocks.empty
+
+    state.use_bundle(_bundle())
+    seeded = scenario.shocks.risk_driver_shocks
+    assert not seeded.empty
+
+    edited = seeded.assign(shock=0.01)
+    scenario.shocks.risk_driver_shocks = edited
+    AppState(data_bundle=_bundle()).save_data_bundle(tmp_path, "desk_book")
+    state.load_stored_bundle(tmp_path, "desk_book")
+    assert scenario.shocks.risk_driver_shocks is edited
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.correlation import (
+    DEFAULT_ASSET_CLASSES,
+    MOVE_FACTORS,
+    CorrelationModel,
+    default_correlation_model,
+    is_positive_definite,
+    nearest_correlation,
+)
+from stress_wizard.calc.engine import CalculationConfig, compute_pnl, grouped_pnl_polynomials, shock_matrix
+from stress_wizard.data.demo_data import generate_positions, generate_sensitivities
+
+
+SHOCKS = {"Equities": {"index_pct": -0.2, "vol_atm_pct": 0.4}, "FX": {"usd_pct": 0.05, "vol_pct": 0.3}, "Rates": {"parallel_shift_bp": 100.0}}
+
+
+def test_default_model_reproduces_the_scalar_cross_gamma_scaling() -> None:
+    model = default_correlation_model()
+    for regime in (0.0, 0.35, 0.8, 1.0):
+        corr = model.spot_vol_correlation(["Equities", "Credit", "Unknown"], regime)
+        assert np.allclose(corr, 0.15 + 0.85 * regime)
+        assert np.allclose(model.driver_systematic_share(["Equities", "Unknown"], regime), min(0.15 + 0.85 * regime, 0.999))
+
+
+def test_non_positive_definite_blend_is_repaired_and_cached() -> None:
+    n = len(MOVE_FACTORS)
+    broken = np.eye(2 * n)
+    broken[0, 1] = broken[1, 0] = broken[0, 2] = broken[2, 0] = 0.9
+    broken[1, 2] = broken[2, 1] = -0.9
+    assert not is_positive_definite(broken)
+
+    repaired = nearest_correlation(broken)
+    assert is_positive_definite(repaired)
+    assert np.allclose(np.diag(repaired), 1.0)
+
+    model = CorrelationModel(asset_classes=["A", "B"], normal=np.eye(2 * n), stressed=broken)
+    entry = model.at(1.0)
+    assert entry.repaired and not model.at(0.0).repaired
+    assert model.at(1.0) is entry
+    assert np.allclose(entry.cholesky @ entry.cholesky.T, entry.matrix)
+    # Unknown asset classes become independent factors next to the known ones.
+    chol = model.factor_cholesky(["B", "Z"], 0.5)
+    cov = chol @ chol.T
+    assert np.allclose(cov[n:, n:], np.eye(n)) and np.allclose(cov[:n, n:], 0.0)
+
+
+def test_custom_model_drives_cross_gamma_consistently_across_pricing_paths() -> None:
+    positions = generate_positions(400)
+    book = build_priced_book(positions, generate_sensitivities(positions))
+    n = len(DEFAULT_ASSET_CLASSES) * len(MOVE_FACTORS)
+    normal = np.eye(n)
+    eq = DEFAULT_ASSET_CLASSES.index("Equities") * len(MOVE_FACTORS)
+    normal[eq, eq + 1] = normal[eq + 1, eq] = -0.6
+    config = CalculationConfig(correlation_regime=0.0, correlation=CorrelationModel(list(DEFAULT_ASSET_CLASSES), normal, normal.copy()))
+
+    default = compute_pnl(None, None, SHOCKS, config=CalculationConfig(correlation_regime=0.0), book=book)
+    custom = compute_pnl(None, None, SHOCKS, config=config, book=book)
+
+    equities = (custom["asset_class"] == "Equities").to_numpy()
+    ratio = custom["pnl_cross_gamma"].to_numpy()[equities] / default["pnl_cross_gamma"].to_numpy()[equities]
+    assert np.allclose(ratio[np.isfinite(ratio)], -0.6 / 0.15)
+    assert np.allclose(custom["pnl_cross_gamma"].to_numpy()[~equities], 0.0)
+
+    polys = grouped_pnl_polynomials(book, "desk", config)
+    moves = shock_matrix([SHOCKS], book.asset_classes)
+    by_desk = custom.groupby("desk")["pnl_total"].sum()
+    for desk, poly in polys.items():
+        assert abs(float(poly.evaluate(moves)[0]) - by_desk[desk]) < 1e-6
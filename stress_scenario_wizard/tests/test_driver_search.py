@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from stress_wizard.app_state import AppState
+from stress_wizard.data.demo_data import generate_market_data, generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+from stress_wizard.models import DataBundle
+from stress_wizard.scenario.bottom_up import search_risk_drivers
+from stress_wizard.scenario.driver_search import build_driver_search_index, load_driver_search_index, parse_query, save_driver_search_index
+
+
+def test_indexed_search_matches_column_scan() -> None:
+    drivers = generate_risk_driver_taxonomy(3_000)
+    drivers["desk"] = drivers["asset_class"] + "_Desk"
+    index = build_driver_search_index(drivers)
+
+    for query in ["EMEA", "10y", "Rates_Tech", "DRV-00001", "s_desk", "fx", "q", "zzz", ""]:
+        expected = search_risk_drivers(drivers, query, limit=400)
+        got = search_risk_drivers(drivers, query, limit=400, index=index)
+        assert got.index.equals(expected.index), query
+
+
+def test_non_ascii_names_and_regex_queries() -> None:
+    drivers = generate_risk_driver_taxonomy(3_000)
+    drivers.loc[7, "name"] = "EQ_Zürich_SMI"
+    drivers.loc[8, "driver_id"] = "DRV-Ωmega"
+    index = build_driver_search_index(drivers)
+
+    assert search_risk_drivers(drivers, "zürich", index=index)["name"].tolist() == ["EQ_Zürich_SMI"]
+    assert search_risk_drivers(drivers, "ωmega", index=index)["driver_id"].tolist() == ["DRV-Ωmega"]
+    for query in ["equit.*emea", "^drv-0000[12]", "(?:apac|emea).*5y"]:
+        expected = search_risk_drivers(drivers, query, limit=400)
+        assert search_risk_drivers(drivers, query, limit=400, index=index).index.equals(expected.index), query
+    assert not search_risk_drivers(drivers, "equit.*emea", index=index).empty
+
+
+def test_saved_index_is_not_reused_for_an_edited_taxonomy(tmp_path) -> None:
+    drivers = generate_risk_driver_taxonomy(2_000)
+    save_driver_search_index(build_driver_search_index(drivers), tmp_path)
+    assert load_driver_search_index(tmp_path, drivers.copy()) is not None
+
+    edited = drivers.copy()
+    edited.loc[5, "name"] = "Renamed_Driver"
+    assert load_driver_search_index(tmp_path, edited) is None
+
+
+def test_fielded_query_and_ranking() -> None:
+    drivers = generate_risk_driver_taxonomy(3_000)
+    index = build_driver_search_index(drivers)
+
+    assert parse_query("geo:EMEA  Tech") == [("geography", "emea"), (None, "tech")]
+
+    hits = index.search(drivers, "geo:EMEA tenor:10Y credit")
+    assert not hits.empty
+    assert (hits["geography"] == "EMEA").all() and (hits["tenor"] == "10Y").all()
+    assert hits["name"].str.lower().str.contains("credit").all()
+
+    # An exact driver id outranks ids that merely contain it.
+    target = drivers["driver_id"].iloc[10]
+    assert index.search(drivers, target[:-1])["driver_id"].iloc[0] != target
+    assert index.search(drivers, target)["driver_id"].iloc[0] == target
+
+
+def test_search_index_persists_with_stored_bundle(tmp_path) -> None:
+    positions = generate_positions(100)
+    drivers = generate_risk_driver_taxonomy(2_000)
+    state = AppState(
+        data_bundle=DataBundle(
+            positions=positions,
+            sensitivities=generate_sensitivities(positions),
+            market_data=generate_market_data(drivers),
+            risk_drivers=drivers,
+        )
+    )
+    expected = state.driver_search_index().search(drivers, "apac 5y")
+    state.save_data_bundle(tmp_path, "demo")
+
+    reopened = AppState(data_bundle=state.data_bundle)
+    reopened.load_stored_bundle(tmp_path, "demo")
+    index = reopened.driver_search_index()
+    assert (tmp_path / "market_data_cache" / "demo" / "driver_search" / "manifest.json").exists()
+    assert index.search(reopened.data_bundle.risk_drivers, "apac 5y")["driver_id"].tolist() == expected["driver_id"].tolist()
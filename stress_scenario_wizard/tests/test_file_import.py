@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stress_wizard.app_state import AppState
+from stress_wizard.data.columnar_store import open_table
+from stress_wizard.data.demo_data import generate_positions, generate_sensitivities
+from stress_wizard.ingestion.file_import import DISTINCT_SKETCH_SIZE, FileImporter, StreamingColumnStats
+from stress_wizard.models import DataBundle
+
+
+def test_stream_import_maps_coerces_and_stores_chunks(tmp_path) -> None:
+    positions = generate_positions(5_000).rename(columns={"notional": "nominal", "currency": "ccy"})
+    positions.loc[[3, 4_500], "nominal"] = np.nan
+    source = tmp_path / "positions.csv"
+    positions.to_csv(source, index=False)
+
+    progress: list[tuple[int, float]] = []
+    result = FileImporter().stream_import(
+        source,
+        tmp_path / "root",
+        "extract",
+        "positions",
+        mapping={"nominal": "notional", "ccy": "currency"},
+        chunk_rows=1_000,
+        progress=lambda rows, fraction: progress.append((rows, fraction)),
+    )
+
+    assert result.rows == 5_000
+    assert [rows for rows, _ in progress] == [1_000, 2_000, 3_000, 4_000, 5_000]
+    assert progress[-1][1] == 1.0
+
+    stored = open_table(tmp_path / "root", "extract", "positions")
+    assert stored["notional"].dtype == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(stored["maturity"])
+    assert stored["notional"].isna().sum() == 2
+
+    stats = result.stats.set_index("column")
+    assert stats.loc["notional", "null_count"] == 2
+    assert stats.loc["desk", "unique_count"] == positions["desk"].nunique()
+
+
+def test_streamed_positions_with_a_blank_text_cell_price(tmp_path) -> None:
+    positions = generate_positions(2_000)
+    sensitivities = generate_sensitivities(positions)
+    positions.loc[7, "geography"] = None
+    source = tmp_path / "positions.csv"
+    positions.to_csv(source, index=False)
+
+    FileImporter().stream_import(source, tmp_path / "root", "extract", "positions", chunk_rows=500)
+    stored = open_table(tmp_path / "root", "extract", "positions")
+    bundle = DataBundle(positions=stored, sensitivities=sensitivities, market_data=pd.DataFrame(), risk_drivers=pd.DataFrame())
+
+    outputs = AppState(data_bundle=bundle).run_calculation()
+    assert outputs.summary["position_count"] == 2_000
+    assert outputs.results["geography"].isna().sum() == 1
+
+
+def test_streaming_stats_estimate_large_distinct_counts() -> None:
+    stats = StreamingColumnStats()
+    values = pd.Series([f"ID-{i}" for i in range(60_000)])
+    for start in range(0, len(values), 7_000):
+        stats.update(values.iloc[start : start + 7_000].to_frame("id"))
+
+    row = stats.to_frame().iloc[0]
+    assert row["null_count"] == 0
+    assert abs(row["unique_count"] - 60_000) / 60_000 < 0.05
+    assert len(row["sample_values"].split(", ")) == 3
+    assert DISTINCT_SKETCH_SIZE < 60_000
+
+
+WRITERS = {
+    ".csv": lambda frame, path: frame.to_csv(path, index=False),
+    ".json": lambda frame, path: frame.to_json(path, orient="records", date_format="iso"),
+    ".jsonl": lambda frame, path: frame.to_json(path, orient="records", lines=True, date_format="iso"),
+    ".xlsx": lambda frame, path: frame.to_excel(path, index=False),
+}
+
+
+@pytest.mark.parametrize("suffix", list(WRITERS))
+def test_stream_import_keeps_text_columns_whose_first_chunk_looks_numeric(tmp_path, suffix) -> None:
+    positions = generate_positions(3_000)
+    positions["book"] = [f"{i:04d}" if i < 1_500 else f"BK-{i}" for i in range(len(positions))]
+    positions["desk"] = [f"{i % 50:03d}" for i in range(len(positions))]  # never stops looking numeric
+    positions["comment"] = [None if i < 2_000 else "late fill" for i in range(len(positions))]
+    source = tmp_path / f"positions{suffix}"
+    WRITERS[suffix](positions, source)
+    if suffix == ".jsonl":
+        source = source.rename(source.with_suffix(".json"))
+
+    result = FileImporter().stream_import(source, tmp_path / "root", "extract", "positions", chunk_rows=1_000)
+
+    stored = open_table(tmp_path / "root", "extract", "positions")
+    assert result.rows == 3_000
+    assert stored["book"].tolist() == positions["book"].tolist()  # leading zeros survive
+    assert stored["desk"].tolist() == positions["desk"].tolist()
+    assert stored["comment"].isna().sum() == 2_000 and stored["comment"].iloc[-1] == "late fill"
+    assert stored["notional"].dtype == "float64" and stored["direction"].dtype == "float64"
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import pstats
+
+import numpy as np
+
+from stress_wizard.app_state import AppState
+from stress_wizard.data.demo_data import generate_demo_bundle
+from stress_wizard.instrumentation import TRACER, Tracer, summarize
+
+
+def test_spans_nest_and_the_ring_buffer_keeps_the_newest() -> None:
+    tracer = Tracer(capacity=3, track_allocations=True)
+    with tracer.span("outer", rows=10):
+        with tracer.span("inner") as attrs:
+            attrs["cells"] = 4
+            block = np.ones(2**20)  # 8 MiB
+        del block
+    tracer.track_allocations = False
+
+    inner, outer = tracer.spans()
+    assert (inner.parent, inner.depth, inner.attrs) == ("outer", 1, {"cells": 4})
+    assert (outer.parent, outer.depth, outer.attrs) == (None, 0, {"rows": 10})
+    assert outer.duration_ns >= inner.duration_ns
+    assert inner.alloc_peak_mb >= 7.9 and outer.alloc_peak_mb >= inner.alloc_peak_mb
+    assert tracer.children(outer) == [inner]
+
+    for i in range(5):
+        with tracer.span(f"step.{i}"):
+            pass
+    assert [s.name for s in tracer.spans()] == ["step.2", "step.3", "step.4"]
+
+    trace = tracer.to_chrome_trace()
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in complete] == ["step.2", "step.3", "step.4"]
+    assert all(e["dur"] >= 0 and e["cat"] == "step" for e in complete)
+    json.dumps(trace)
+
+
+def test_calculation_run_is_timed_by_stage_and_can_be_profiled(tmp_path) -> None:
+    state = AppState(data_bundle=generate_demo_bundle(), profile_dir=tmp_path)
+    outputs = state.run_calculation(profile="cprofile")
+
+    assert outputs.profile_path is not None and outputs.profile_path.parent == tmp_path
+    stats = pstats.Stats(str(outputs.profile_path))
+    assert any(func[2] == "compute_pnl" for func in stats.stats)
+
+    run = TRACER.last("calculation.run")
+    stages = [s.name for s in TRACER.children(run)]
+    assert stages == ["calculation.price", "calculation.attribution", "calculation.shift"]
+    names = {s.name for s in TRACER.spans(since_ns=run.start_ns)}
+    assert {"calc.greek_pnl", "attribution.desk", "attribution.position", "shift.sensitivity_table", "shift.marginal"} <= names
+    assert summarize(run).startswith("calculation.run")
+
+    path = TRACER.dump(tmp_path / "trace.json", "json")
+    assert any(s["name"] == "calculation.run" for s in json.loads(path.read_text())["spans"])
+
+
+def test_final_stage_follows_the_recorded_run_span(tmp_path) -> None:
+    state = AppState(data_bundle=generate_demo_bundle(), profile_dir=tmp_path)
+    seen = []
+    for _ in range(2):
+        for stage, outputs in state.iter_calculation(profile="cprofile"):
+            if stage == "shift":
+                # What a UI slot reading the tracer on the last stage would see.
+                seen.append((TRACER.last("calculation.run"), outputs.profile_path.exists()))
+
+    first, second = seen
+    assert first[0] is not None and first[0] is not second[0]
+    assert second[0].start_ns >= first[0].start_ns + first[0].duration_ns
+    assert second[0].attrs["stage"] == "shift" and first[1] and second[1]
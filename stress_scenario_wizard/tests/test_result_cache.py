@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import gc
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from stress_wizard.app_state import AppState
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.correlation import default_correlation_model
+from stress_wizard.calc.engine import CalculationConfig
+from stress_wizard.calc.result_cache import ResultCache
+from stress_wizard.data.demo_data import generate_demo_bundle, generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+from stress_wizard.models import DataBundle
+
+
+SHOCKS = {"Equities": {"index_pct": -0.2}, "Rates": {"parallel_shift_bp": 50.0}}
+
+
+def test_key_changes_with_every_pricing_input(tmp_path) -> None:
+    cache = ResultCache(tmp_path)
+    positions = generate_positions(200)
+    book = build_priced_book(positions, generate_sensitivities(positions))
+    drivers = pd.DataFrame({"driver_id": ["D1", "D2"], "shock": [-0.1, 0.05], "justification": ["a", "b"]})
+    base = cache.key_for(book, SHOCKS, drivers, CalculationConfig())
+
+    assert cache.key_for(build_priced_book(positions.copy(), book.sensitivities), SHOCKS, drivers, CalculationConfig()) == base
+    assert cache.key_for(book, SHOCKS, drivers.assign(justification=["edited", "b"]), CalculationConfig()) == base
+
+    moved = positions.copy()
+    moved.loc[7, "notional"] += 1.0
+    stressed = default_correlation_model()
+    stressed.stressed[0, 1] = stressed.stressed[1, 0] = 0.5
+    changed = [
+        cache.key_for(build_priced_book(moved, book.sensitivities), SHOCKS, drivers, CalculationConfig()),
+        cache.key_for(book, {**SHOCKS, "Rates": {"parallel_shift_bp": 51.0}}, drivers, CalculationConfig()),
+        cache.key_for(book, SHOCKS, drivers.assign(shock=[-0.1, 0.06]), CalculationConfig()),
+        cache.key_for(book, SHOCKS, None, CalculationConfig()),
+        cache.key_for(book, SHOCKS, drivers, CalculationConfig(liquidity_bps=13.0)),
+        cache.key_for(book, SHOCKS, drivers, CalculationConfig(correlation=stressed)),
+    ]
+    assert len({base, *changed}) == len(changed) + 1
+
+
+def test_in_place_edits_change_the_key_and_the_memo_holds_frames_weakly(tmp_path) -> None:
+    cache = ResultCache(tmp_path)
+    positions = generate_positions(200)
+    book = build_priced_book(positions, generate_sensitivities(positions))
+    before = cache.key_for(book, SHOCKS, None, CalculationConfig())
+    assert cache.key_for(book, SHOCKS, None, CalculationConfig()) == before
+
+    positions.loc[7, "notional"] += 1.0
+    assert cache.key_for(book, SHOCKS, None, CalculationConfig()) != before
+
+    source = weakref.ref(positions)
+    del book, positions
+    gc.collect()
+    assert source() is None
+
+
+def test_entries_round_trip_and_evict_least_recently_used(tmp_path) -> None:
+    frame = pd.DataFrame({"instrument_id": [f"I{i}" for i in range(1_000)], "pnl_total": np.linspace(-1.0, 1.0, 1_000)})
+    cache = ResultCache(tmp_path, max_entries=2)
+    cache.put("a", {"results": frame}, {"pnl_total": 0.0, "position_count": np.int64(1_000)})
+    hit = cache.get("a")
+    pdt.assert_frame_equal(hit.tables["results"], frame)
+    assert hit.summary == {"pnl_total": 0.0, "position_count": 1_000}
+    assert cache.get("a", ["sensitivity"]) is None and cache.get("missing") is None
+
+    cache.put("b", {"results": frame})
+    os.utime(tmp_path / "result_cache" / "a" / "meta.json", (1, 1))  # "a" becomes least recently used
+    cache.put("c", {"results": frame})
+    assert sorted(e.key for e in cache.entries()) == ["b", "c"]
+
+    cache.max_bytes = cache.entries()[-1].bytes
+    cache.evict()
+    assert [e.key for e in cache.entries()] == ["c"]
+
+
+def test_app_state_serves_repeat_runs_from_the_cache(tmp_path) -> None:
+    state = AppState(data_bundle=generate_demo_bundle(), result_cache=ResultCache(tmp_path))
+    first = state.run_calculation()
+    assert not first.cached and first.cache_key is not None
+
+    fresh = AppState(data_bundle=state.data_bundle, scenario=state.scenario, result_cache=ResultCache(tmp_path))
+    stages = [stage for stage, _ in fresh.iter_calculation()]
+    again = fresh.outputs
+    assert stages == ["summary", "attribution", "shift"]
+    assert again.cached and again.cache_key == first.cache_key
+    assert again.summary == first.summary
+    pdt.assert_frame_equal(again.results, first.results)
+    pdt.assert_frame_equal(again.attribution["desk"], first.attribution["desk"].reset_index(drop=True))
+    pdt.assert_frame_equal(again.tornado, first.tornado.reset_index(drop=True))
+
+    # A changed driver shock misses and is priced in full.
+    shocks = state.scenario.shocks
+    shocks.risk_driver_shocks = shocks.risk_driver_shocks.assign(shock=shocks.risk_driver_shocks["shock"] * 2.0)
+    changed = fresh.run_calculation()
+    assert not changed.cached and changed.cache_key != first.cache_key
+    assert abs(changed.summary["pnl_total"] - AppState(data_bundle=state.data_bundle, scenario=state.scenario).run_calculation().summary["pnl_total"]) < 1e-6
+
+
+def test_unhashable_book_is_priced_without_the_cache(tmp_path) -> None:
+    positions = generate_positions(200)
+    positions["source_ref"] = pd.Series([1 if i % 2 else "x" for i in range(len(positions))], dtype=object)
+    bundle = DataBundle(positions=positions, sensitivities=generate_sensitivities(positions), market_data=pd.DataFrame(), risk_drivers=generate_risk_driver_taxonomy(300))
+
+    outputs = AppState(data_bundle=bundle, result_cache=ResultCache(tmp_path)).run_calculation()
+
+    assert not outputs.cached and outputs.cache_key is None
+    assert abs(outputs.summary["pnl_total"] - AppState(data_bundle=bundle).run_calculation().summary["pnl_total"]) < 1e-6
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.app_state import AppState
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.engine import CalculationConfig, compute_pnl, compute_pnl_batch
+from stress_wizard.calc.revaluation import grid_from_ladders, interpolate_grid, load_grid, precompute_grid, save_grid
+from stress_wizard.data.demo_data import generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+from stress_wizard.models import DataBundle
+
+
+DS_AXIS = np.linspace(-0.5, 0.5, 21)
+DVOL_AXIS = np.linspace(-0.2, 0.6, 9)
+
+
+def _taylor_pricer(sensitivities: pd.DataFrame):
+    delta = sensitivities["delta"].to_numpy()[:, None, None]
+    gamma = sensitivities["gamma"].to_numpy()[:, None, None]
+    vega = sensitivities["vega"].fillna(0.0).to_numpy()[:, None, None]
+
+    def pricer(_instruments: pd.DataFrame, ds: np.ndarray, dvol: np.ndarray) -> np.ndarray:
+        return delta * ds + 0.5 * gamma * ds**2 + vega * dvol
+
+    return pricer
+
+
+def test_interpolation_is_exact_on_nodes_and_cubic_tracks_curvature() -> None:
+    instruments = pd.DataFrame({"instrument_id": ["A", "B"]})
+    grid = precompute_grid(instruments, lambda _i, ds, dvol: np.array([1.0, -2.0])[:, None, None] * (ds**2 + ds * dvol), DS_AXIS, DVOL_AXIS)
+    rows = np.array([0, 1])
+
+    on_node = interpolate_grid(grid, rows, DS_AXIS[[3, 15]], DVOL_AXIS[[2, 6]])
+    assert np.allclose(on_node, [1.0, -2.0] * (DS_AXIS[[3, 15]] ** 2 + DS_AXIS[[3, 15]] * DVOL_AXIS[[2, 6]]))
+
+    ds, dvol = np.array([0.137, -0.213]), np.array([0.11, 0.33])
+    exact = np.array([1.0, -2.0]) * (ds**2 + ds * dvol)
+    cubic = interpolate_grid(grid, rows, ds, dvol, "cubic")
+    linear = interpolate_grid(grid, rows, ds, dvol, "bilinear")
+    assert np.allclose(cubic, exact, atol=1e-12)
+    assert np.abs(linear - exact).max() > np.abs(cubic - exact).max()
+
+
+def test_cubic_uses_the_spacing_of_uneven_ladders() -> None:
+    ds_axis = np.array([-0.2, -0.05, -0.01, 0.0, 0.01, 0.05, 0.2])
+    dvol_axis = np.array([-0.1, 0.0, 0.05, 0.3])
+    instruments = pd.DataFrame({"instrument_id": ["A"]})
+    grid = precompute_grid(instruments, lambda _i, ds, dvol: 3.0 * ds**2 - ds * dvol + 0.5 * dvol, ds_axis, dvol_axis)
+
+    ds, dvol = np.array([-0.03, 0.004, 0.03]), np.array([0.02, 0.01, 0.04])  # interior cells: no edge ghosts
+    exact = 3.0 * ds**2 - ds * dvol + 0.5 * dvol
+    assert np.allclose(interpolate_grid(grid, np.zeros(3, dtype=np.intp), ds, dvol, "cubic"), exact, atol=1e-12)
+
+
+def test_grid_from_ladders_round_trips_through_disk_cache(tmp_path) -> None:
+    mesh = pd.MultiIndex.from_product([["X", "Y"], DS_AXIS, DVOL_AXIS], names=["instrument_id", "dS", "dVol"]).to_frame(index=False)
+    mesh["pnl"] = np.where(mesh["instrument_id"] == "X", 1.0, 3.0) * mesh["dS"] - mesh["dVol"]
+    grid = grid_from_ladders(mesh.sample(frac=1.0, random_state=3))
+
+    assert grid.values.shape == (2, len(DS_AXIS), len(DVOL_AXIS))
+    save_grid(grid, tmp_path, date(2026, 3, 31))
+    loaded = load_grid(tmp_path, date(2026, 3, 31))
+    assert loaded is not None
+    assert list(loaded.instrument_ids) == list(grid.instrument_ids)
+    assert np.array_equal(loaded.values, grid.values)
+    assert load_grid(tmp_path, date(2026, 4, 1)) is None
+
+
+def test_grid_priced_from_taylor_ladders_matches_taylor_engine() -> None:
+    positions = generate_positions(250)
+    positions["direction"] = 1
+    sensitivities = generate_sensitivities(positions)
+    book = build_priced_book(positions, sensitivities)
+    grid = precompute_grid(positions[["instrument_id"]], _taylor_pricer(sensitivities), DS_AXIS, DVOL_AXIS).align(book)
+    shocks = {"Equities": {"index_pct": -0.1, "vol_atm_pct": 0.3}, "FX": {"spot_pct": 0.05, "vol_pct": 0.1}}
+    cfg = CalculationConfig(correlation_regime=0.0, revaluation_method="cubic")
+
+    taylor = compute_pnl(None, None, shocks, config=cfg, book=book)
+    revalued = compute_pnl(None, None, shocks, config=cfg, book=book, revaluation=grid)
+
+    # The ladder is the Taylor expansion without cross-gamma, so only that term differs.
+    expected = taylor["pnl_total"] - taylor["pnl_cross_gamma"]
+    assert np.allclose(revalued["pnl_total"], expected, atol=1e-8)
+    assert np.allclose(revalued["pnl_gamma"], taylor["pnl_gamma"], atol=1e-8)
+
+    batch = compute_pnl_batch(book, [shocks], config=cfg, revaluation=grid)
+    assert abs(float(batch.scenario_totals()[0]) - float(revalued["pnl_total"].sum())) < 1e-6
+
+
+def test_app_state_uses_grid_only_in_revaluation_mode() -> None:
+    positions = generate_positions(120)
+    sensitivities = generate_sensitivities(positions)
+    bundle = DataBundle(positions=positions, sensitivities=sensitivities, market_data=pd.DataFrame(), risk_drivers=generate_risk_driver_taxonomy(200))
+    state = AppState(data_bundle=bundle)
+    scenario = state.ensure_scenario()
+    scenario.shocks.asset_class_shocks = {"Equities": {"index_pct": -0.3, "vol_atm_pct": 0.4}}
+    state.revaluation_grid = precompute_grid(positions[["instrument_id"]], lambda _i, ds, dvol: 0.0 * ds + 0.0 * dvol, DS_AXIS, DVOL_AXIS)
+
+    taylor = state.run_calculation()
+    revalued = state.run_calculation(revaluation="bilinear")
+
+    equities = revalued.results["asset_class"].eq("Equities").to_numpy()
+    # A flat ladder cancels delta with the gamma residual and zeroes the vol terms.
+    assert np.allclose(revalued.results.loc[equities, ["pnl_delta", "pnl_gamma"]].sum(axis=1), 0.0)
+    assert np.allclose(revalued.results.loc[equities, "pnl_vega"], 0.0)
+    assert taylor.summary["pnl_total"] != revalued.summary["pnl_total"]
+    assert state.book_grid() is state.book_grid()
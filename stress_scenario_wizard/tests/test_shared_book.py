@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.driver_pnl import build_driver_sensitivity_matrix
+from stress_wizard.calc.engine import compute_pnl
+from stress_wizard.calc.shared_book import FRAME_COLUMNS, AttachedBlock, SharedBlockHandle, attach_book, publish_book
+from stress_wizard.data.demo_data import generate_driver_sensitivities, generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+
+
+SHOCKS = {"Equities": {"index_pct": -0.12, "vol_atm_pct": 0.25}, "Credit": {"ig_bp": 80.0}}
+
+
+def _worker_total(handle: SharedBlockHandle) -> tuple[float, bool]:
+    book, matrix, _block = attach_book(handle)
+    total = float(compute_pnl(None, None, SHOCKS, book=book, driver_matrix=matrix)["pnl_total"].sum())
+    return total, bool(book.greeks.flags.writeable)
+
+
+def _book():
+    positions = generate_positions(400)
+    drivers = generate_risk_driver_taxonomy(300)
+    book = build_priced_book(positions, generate_sensitivities(positions))
+    return book, build_driver_sensitivity_matrix(generate_driver_sensitivities(positions, drivers), book)
+
+
+def test_attached_book_is_a_read_only_view_that_prices_identically() -> None:
+    book, matrix = _book()
+    expected = float(compute_pnl(None, None, SHOCKS, book=book, driver_matrix=matrix)["pnl_total"].sum())
+
+    with publish_book(book, matrix) as shared:
+        attached, attached_matrix, block = attach_book(shared.handle)
+        assert np.shares_memory(attached.greeks, block.array("greeks"))
+        assert not attached.greeks.flags.writeable
+        assert np.array_equal(attached.codes["desk"], book.codes["desk"])
+        assert set(attached.frame.columns) <= set(FRAME_COLUMNS) and "notional" in book.frame.columns
+        assert attached.frame["instrument_id"].dtype != object and attached_matrix.driver_ids.dtype != object
+        assert abs(float(compute_pnl(None, None, SHOCKS, book=attached, driver_matrix=attached_matrix)["pnl_total"].sum()) - expected) < 1e-9
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(2, mp_context=context) as pool:
+            results = list(pool.map(_worker_total, [shared.handle] * 2))
+        assert all(abs(total - expected) < 1e-9 and not writeable for total, writeable in results)
+
+
+def test_closing_the_owner_unlinks_the_segment() -> None:
+    book, _ = _book()
+    shared = publish_book(book)
+    handle = shared.handle
+    shared.close()
+
+    assert shared.closed
+    with pytest.raises(FileNotFoundError):
+        AttachedBlock(handle)
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+
+import pandas as pd
+
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.driver_pnl import build_driver_sensitivity_matrix
+from stress_wizard.calc.engine import compute_pnl, compute_pnl_batch
+from stress_wizard.calc import shift_analysis
+from stress_wizard.calc.shift_analysis import (
+    BreakEvenResult,
+    break_even_shift,
+    break_even_table,
+    marginal_contribution,
+    sensitivity_table,
+    solve_break_even,
+    tail_contributions,
+    tornado_data,
+)
+from stress_wizard.data.demo_data import (
+    generate_driver_sensitivities,
+    generate_positions,
+    generate_risk_driver_taxonomy,
+    generate_sensitivities,
+)
+from stress_wizard.scenario.top_down import TopDownConfig, generate_asset_class_shocks
+
+
+def _book_and_shocks():
+    positions = generate_positions(400)
+    sensitivities = generate_sensitivities(positions)
+    shocks = generate_asset_class_shocks(TopDownConfig(narrative="test", theme_weights={"Recession": 1.0}))
+    return positions, sensitivities, build_priced_book(positions, sensitivities), shocks
+
+
+def test_analytic_sensitivity_table_matches_full_repricing() -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    original = copy.deepcopy(shocks)
+
+    analytic = sensitivity_table(positions, sensitivities, shocks, book=book)
+    full = sensitivity_table(positions, sensitivities, shocks, book=book, method="full")
+
+    assert shocks == original
+    assert list(analytic["parameter"]) == list(full["parameter"])
+    assert np.allclose(analytic["delta_vs_base"], full["delta_vs_base"], atol=1e-6)
+    assert list(tornado_data(analytic)["parameter"])[:5] == list(tornado_data(full)["parameter"])[:5]
+
+
+def test_analytic_sensitivity_table_reprices_driver_shocked_rows() -> None:
+    positions, sensitivities, _, shocks = _book_and_shocks()
+    drivers = generate_risk_driver_taxonomy(600)
+    positions["driver_id"] = drivers["driver_id"].sample(len(positions), replace=True, random_state=5).to_numpy()
+    book = build_priced_book(positions, sensitivities)
+    long = generate_driver_sensitivities(positions.iloc[:250], drivers, drivers_per_position=2)
+    matrix = build_driver_sensitivity_matrix(long, book)
+    driver_shocks = pd.DataFrame({"driver_id": pd.concat([long["driver_id"].head(30), positions["driver_id"].iloc[300:]]), "shock": -0.3})
+    extras = dict(book=book, driver_shocks=driver_shocks, driver_matrix=matrix)
+
+    analytic = sensitivity_table(positions, sensitivities, shocks, **extras)
+    full = sensitivity_table(positions, sensitivities, shocks, method="full", **extras)
+    plain = sensitivity_table(positions, sensitivities, shocks, book=book)
+
+    assert np.allclose(analytic["pnl"], full["pnl"], atol=1e-6)
+    assert np.allclose(analytic["delta_vs_base"], full["delta_vs_base"], atol=1e-6)
+    assert not np.allclose(analytic["pnl"], plain["pnl"])
+
+
+def test_break_even_solver_hits_target_exactly() -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    # Pick a reachable target: the P&L at an equity move of +20%.
+    bumped = {**shocks, "Equities": {**shocks["Equities"], "index_pct": 0.2}}
+    target = float(compute_pnl(positions, sensitivities, bumped, book=book)["pnl_total"].sum())
+
+    report = solve_break_even(positions, sensitivities, shocks, target_pnl=target, book=book)
+
+    assert report.converged
+    assert abs(report.residual) <= 1e-6
+    hit = {**shocks, "Equities": {**shocks["Equities"], "index_pct": report.shift}}
+    assert abs(float(compute_pnl(positions, sensitivities, hit, book=book)["pnl_total"].sum()) - target) < 1e-4
+
+
+def test_break_even_solver_reprices_driver_rows() -> None:
+    positions, sensitivities, _, shocks = _book_and_shocks()
+    drivers = generate_risk_driver_taxonomy(600)
+    positions["driver_id"] = drivers["driver_id"].sample(len(positions), replace=True, random_state=5).to_numpy()
+    book = build_priced_book(positions, sensitivities)
+    long = generate_driver_sensitivities(positions.iloc[:250], drivers, drivers_per_position=2)
+    matrix = build_driver_sensitivity_matrix(long, book)
+    driver_shocks = pd.DataFrame({"driver_id": pd.concat([long["driver_id"].head(30), positions["driver_id"].iloc[300:]]), "shock": -0.3})
+    extras = dict(driver_shocks=driver_shocks, driver_matrix=matrix)
+
+    def pnl(x: float, rows: np.ndarray | None = None) -> float:
+        bumped = {**shocks, "Equities": {**shocks["Equities"], "index_pct": x}}
+        results = compute_pnl(positions, sensitivities, bumped, book=book, **extras)
+        return float(results["pnl_total"].to_numpy()[rows if rows is not None else slice(None)].sum())
+
+    target = pnl(0.2)
+    report = solve_break_even(positions, sensitivities, shocks, target_pnl=target, book=book, **extras)
+    assert report.converged and abs(pnl(report.shift) - target) < 1e-4
+
+    desk = book.labels["desk"][0]
+    rows = np.flatnonzero(book.codes["desk"] == 0)
+    table = break_even_table(
+        positions, sensitivities, shocks, [("Equities", "index_pct")], {desk: pnl(0.2, rows)}, group_by="desk", book=book, **extras
+    )
+    row = table.iloc[0]
+    assert row["group"] == desk and row["converged"]
+    assert abs(pnl(row["shift"], rows) - pnl(0.2, rows)) < 1e-4
+
+
+def test_break_even_shift_keeps_grid_contract_off_the_polynomial() -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    assert break_even_shift(positions, sensitivities, shocks, parameter=("Nowhere", "index_pct"), book=book) == -0.5
+
+    positions["driver_id"] = [f"DRV-{i % 7}" for i in range(len(positions))]
+    book = build_priced_book(positions, sensitivities)
+    driver_shocks = pd.DataFrame({"driver_id": ["DRV-1", "DRV-3"], "shock": [-0.4, 0.3]})
+    kwargs = dict(target_pnl=-50_000.0, book=book, driver_shocks=driver_shocks)
+
+    shift = break_even_shift(positions, sensitivities, shocks, **kwargs)  # falls back to the grid scan
+
+    def pnl(x: float) -> float:
+        bumped = {**shocks, "Equities": {**shocks["Equities"], "index_pct": x}}
+        return float(compute_pnl(positions, sensitivities, bumped, driver_shocks=driver_shocks, book=book)["pnl_total"].sum())
+
+    scan = np.linspace(-0.5, 0.5, 300)
+    assert shift == scan[np.argmin([abs(pnl(x) + 50_000.0) for x in scan])]
+
+
+def test_break_even_table_solves_per_desk_targets() -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    desks = book.labels["desk"][:3]
+
+    table = break_even_table(
+        positions,
+        sensitivities,
+        shocks,
+        parameters=[("Equities", "index_pct"), ("Rates", "parallel_shift_bp")],
+        targets={desk: -1_000.0 for desk in desks},
+        group_by="desk",
+        search_range=(-500.0, 500.0),
+        book=book,
+    )
+
+    assert sorted(table["group"].unique()) == sorted(desks)
+    assert len(table) == 6
+    assert set(table["status"]) <= {"converged", "no_root_in_range", "discontinuity", "max_iterations"}
+
+
+def test_marginal_contribution_top_k_matches_full_sort() -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    results = compute_pnl(positions, sensitivities, shocks, book=book)
+
+    full = marginal_contribution(results)
+    top = marginal_contribution(results, top_k=10)
+
+    assert list(top["instrument_id"]) == list(full["instrument_id"].head(10))
+    assert np.allclose(full["marginal_contribution"].sum(), results["pnl_total"].sum())
+
+
+def test_tail_contributions_add_up_to_expected_shortfall() -> None:
+    _, _, book, shocks = _book_and_shocks()
+    scenarios = [
+        generate_asset_class_shocks(TopDownConfig(narrative="test", theme_weights={"Recession": 1.0}, severity_scale=scale))
+        for scale in np.linspace(-2.0, 2.0, 40)
+    ]
+    batch = compute_pnl_batch(book, scenarios)
+
+    out = tail_contributions(batch, book, by="desk", alpha=0.9)
+
+    expected_es = np.sort(batch.scenario_totals())[:4].mean()
+    assert np.isclose(out["es_contribution"].sum(), expected_es)
+    assert set(out["desk"]) == set(book.labels["desk"])
+
+
+def test_break_even_shift_scans_the_full_grid_when_the_solver_does_not_converge(monkeypatch) -> None:
+    positions, sensitivities, book, shocks = _book_and_shocks()
+    grid = break_even_shift(positions, sensitivities, shocks, target_pnl=-129_350.0, book=book, method="grid")
+    stalled = BreakEvenResult("Equities.index_pct", -129_350.0, 0.123, 0.0, 1.0, 100, False, "max_iterations")
+    monkeypatch.setattr(shift_analysis, "solve_break_even", lambda *args, **kwargs: stalled)
+
+    assert break_even_shift(positions, sensitivities, shocks, target_pnl=-129_350.0, book=book) == grid
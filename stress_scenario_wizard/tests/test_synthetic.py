@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from stress_wizard.calc.book import build_priced_book
+from stress_wizard.calc.driver_pnl import build_driver_sensitivity_matrix
+from stress_wizard.calc.engine import compute_pnl
+from stress_wizard.data.columnar_store import open_bundle
+from stress_wizard.data.synthetic import DESK_ASSET_CLASS, SyntheticConfig, generate_synthetic_bundle, write_synthetic_bundle
+
+
+def _config(**overrides) -> SyntheticConfig:
+    values = dict(positions=6_000, drivers=9_000, books=200, drivers_per_position=3, block_rows=2_500, as_of=datetime(2026, 1, 2))
+    values.update(overrides)
+    return SyntheticConfig(**values)
+
+
+def test_same_seed_reproduces_and_new_seed_differs() -> None:
+    first = generate_synthetic_bundle(_config())
+    again = generate_synthetic_bundle(_config())
+    other = generate_synthetic_bundle(_config(seed=99))
+
+    for table in ["positions", "sensitivities", "market_data", "risk_drivers", "driver_sensitivities"]:
+        pd.testing.assert_frame_equal(getattr(first, table), getattr(again, table))
+    assert not first.positions["notional"].equals(other.positions["notional"])
+
+
+def test_books_desks_and_notionals_are_skewed() -> None:
+    positions = generate_synthetic_bundle(_config(positions=20_000)).positions
+
+    book_share = positions["book"].value_counts(normalize=True)
+    assert book_share.head(len(book_share) // 10).sum() > 0.5
+    assert (positions["desk"].map(DESK_ASSET_CLASS) == positions["asset_class"]).mean() > 0.8
+    notional = positions["notional"]
+    assert notional.quantile(0.999) > 10 * notional.median()
+    assert positions["instrument_id"].is_unique
+
+
+def test_stored_bundle_matches_in_memory_and_prices(tmp_path) -> None:
+    config = _config()
+    progress: list[tuple[str, int, int]] = []
+    write_synthetic_bundle(tmp_path, "synthetic", config, progress=lambda *event: progress.append(event))
+    stored = open_bundle(tmp_path, "synthetic")
+    expected = generate_synthetic_bundle(config)
+
+    for table in ["positions", "sensitivities", "market_data", "risk_drivers", "driver_sensitivities"]:
+        pd.testing.assert_frame_equal(getattr(stored, table), getattr(expected, table))
+    assert progress[-1] == ("driver_sensitivities", 18_000, 18_000)
+    assert set(stored.driver_sensitivities["driver_id"]).issubset(set(stored.risk_drivers["driver_id"]))
+
+    book = build_priced_book(stored.positions, stored.sensitivities)
+    matrix = build_driver_sensitivity_matrix(stored.driver_sensitivities, book)
+    shocks = pd.DataFrame({"driver_id": stored.risk_drivers["driver_id"].iloc[:100], "shock": -0.05})
+    result = compute_pnl(
+        stored.positions,
+        stored.sensitivities,
+        {"Equities": {"index_pct": -0.2}, "Rates": {"parallel_shift_bp": 50.0}},
+        driver_shocks=shocks,
+        book=book,
+        driver_matrix=matrix,
+    )
+    assert len(result) == config.positions
+    assert np.isfinite(result["pnl_total"]).all()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stress_wizard.data.demo_data import generate_market_data, generate_positions, generate_risk_driver_taxonomy, generate_sensitivities
+from stress_wizard.ingestion.validation_rules import GREEK_COLUMNS, RULES, ValidationRule, ValidationSettings
+from stress_wizard.ingestion.validator import BundleValidator, validate_bundle
+
+
+NOW = datetime(2026, 3, 4, 15, 30)
+
+
+def _tables() -> dict[str, pd.DataFrame]:
+    positions = generate_positions(2_000)
+    drivers = generate_risk_driver_taxonomy(3_000)
+    market = generate_market_data(drivers)
+    market["as_of"] = NOW - timedelta(hours=3)
+    sensitivities = generate_sensitivities(positions)
+    sensitivities[GREEK_COLUMNS] = sensitivities[GREEK_COLUMNS].fillna(0.0)  # the demo leaves ~2% gaps
+    return {
+        "positions": positions,
+        "sensitivities": sensitivities,
+        "market_data": market,
+        "risk_drivers": drivers,
+    }
+
+
+def _validator(**kwargs) -> BundleValidator:
+    return BundleValidator(settings=ValidationSettings(now=NOW), partition_rows=256, **kwargs)
+
+
+def test_rules_report_counts_and_failing_rows() -> None:
+    tables = _tables()
+    positions, sens, market, drivers = tables["positions"], tables["sensitivities"], tables["market_data"], tables["risk_drivers"]
+    sens.loc[5, "vega"] = np.nan
+    sens = tables["sensitivities"] = pd.concat([sens.drop(index=[7]), sens.iloc[[0]].assign(instrument_id="GHOST")], ignore_index=True)
+    positions.loc[[9, 11], "instrument_id"] = positions.loc[[8, 8], "instrument_id"].to_numpy()
+    positions.loc[20, "notional"] = 0.0
+    positions.loc[21, "notional"] = np.nan
+    market.loc[[1, 2, 3], "as_of"] = NOW - timedelta(days=2)
+    tables["market_data"] = market.drop(index=[40])
+
+    scorecard = validate_bundle(**tables, validator=_validator())
+    counts = {name: result.count for name, result in scorecard.rules.items()}
+
+    assert counts["missing_greeks"] == 2  # position 5 (NaN vega) and 7 (no sensitivity row)
+    assert counts["orphaned_sensitivities"] == 3  # GHOST plus the sensitivities of the renamed positions 9 and 11
+    assert counts["duplicate_instrument_ids"] == 2
+    assert counts["notional_out_of_range"] == 2
+    assert counts["stale_market_data"] == 3
+    assert counts["drivers_without_market_data"] == 1
+    assert scorecard.duplicate_count == 2 and scorecard.stale_market_data_count == 3
+    assert scorecard.coverage_positions_with_complete_greeks == pytest.approx(100.0 * (1 - 2 / len(positions)), abs=0.01)
+    assert list(scorecard.issue_rows("notional_out_of_range", positions).index) == [20, 21]
+    assert scorecard.issue_rows("drivers_without_market_data", drivers)["driver_id"].tolist() == [market.loc[40, "driver_id"]]
+    assert {issue.rule for issue in scorecard.issues} == {name for name, count in counts.items() if count}
+
+
+def test_revalidation_reruns_only_edited_partitions() -> None:
+    tables = _tables()
+    validator = _validator()
+    first = validator.validate(tables)
+    again = validator.validate(tables)
+    assert all(r.evaluated_partitions == 0 for r in again.values())
+    assert {name: r.count for name, r in again.items()} == {name: r.count for name, r in first.items()}
+
+    positions = tables["positions"] = tables["positions"].copy()
+    positions.loc[1_000, "notional"] = -1e15
+    edited = validator.validate(tables)
+
+    partitions = len(range(0, len(positions), 256))
+    assert edited["notional_out_of_range"].evaluated_partitions == 1
+    assert edited["notional_out_of_range"].rows.tolist() == [1_000]
+    assert edited["duplicate_instrument_ids"].evaluated_partitions == 0  # reads instrument_id only
+    assert edited["missing_greeks"].reused_partitions == partitions
+
+    fresh = _validator().validate(tables)
+    for name, result in fresh.items():
+        np.testing.assert_array_equal(edited[name].rows, result.rows)
+
+
+def test_reference_changes_recheck_dependent_rules() -> None:
+    tables = _tables()
+    validator = _validator()
+    validator.validate(tables)
+
+    sens = tables["sensitivities"] = tables["sensitivities"].copy()
+    sens.loc[3, "delta"] = sens.loc[3, "delta"] * 2  # still complete: positions need no recheck
+    assert validator.validate(tables)["missing_greeks"].evaluated_partitions == 0
+
+    sens.loc[3, "delta"] = np.nan
+    result = validator.validate(tables)["missing_greeks"]
+    assert result.evaluated_partitions > 0
+    assert tables["positions"]["instrument_id"].iloc[result.rows].tolist() == [sens.loc[3, "instrument_id"]]
+
+
+def test_custom_rules_and_missing_columns() -> None:
+    tables = _tables()
+    long_dated = ValidationRule(
+        "long_dated",
+        "positions",
+        ("maturity",),
+        lambda frame, ctx: (frame["maturity"] > ctx.settings.now + timedelta(days=365 * 30)).to_numpy(),
+        "LOW",
+        "positions",
+        "{count} positions mature in more than 30 years.",
+        "Confirm the maturity dates.",
+    )
+    tables["positions"].loc[0, "maturity"] = NOW + timedelta(days=365 * 40)
+    del tables["market_data"]["as_of"]
+
+    scorecard = validate_bundle(**tables, validator=_validator(rules=[*RULES, long_dated]))
+
+    assert scorecard.rules["long_dated"].rows.tolist() == [0]
+    assert scorecard.rules["stale_market_data"].skipped == "missing as_of"
+    assert scorecard.missing_required_columns["market_data"] == ["as_of"]
+    assert any(issue.severity == "HIGH" and issue.category == "market_data" for issue in scorecard.issues)
+
+
+def test_categorical_id_columns_are_matched_by_value() -> None:
+    tables = _tables()
+    tables["positions"] = tables["positions"].drop(index=[4]).reset_index(drop=True)
+    tables["positions"]["instrument_id"] = tables["positions"]["instrument_id"].astype("category")
+    tables["sensitivities"]["instrument_id"] = tables["sensitivities"]["instrument_id"].astype("category")
+    tables["risk_drivers"]["driver_id"] = tables["risk_drivers"]["driver_id"].astype("category")
+
+    results = _validator().validate(tables)
+
+    assert results["missing_greeks"].count == 0
+    assert results["orphaned_sensitivities"].rows.tolist() == [4]
+    assert results["drivers_without_market_data"].count == 0